@@ -30,6 +30,12 @@ class ShotgunPanelApp(Application):
         """
         Called as the application is being initialized
         """
+        # registry of per entity type formatting data. This is shared
+        # by all panels and dialogs created by this app instance.
+        self._formatter_registry = None
+        # optional warm up of the caches for the current context
+        self._cache_warmer = None
+
         # We won't be able to do anything if there's no UI. The import
         # of our app module below required some Qt components, and will likely
         # blow up.
@@ -42,6 +48,8 @@ class ShotgunPanelApp(Application):
         # toolkit's code reload mechanism will work properly.
         app_payload = self.import_module("app")
 
+        self._formatter_registry = app_payload.FormatterRegistry(self)
+
         # now register a panel, this is to tell the engine about the our panel ui
         # that the engine can automatically create the panel - this happens for
         # example when a saved window layout is restored in Nuke or at startup.
@@ -76,6 +84,18 @@ class ShotgunPanelApp(Application):
             },
         )
 
+        # load the data for the current context in the background,
+        # so that the panel opens from cache
+        self._start_cache_warmer()
+
+    @property
+    def formatter_registry(self):
+        """
+        The :class:`FormatterRegistry` holding the formatting
+        data for all entity types displayed by the panel.
+        """
+        return self._formatter_registry
+
     @property
     def context_change_allowed(self):
         """
@@ -94,6 +114,18 @@ class ShotgunPanelApp(Application):
         # for the panel widget in the future. In that case, we'll need to
         # check here to see if the panel has been pinned by the user, and
         # if it has NOT navigate it to home.
+
+        # the data warmed up is for the previous context
+        self._stop_cache_warmer()
+
+        if self._formatter_registry:
+            # the schema may differ between projects
+            self._formatter_registry.schema_lookup.reset()
+
+        if self.engine.has_ui and not (self._current_panel or self._current_dialog):
+            # nothing displays the new context yet, warm it up instead
+            self._start_cache_warmer()
+
         if self.engine.has_ui and self._current_panel:
             try:
                 self._current_panel.navigate_to_context(new_context)
@@ -194,6 +226,12 @@ class ShotgunPanelApp(Application):
         """
         self.log_debug("Destroying app...")
 
+        self._stop_cache_warmer()
+
+        if self._formatter_registry:
+            self._formatter_registry.invalidate()
+            self._formatter_registry = None
+
     def create_panel(self):
         """
         Shows the UI as a panel.
@@ -204,6 +242,9 @@ class ShotgunPanelApp(Application):
         """
         app_payload = self.import_module("app")
 
+        # the panel loads its own data from here on
+        self._stop_cache_warmer()
+
         # start the UI
         try:
             widget = self.engine.show_panel(
@@ -232,10 +273,31 @@ class ShotgunPanelApp(Application):
         :returns: The widget associated with the dialog.
         """
         app_payload = self.import_module("app")
+        self._stop_cache_warmer()
         widget = self.engine.show_dialog("ShotGrid", self, app_payload.AppDialog)
         self._current_dialog = widget
         return widget
 
+    def _start_cache_warmer(self):
+        """
+        Starts warming up the caches for the current context,
+        if enabled in the app settings
+        """
+        if not self.get_setting("warm_up_on_startup"):
+            return
+
+        app_payload = self.import_module("app")
+        self._cache_warmer = app_payload.CacheWarmer()
+        self._cache_warmer.start()
+
+    def _stop_cache_warmer(self):
+        """
+        Stops warming up the caches, if this is still in progress
+        """
+        if self._cache_warmer:
+            self._cache_warmer.destroy()
+            self._cache_warmer = None
+
     def _on_dialog_close(self, dialog):
         """
         Callback called by the panel dialog whenever
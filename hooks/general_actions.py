@@ -146,17 +146,19 @@ class GeneralActions(HookBaseClass):
             # playlists this version is already part of
             existing_playlist_ids = [x["id"] for x in sg_data.get("playlists", [])]
 
-            for playlist in playlists:
+            # format all playlist dates in one go
+            playlist_dates = self._format_timestamps(
+                [playlist.get("sg_date_and_time") for playlist in playlists]
+            )
+
+            for (playlist, playlist_date) in zip(playlists, playlist_dates):
                 if playlist["id"] in existing_playlist_ids:
                     # version already in this playlist so skip
                     continue
 
-                if playlist.get("sg_date_and_time"):
+                if playlist_date:
                     # playlist name includes date/time
-                    caption = "%s (%s)" % (
-                        playlist["code"],
-                        self._format_timestamp(playlist["sg_date_and_time"]),
-                    )
+                    caption = "%s (%s)" % (playlist["code"], playlist_date)
                 else:
                     caption = playlist["code"]
 
@@ -324,6 +326,24 @@ class GeneralActions(HookBaseClass):
 
         QtGui.QApplication.clipboard().setText(text)
 
+    def _format_timestamps(self, datetime_objs):
+        """
+        Formats a list of datetime objects in a short human readable form.
+
+        :param datetime_objs: List of datetime objects to format. None
+            entries are allowed.
+        :returns: List of date strings, None for None entries.
+        """
+        registry = getattr(self.parent, "formatter_registry", None)
+        if registry:
+            # share the app wide formatter and its memoized strings
+            return registry.timestamp_formatter.format_relative_days(datetime_objs)
+
+        return [
+            self._format_timestamp(datetime_obj) if datetime_obj else None
+            for datetime_obj in datetime_objs
+        ]
+
     def _format_timestamp(self, datetime_obj):
         """
         Formats the given datetime object in a short human readable form.
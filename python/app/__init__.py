@@ -9,3 +9,5 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 from .dialog import AppDialog
+from .formatter_registry import FormatterRegistry
+from .cache_warmer import CacheWarmer
@@ -0,0 +1,167 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+
+
+class AvatarCache(object):
+    """
+    Process wide cache of user avatars.
+
+    Avatars are keyed by user type, user id and the identity of the user's
+    image, so that a new image uploaded for a user is picked up. Both the
+    raw image and the variants composited from it, for example round note
+    thumbnails with or without the unread marker, are kept in a bounded
+    least recently used cache. Each variant is only composited once, and
+    variants missing from the cache are composited from the raw image if
+    it is available, without waiting for the image to be loaded again.
+    """
+
+    # number of images and pixmaps kept in memory
+    MAX_ENTRIES = 200
+
+    # variant name for the raw image
+    RAW_IMAGE = "raw"
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # (user_type, user_id, image_key, variant) -> QImage or QPixmap
+        self._entries = collections.OrderedDict()
+        # (user_type, user_id) -> image key of the most recently seen image.
+        # this is only a small key per user, so it isn't bounded.
+        self._latest_images = {}
+
+    def __repr__(self):
+        return "<Avatar cache with %d entries>" % len(self._entries)
+
+    def get_avatar(self, user_type, user_id, image_url, variant, image, composite):
+        """
+        Returns an avatar variant for a user image, compositing it if needed
+
+        :param user_type: Entity type of the user, e.g. HumanUser
+        :param user_id: Id of the user
+        :param image_url: Url of the user image, used to identify it. If None,
+            the avatar is composited without being cached.
+        :param variant: Name of the variant, identifying how it is composited
+        :param image: QImage for the user image
+        :param composite: Callable compositing the variant from a QImage
+        :returns: QPixmap for the variant
+        """
+        pixmap = self.find_avatar(user_type, user_id, image_url, variant)
+        if pixmap is None:
+            pixmap = composite(image)
+        self.add_avatar(user_type, user_id, image_url, variant, image, pixmap)
+        return pixmap
+
+    def find_avatar(self, user_type, user_id, image_url, variant):
+        """
+        Returns an avatar variant for a user image if it is cached
+
+        :param user_type: Entity type of the user, e.g. HumanUser
+        :param user_id: Id of the user
+        :param image_url: Url of the user image, used to identify it
+        :param variant: Name of the variant, identifying how it is composited
+        :returns: QPixmap for the variant or None
+        """
+        image_key = self._get_image_key(image_url)
+        if image_key is None:
+            return None
+        return self._get((user_type, user_id, image_key, variant))
+
+    def add_avatar(self, user_type, user_id, image_url, variant, image, pixmap):
+        """
+        Stores a user image and an avatar variant composited from it
+
+        :param user_type: Entity type of the user, e.g. HumanUser
+        :param user_id: Id of the user
+        :param image_url: Url of the user image, used to identify it. If None,
+            nothing is stored.
+        :param variant: Name of the variant, identifying how it is composited
+        :param image: QImage for the user image, or None if not loaded
+        :param pixmap: QPixmap for the variant
+        """
+        image_key = self._get_image_key(image_url)
+        if image_key is None:
+            return
+
+        self._latest_images[(user_type, user_id)] = image_key
+        if image is not None:
+            self._put((user_type, user_id, image_key, self.RAW_IMAGE), image)
+        self._put((user_type, user_id, image_key, variant), pixmap)
+
+    def get_latest_avatar(self, user_type, user_id, variant, composite):
+        """
+        Returns an avatar variant for the most recently seen image of a user
+
+        :param user_type: Entity type of the user, e.g. HumanUser
+        :param user_id: Id of the user
+        :param variant: Name of the variant, identifying how it is composited
+        :param composite: Callable compositing the variant from a QImage
+        :returns: QPixmap for the variant or None if the image isn't cached
+        """
+        image_key = self._latest_images.get((user_type, user_id))
+        if image_key is None:
+            return None
+
+        key = (user_type, user_id, image_key, variant)
+        pixmap = self._get(key)
+        if pixmap is None:
+            image = self._get((user_type, user_id, image_key, self.RAW_IMAGE))
+            if image is None:
+                return None
+            pixmap = composite(image)
+            self._put(key, pixmap)
+        return pixmap
+
+    def clear(self):
+        """
+        Discards all avatars
+        """
+        self._entries = collections.OrderedDict()
+        self._latest_images = {}
+
+    def _get_image_key(self, image_url):
+        """
+        Returns the key identifying a user image. Thumbnail urls are signed,
+        so the query string is not part of the identity of the image.
+
+        :param image_url: Url of the image
+        :returns: String key or None
+        """
+        if not image_url:
+            return None
+        return image_url.split("?")[0]
+
+    def _get(self, key):
+        """
+        Looks up an entry and marks it as recently used
+
+        :param key: Entry key
+        :returns: QImage, QPixmap or None
+        """
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._entries[key] = value
+        return value
+
+    def _put(self, key, value):
+        """
+        Stores an entry, discarding the least recently used
+        entries if the cache is full
+
+        :param key: Entry key
+        :param value: QImage or QPixmap
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
@@ -0,0 +1,137 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from .dialog import AppDialog
+from .shotgun_location import ShotgunLocation
+from .details_prefetcher import DetailsPrefetcher
+from .model_current_user import SgCurrentUserModel
+
+task_manager = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "task_manager"
+)
+settings = sgtk.platform.import_framework("tk-framework-shotgunutils", "settings")
+shotgun_globals = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_globals"
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class CacheWarmer(QtCore.QObject):
+    """
+    Loads the data the panel displays first for the current context before
+    the panel is opened, so that opening it is served from cache.
+
+    The details and the default tab of the location for the current context
+    are loaded by a :class:`DetailsPrefetcher`, and the current user by a
+    :class:`SgCurrentUserModel`. These are the same models the panel uses,
+    so they populate the ShotgunModel caches the panel reads. The schema is
+    loaded through shotgun_globals, which caches it on disk.
+
+    All work runs on a private background task manager with a single
+    thread, so that it doesn't compete with the DCC for resources.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self._app = sgtk.platform.current_bundle()
+        self._settings_manager = settings.UserSettings(self._app)
+        self._publish_entity_type = sgtk.util.get_published_file_entity_type(
+            self._app.sgtk
+        )
+
+        self._bg_task_manager = task_manager.BackgroundTaskManager(
+            self, start_processing=True, max_threads=1
+        )
+        shotgun_globals.register_bg_task_manager(self._bg_task_manager)
+
+        self._details_prefetcher = DetailsPrefetcher(
+            self, self._bg_task_manager, self._create_tab_model
+        )
+        self._current_user_model = None
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self._details_prefetcher.destroy()
+        if self._current_user_model:
+            self._current_user_model.destroy()
+            self._current_user_model = None
+        shotgun_globals.unregister_bg_task_manager(self._bg_task_manager)
+        self._bg_task_manager.shut_down()
+
+    def start(self):
+        """
+        Starts warming up the caches once control returns to the
+        event loop, which is after the engine has started.
+        """
+        QtCore.QTimer.singleShot(0, self._warm_up)
+
+    def _warm_up(self):
+        """
+        Starts loading the data for the current context in the background
+        """
+        try:
+            sg_location = ShotgunLocation.from_context(self._app.context)
+        except NotImplementedError:
+            # nothing to warm up for an empty context
+            return
+
+        logger.debug("Warming up the caches for %r", sg_location)
+
+        # loading the schema is also triggered when its lookups are used,
+        # but only runs once a task manager has been registered
+        shotgun_globals.run_on_schema_loaded(
+            lambda: logger.debug("Schema loaded for warm up")
+        )
+
+        self._current_user_model = SgCurrentUserModel(self, self._bg_task_manager)
+        self._current_user_model.load()
+
+        self._details_prefetcher.set_candidates([sg_location.entity_dict])
+
+    def _create_tab_model(self, sg_location, parent):
+        """
+        Creates a model for the default tab of a location, loaded the same
+        way as the panel loads it. See :class:`DetailsPrefetcher`.
+
+        :param sg_location: Location to warm up
+        :param parent: QT parent object for the model
+        :returns: Tuple with the model and a callable loading it,
+            or None if the default tab is not a listing.
+        """
+        tab_name = sg_location.tab
+        listing = AppDialog.get_entity_tab_listing(tab_name, self._publish_entity_type)
+        if listing is None:
+            return None
+
+        (model_class, entity_type) = listing
+        model = model_class(entity_type, parent, self._bg_task_manager)
+
+        filter_checked = False
+        if tab_name in AppDialog.ENTITY_TAB_FILTER_SETTINGS:
+            filter_checked = self._settings_manager.retrieve(
+                *AppDialog.ENTITY_TAB_FILTER_SETTINGS[tab_name]
+            )
+
+        (args, kwargs) = AppDialog.get_entity_tab_load_args(
+            tab_name, sg_location, bool(filter_checked)
+        )
+        return (model, lambda: model.load_data(*args, **kwargs))
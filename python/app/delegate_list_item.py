@@ -99,25 +99,40 @@ class ListItemDelegate(shotgun_view.EditSelectedWidgetDelegate):
         """
         icon = shotgun_model.get_sanitized_data(model_index, QtCore.Qt.DecorationRole)
         if icon:
-            thumb = icon.pixmap(512)
+            # list items only ever use small thumbnails
+            thumb = icon.pixmap(ListItemWidget.calculate_thumbnail_size())
             widget.set_thumbnail(thumb)
 
+        # let the model restore the thumbnail if it has been evicted
+        model_index.model().sourceModel().notify_item_painted(
+            model_index.model().mapToSource(model_index)
+        )
+
         # note: This is a violation of the model/delegate independence.
         if model_index.model().sourceModel().is_highlighted(model_index):
             widget.set_highlighted(True)
         else:
             widget.set_highlighted(False)
 
-        # get the shotgun data
-        sg_item = shotgun_model.get_sg_data(model_index)
+        # use the text pre-rendered by the model if available
+        source_model = model_index.model().sourceModel()
+        text = shotgun_model.get_sanitized_data(
+            model_index, source_model.LIST_ITEM_TEXT_ROLE
+        )
 
-        # get the formatter object which defines how this object is to be presented
-        sg_formatter = model_index.model().sourceModel().get_formatter()
+        if text:
+            (header_left, header_right, body) = text
+        else:
+            # get the shotgun data
+            sg_item = shotgun_model.get_sg_data(model_index)
 
-        # ask to format the data
-        (header_left, header_right, body) = sg_formatter.format_list_item_details(
-            sg_item
-        )
+            # get the formatter object which defines how this object is to be presented
+            sg_formatter = source_model.get_formatter()
+
+            # ask to format the data
+            (header_left, header_right, body) = sg_formatter.format_list_item_details(
+                sg_item
+            )
 
         widget.set_text(header_left, header_right, body)
 
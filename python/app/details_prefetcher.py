@@ -0,0 +1,244 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import functools
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from .shotgun_location import ShotgunLocation
+from .model_details import SgEntityDetailsModel
+
+
+class DetailsPrefetcher(QtCore.QObject):
+    """
+    Prefetches the data needed to navigate to entities shown in a listing,
+    so that navigating into one of them can be served from cache.
+
+    For each entity, the details header and the default tab are loaded by
+    headless models running the same queries as the models in the dialog.
+    This populates the ShotgunModel caches, which the dialog models read
+    synchronously when they are loaded for the entity.
+
+    Only a few entities are processed at a time, the queue of entities
+    waiting to be prefetched is capped and only a limited number of
+    recently prefetched entities are remembered.
+    """
+
+    # number of entities prefetched in parallel
+    MAX_CONCURRENT_ENTITIES = 2
+
+    # maximum number of entities waiting to be prefetched
+    MAX_QUEUED_ENTITIES = 30
+
+    # number of prefetched entities remembered, to avoid fetching them again
+    MAX_COMPLETED_ENTITIES = 200
+
+    def __init__(self, parent, bg_task_manager, tab_model_factory, query_broker=None):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        :param bg_task_manager: Task manager used by the prefetch models
+        :param tab_model_factory: Callable returning a model for the default
+            tab of a location. Called with the location and the parent to use
+            for the model, it should return a tuple with the model and a
+            callable loading the model, or None if the tab can't be prefetched.
+        :param query_broker: Optional :class:`QueryBroker` for the details models
+            to carry queries for, the same way as the dialog's details model.
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self._app = sgtk.platform.current_bundle()
+        self._bg_task_manager = bg_task_manager
+        self._tab_model_factory = tab_model_factory
+        self._query_broker = query_broker
+
+        # (entity_type, entity_id) keys, in order of priority
+        self._queue = []
+        # models that are loading, keyed by (entity_type, entity_id)
+        self._active = {}
+        # recently prefetched (entity_type, entity_id) keys
+        self._completed = collections.OrderedDict()
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self.cancel()
+
+    ############################################################################################
+    # public interface
+
+    def set_candidates(self, sg_data_list):
+        """
+        Replaces the entities waiting to be prefetched, typically with the
+        entities currently visible in a listing.
+
+        :param sg_data_list: List of shotgun data dictionaries in order of priority
+        """
+        queue = []
+        for sg_data in sg_data_list:
+            key = self._get_key(sg_data)
+            if key and key not in queue and self._needs_prefetch(key):
+                queue.append(key)
+
+        self._queue = queue[: self.MAX_QUEUED_ENTITIES]
+        self._process_queue()
+
+    def prioritize(self, sg_data):
+        """
+        Moves an entity to the front of the queue, typically because
+        the user is hovering over it.
+
+        :param sg_data: Shotgun data dictionary
+        """
+        key = self._get_key(sg_data)
+        if not key or not self._needs_prefetch(key):
+            return
+
+        if key in self._queue:
+            self._queue.remove(key)
+        self._queue.insert(0, key)
+        del self._queue[self.MAX_QUEUED_ENTITIES :]
+        self._process_queue()
+
+    def cancel(self):
+        """
+        Stops all prefetching
+
+        :returns: Number of entities which were being prefetched
+        """
+        num_cancelled = len(self._active)
+        self._queue = []
+        for key in list(self._active.keys()):
+            self._finish(key)
+        return num_cancelled
+
+    ############################################################################################
+    # internal methods
+
+    def _get_key(self, sg_data):
+        """
+        Returns the key to track an entity by
+
+        :param sg_data: Shotgun data dictionary
+        :returns: (entity_type, entity_id) tuple or None for invalid data
+        """
+        if sg_data and sg_data.get("type") and sg_data.get("id"):
+            return (sg_data["type"], sg_data["id"])
+        return None
+
+    def _needs_prefetch(self, key):
+        """
+        Checks if an entity still needs to be prefetched
+
+        :param key: (entity_type, entity_id) tuple
+        """
+        return key not in self._active and key not in self._completed
+
+    def _process_queue(self):
+        """
+        Starts prefetching queued entities, up to the concurrency limit
+        """
+        while self._queue and len(self._active) < self.MAX_CONCURRENT_ENTITIES:
+            self._start(self._queue.pop(0))
+
+    def _start(self, key):
+        """
+        Starts prefetching an entity
+
+        :param key: (entity_type, entity_id) tuple
+        """
+        (entity_type, entity_id) = key
+        sg_location = ShotgunLocation(entity_type, entity_id)
+        if sg_location.sg_formatter.should_open_in_shotgun_web:
+            # never displayed in the panel
+            self._mark_completed(key)
+            return
+
+        self._app.log_debug("Prefetching details for %s %s" % key)
+
+        details_model = SgEntityDetailsModel(
+            self, self._bg_task_manager, self._query_broker
+        )
+        loaders = [
+            (details_model, functools.partial(details_model.load_data, sg_location))
+        ]
+
+        if entity_type != "Note":
+            # notes are shown in a page without tabs
+            tab_loader = self._tab_model_factory(sg_location, self)
+            if tab_loader:
+                loaders.append(tab_loader)
+
+        self._active[key] = set()
+        for (model, load_model) in loaders:
+            self._active[key].add(model)
+            model.data_refreshed.connect(
+                functools.partial(self._on_model_done, key, model)
+            )
+            model.data_refresh_fail.connect(
+                functools.partial(self._on_model_done, key, model)
+            )
+
+        for (model, load_model) in loaders:
+            load_model()
+
+    def _on_model_done(self, key, model, *args):
+        """
+        Called when a prefetch model has finished refreshing
+
+        :param key: (entity_type, entity_id) tuple for the model
+        :param model: The model that finished
+        :param args: Signal arguments, ignored
+        """
+        models = self._active.get(key)
+        if models is None or model not in models:
+            return
+
+        # models can't be destroyed from within their own signals
+        models.discard(model)
+        QtCore.QTimer.singleShot(0, lambda: self._destroy_model(model))
+
+        if not models:
+            del self._active[key]
+            self._mark_completed(key)
+            self._process_queue()
+
+    def _finish(self, key):
+        """
+        Stops prefetching an entity and releases its models
+
+        :param key: (entity_type, entity_id) tuple
+        """
+        for model in self._active.pop(key, []):
+            self._destroy_model(model)
+
+    def _destroy_model(self, model):
+        """
+        Shuts down a prefetch model
+
+        :param model: Model to destroy
+        """
+        model.destroy()
+        model.deleteLater()
+
+    def _mark_completed(self, key):
+        """
+        Remembers that an entity has been prefetched
+
+        :param key: (entity_type, entity_id) tuple
+        """
+        self._completed.pop(key, None)
+        self._completed[key] = True
+        while len(self._completed) > self.MAX_COMPLETED_ENTITIES:
+            self._completed.popitem(last=False)
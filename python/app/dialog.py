@@ -13,6 +13,8 @@ from sgtk.util import sgre as re
 import pprint
 import os
 import tempfile
+import time
+import functools
 
 # by importing QT from sgtk rather than directly, we ensure that
 # the code will be compatible with both PySide and PyQt.
@@ -38,13 +40,19 @@ from .shotgun_formatter import ShotgunTypeFormatter
 from .note_updater import NoteUpdater
 from .widget_all_fields import AllFieldsWidget
 from .work_area_dialog import WorkAreaDialog
+from .details_prefetcher import DetailsPrefetcher
+from .query_broker import QueryBroker
+from .task_lanes import TaskLanes
+from .navigation_tracker import NavigationTracker
+from .navigation_snapshot import NavigationSnapshot, NavigationSnapshotCache
+from .publish_identity_cache import PublishIdentityCache
+from .thumbnail_compositor import ThumbnailCompositor
+from .pixmap_budget import PixmapBudget
+from .event_watcher import EventLogWatcher
 
 shotgun_model = sgtk.platform.import_framework(
     "tk-framework-shotgunutils", "shotgun_model"
 )
-task_manager = sgtk.platform.import_framework(
-    "tk-framework-shotgunutils", "task_manager"
-)
 settings = sgtk.platform.import_framework("tk-framework-shotgunutils", "settings")
 shotgun_data = sgtk.platform.import_framework(
     "tk-framework-shotgunutils", "shotgun_data"
@@ -67,6 +75,9 @@ MAX_LEN_UPPER_BODY_DETAILS = 1200
 # milliseconds to show splash
 SPLASH_UI_TIME_MILLISECONDS = 2000
 
+# milliseconds to wait for scrolling to settle before prefetching visible rows
+PREFETCH_DELAY_MILLISECONDS = 250
+
 
 class AppDialog(QtGui.QWidget):
     """
@@ -105,6 +116,32 @@ class AppDialog(QtGui.QWidget):
         ENTITY_TAB_INFO,
     ]
 
+    # entity tabs whose data is prefetched in the background while hidden
+    PREFETCH_ENTITY_TABS = [
+        ENTITY_TAB_NOTES,
+        ENTITY_TAB_VERSIONS,
+        ENTITY_TAB_PUBLISHES,
+        ENTITY_TAB_PUBLISH_HISTORY,
+        ENTITY_TAB_PUBLISH_DOWNSTREAM,
+        ENTITY_TAB_PUBLISH_UPSTREAM,
+        ENTITY_TAB_TASKS,
+        ENTITY_TAB_INFO,
+    ]
+
+    # hidden tabs are prefetched one at a time, by dedicated models on the
+    # prefetch lane, each one after a background task of this priority has
+    # run. This is lower than any other task, so that prefetching only
+    # happens when the lane is otherwise idle.
+    TAB_PREFETCH_PRIORITY = -1
+    TAB_PREFETCH_TASK_GROUP = "entity_tab_prefetch"
+
+    # user settings storing the state of the filter checkbox of
+    # entity tabs, with the state used until one has been stored
+    ENTITY_TAB_FILTER_SETTINGS = {
+        ENTITY_TAB_VERSIONS: ("pending_versions_only", False),
+        ENTITY_TAB_PUBLISHES: ("latest_publishes_only", True),
+    }
+
     @property
     def hide_tk_title_bar(self):
         """
@@ -127,10 +164,10 @@ class AppDialog(QtGui.QWidget):
         self._action_manager = ActionManager(self)
         self._action_manager.refresh_request.connect(self.refresh)
 
-        # create a background task manager
-        self._task_manager = task_manager.BackgroundTaskManager(
-            self, start_processing=True, max_threads=2
-        )
+        # create background task managers, one per lane. The interactive
+        # lane is used for everything the user is waiting for.
+        self._task_lanes = TaskLanes(self)
+        self._task_manager = self._task_lanes.interactive
 
         # register the data fetcher with the global schema manager
         shotgun_globals.register_bg_task_manager(self._task_manager)
@@ -145,6 +182,10 @@ class AppDialog(QtGui.QWidget):
         # flag to keep track of when we are navigating
         self._navigating = False
 
+        # generations of locations, used to cancel work for locations
+        # the user has left
+        self._navigation_tracker = NavigationTracker()
+
         # hook up a data retriever with all objects needing to talk to sg
         self.ui.search_input.set_bg_task_manager(self._task_manager)
         self.ui.note_reply_widget.set_bg_task_manager(self._task_manager)
@@ -167,6 +208,21 @@ class AppDialog(QtGui.QWidget):
         self._history_items = []
         self._history_index = 0
 
+        # bounds the memory used by the thumbnails of the tabs and the history
+        self._pixmap_budget = PixmapBudget(
+            self._app.get_setting("pixmap_memory_budget") * 1024 * 1024
+        )
+
+        # snapshots of what was displayed for recently visited locations,
+        # used to repaint the panel right away when stepping through history
+        self._snapshots = NavigationSnapshotCache(
+            self._app.get_setting("navigation_snapshot_max_age"), self._pixmap_budget
+        )
+        # snapshot being restored while stepping through history
+        self._history_snapshot = None
+        # time at which the data for the current location was refreshed
+        self._location_refreshed_at = None
+
         # overlay to show messages
         self._overlay = overlay_module.ShotgunOverlayWidget(self)
 
@@ -175,6 +231,10 @@ class AppDialog(QtGui.QWidget):
             self._app.sgtk
         )
 
+        # identities of loaded publishes, so that version histories
+        # can be loaded without looking up the publish first
+        self._publish_identity_cache = PublishIdentityCache(self._publish_entity_type)
+
         # create a settings manager where we can pull and push prefs later
         # prefs in this manager are shared
         self._settings_manager = settings.UserSettings(self._app)
@@ -190,14 +250,32 @@ class AppDialog(QtGui.QWidget):
         self.ui.search_input.entity_selected.connect(self._on_search_item_selected)
 
         # model to get the current user's details
-        self._current_user_model = SgCurrentUserModel(self, self._task_manager)
+        self._current_user_model = SgCurrentUserModel(
+            self, self._task_lanes.thumbnails
+        )
         self._current_user_model.thumbnail_updated.connect(self._update_current_user)
         self._current_user_model.data_updated.connect(self._update_current_user)
         self._current_user_model.load()
         self.ui.current_user.clicked.connect(self._on_user_home_clicked)
 
+        # broker merging overlapping requests for single entities, such as those
+        # of the info tab and the publish history. The details model serves
+        # the requests its fields cover.
+        self._query_broker = QueryBroker(self, self._task_manager)
+
+        # thumbnails for the tabs are composited on the thumbnail lane
+        self._thumbnail_compositor = ThumbnailCompositor(
+            self, self._task_lanes.thumbnails
+        )
+        # keep the composited thumbnails on disk within their budget
+        self._task_lanes.prefetch.add_task(
+            self._app.formatter_registry.thumbnail_cache.prune
+        )
+
         # top detail section
-        self._details_model = SgEntityDetailsModel(self, self._task_manager)
+        self._details_model = SgEntityDetailsModel(
+            self, self._task_manager, self._query_broker
+        )
         self._details_overlay = ShotgunModelOverlayWidget(
             self._details_model, self.ui.top_group
         )
@@ -212,15 +290,52 @@ class AppDialog(QtGui.QWidget):
         # notes
         self.ui.note_reply_widget.entity_requested.connect(self.navigate_to_entity)
 
+        # prefetching of details for the rows visible in the current tab
+        self._details_prefetcher = DetailsPrefetcher(
+            self,
+            self._task_lanes.prefetch,
+            self._create_prefetch_tab_model,
+            self._query_broker,
+        )
+        self._details_prefetch_timer = QtCore.QTimer(self)
+        self._details_prefetch_timer.setSingleShot(True)
+        self._details_prefetch_timer.setInterval(PREFETCH_DELAY_MILLISECONDS)
+        self._details_prefetch_timer.timeout.connect(self._update_details_prefetch)
+
         # build the tabs for the entity page
         self._entity_tabs = self.build_entity_tabs()
         # The current visible tabs. This will change based on the current entity type
         self._current_entity_tabs = []
         self.ui.entity_tab_widget.currentChanged.connect(self._load_entity_tab_data)
+        self.ui.entity_tab_widget.currentChanged.connect(
+            lambda index: self._details_prefetch_timer.start()
+        )
+
+        # prefetching of hidden tabs
+        self._tab_prefetch_queue = []
+        self._tab_prefetch_task_id = None
+        # (tab name, load key, model) for the tab being prefetched
+        self._tab_prefetch = None
+        # load keys for tabs that have been prefetched for the current location
+        self._prefetched_tabs = {}
+        self._task_lanes.prefetch.task_completed.connect(
+            self._on_tab_prefetch_task_completed
+        )
 
         # the set work area overlay
         self.ui.set_context.change_work_area.connect(self._change_work_area)
 
+        # optionally watch the event log and refresh what is displayed
+        # for entities which change while the panel is open
+        self._event_watcher = None
+        poll_interval = self._app.get_setting("event_log_poll_interval")
+        if poll_interval > 0:
+            self._event_watcher = EventLogWatcher(
+                self, self._task_lanes.prefetch, poll_interval
+            )
+            self._event_watcher.entities_changed.connect(self._on_entities_changed)
+            self._event_watcher.start()
+
         # kick off
         self._on_home_clicked()
 
@@ -257,14 +372,21 @@ class AppDialog(QtGui.QWidget):
             shotgun_globals.unregister_bg_task_manager(self._task_manager)
 
             # shut down models
+            if self._event_watcher:
+                self._event_watcher.destroy()
+            self._details_prefetch_timer.stop()
+            self._details_prefetcher.destroy()
+            self._cancel_tab_prefetch()
             self._details_model.destroy()
             self._current_user_model.destroy()
             for tab_dict in self._entity_tabs.values():
                 if tab_dict.get("model", None):
                     tab_dict["model"].destroy()
+            self._query_broker.destroy()
+            self._thumbnail_compositor.destroy()
 
-            # shut down main threadpool
-            self._task_manager.shut_down()
+            # shut down all threadpools
+            self._task_lanes.shut_down()
 
         except Exception as e:
             self._app.log_exception("Error running SG Panel App closeEvent()")
@@ -288,10 +410,84 @@ class AppDialog(QtGui.QWidget):
         else:
             self.setup_ui()
 
+    def _on_entities_changed(self, changes):
+        """
+        Refreshes only what displays entities which have changed, as
+        reported by the event log watcher.
+
+        :param changes: List of (entity_type, entity_id, created) tuples
+        """
+        keys = set((entity_type, entity_id) for (entity_type, entity_id, _) in changes)
+        created_types = set(
+            entity_type for (entity_type, _, created) in changes if created
+        )
+
+        for key in keys:
+            self._query_broker.forget(*key)
+        num_discarded = self._snapshots.invalidate(keys)
+
+        location = self._current_location
+        if location is None:
+            return
+        location_changed = (location.entity_type, location.entity_id) in keys
+
+        if location.entity_type == "Note":
+            if location_changed:
+                self.ui.note_reply_widget.load_data(location.entity_dict)
+            return
+
+        if location_changed:
+            # the snapshot being restored, if any, is out of date
+            self._history_snapshot = None
+            self._details_model.load_data(location)
+
+        current_index = self.ui.entity_tab_widget.currentIndex()
+        num_refreshed = 0
+        for (index, tab_name) in enumerate(self._current_entity_tabs):
+            model = self._entity_tabs[tab_name].get("model")
+            if isinstance(model, SgEntityListingModel):
+                entity_type = model.get_formatter().entity_type
+                if entity_type not in created_types and not any(
+                    (entity_type, entity_id) in keys for entity_id in model.entity_ids
+                ):
+                    continue
+            elif not location_changed:
+                continue
+
+            if index != current_index:
+                # hidden tabs are loaded again when they are shown
+                self._prefetched_tabs.pop(tab_name, None)
+            elif isinstance(model, SgEntityListingModel):
+                model.refresh_changes()
+                num_refreshed += 1
+            else:
+                self._load_entity_tab_data(index)
+                num_refreshed += 1
+
+        self._app.log_debug(
+            "%d entities changed, refreshed %d tabs and discarded %d snapshots."
+            % (len(keys), num_refreshed, num_discarded)
+        )
+
     def setup_ui(self):
         """
         sets up the UI for the current location
         """
+        snapshot = self._history_snapshot
+        refresh = snapshot is None or not self._snapshots.is_fresh(snapshot)
+        if refresh:
+            self._location_refreshed_at = time.time()
+        else:
+            self._app.log_debug("Restoring %r without refreshing." % snapshot)
+            self._location_refreshed_at = snapshot.timestamp
+
+        if self._navigation_tracker.navigate(
+            self._current_location.entity_type, self._current_location.entity_id
+        ):
+            self._cancel_stale_work()
+        else:
+            self._cancel_tab_prefetch()
+            self._details_prefetcher.cancel()
 
         if self._current_location.entity_type == "Note":
             self.focus_note()
@@ -300,7 +496,13 @@ class AppDialog(QtGui.QWidget):
             self.focus_entity()
 
         # update the details area
-        self._details_model.load_data(self._current_location)
+        self._details_model.load_data(self._current_location, refresh=refresh)
+        if snapshot:
+            self._restore_details_snapshot(snapshot)
+
+        if self._current_location.entity_type != "Note":
+            # once the visible data has loaded, warm up the hidden tabs
+            self._schedule_tab_prefetch()
 
         # update the work area button
         self.ui.set_context.set_up(
@@ -392,7 +594,8 @@ class AppDialog(QtGui.QWidget):
         :param checked: boolean indicating if the latest publishes box is checked.
         """
         # store setting
-        self._settings_manager.store("latest_publishes_only", checked)
+        (setting, _) = self.ENTITY_TAB_FILTER_SETTINGS[self.ENTITY_TAB_PUBLISHES]
+        self._settings_manager.store(setting, checked)
 
         # refresh the publishes tab
         self._load_entity_tab_data(self.ui.entity_tab_widget.currentIndex())
@@ -404,11 +607,32 @@ class AppDialog(QtGui.QWidget):
         :param checked: boolean indicating if the pending versions only box is checked.
         """
         # store setting
-        self._settings_manager.store("pending_versions_only", checked)
+        (setting, _) = self.ENTITY_TAB_FILTER_SETTINGS[self.ENTITY_TAB_VERSIONS]
+        self._settings_manager.store(setting, checked)
 
         # refresh the versions tab
         self._load_entity_tab_data(self.ui.entity_tab_widget.currentIndex())
 
+    def _cancel_stale_work(self):
+        """
+        Cancels all outstanding work belonging to the previous location,
+        so that it doesn't compete with the work for the new location.
+        """
+        tracker = self._navigation_tracker
+        tracker.record_cancelled("tab prefetch", self._cancel_tab_prefetch())
+        tracker.record_cancelled("details prefetch", self._details_prefetcher.cancel())
+        tracker.record_cancelled("entity query", self._query_broker.cancel_all())
+        tracker.record_cancelled(
+            "thumbnail compositing", self._thumbnail_compositor.cancel()
+        )
+
+        for (tab_name, tab) in self._entity_tabs.items():
+            model = tab.get("model")
+            if isinstance(model, SgEntityListingModel):
+                tracker.record_cancelled(
+                    "%s tab query" % tab_name, model.cancel_pending_work()
+                )
+
     def _load_entity_tab_data(self, index):
         """
         Loads the data for one of the UI tabs in the entity family
@@ -432,43 +656,343 @@ class AppDialog(QtGui.QWidget):
                 self._entity_tabs[tab_name]["view"].selectionModel().clear()
 
             if tab.get("model", None):
-                args = []
-                kwargs = {}
-
-                if tab_name == self.ENTITY_TAB_ACTIVITY_STREAM:
-                    args = [self._current_location.entity_dict]
-
-                elif tab_name == self.ENTITY_TAB_VERSIONS:
-                    show_pending_only = (
-                        tab["filter_checkbox"].isEnabled()
-                        and tab["filter_checkbox"].isChecked()
-                    )
+                if tab_name == self.ENTITY_TAB_VERSIONS:
                     formatter = self._current_location.sg_formatter
-                    tooltip = formatter.get_tab_data(tab_name, "tooltip", None)
-                    tab["model"].tooltip = tooltip
-                    sort_field = formatter.get_tab_data(tab_name, "sort", "id")
-
-                    args = [self._current_location, show_pending_only]
-                    kwargs = {"sort_field": sort_field}
-
-                elif tab_name == self.ENTITY_TAB_PUBLISHES:
-                    show_latest_only = (
-                        tab["filter_checkbox"].isEnabled()
-                        and tab["filter_checkbox"].isChecked()
+                    tab["model"].tooltip = formatter.get_tab_data(
+                        tab_name, "tooltip", None
                     )
-                    args = [self._current_location, show_latest_only]
-
-                else:
-                    args = [self._current_location]
 
+                (args, kwargs) = self._get_entity_tab_load_args(tab_name)
+
+                load_key = self._get_entity_tab_load_key(args, kwargs)
+
+                snapshot = self._history_snapshot
+                if not (
+                    snapshot
+                    and snapshot.tab_name == tab_name
+                    and snapshot.tab_load_key == load_key
+                    and snapshot.list_items is not None
+                ):
+                    snapshot = None
+                elif self._snapshots.is_fresh(snapshot):
+                    kwargs["refresh"] = False
+
+                if self._prefetched_tabs.pop(tab_name, None) == load_key:
+                    # the cache was refreshed in the background for this location
+                    self._app.log_debug("Showing prefetched %s tab." % tab_name)
+                    kwargs["refresh"] = False
                 tab["model"].load_data(*args, **kwargs)
 
+                if snapshot:
+                    self._restore_tab_snapshot(tab, snapshot)
+
         else:
             self._app.log_error(
                 "Cannot load data for unknown entity tab %s, index %s."
                 % (tab_name, index)
             )
 
+    ###################################################################################################
+    # navigation snapshots
+
+    def _store_snapshot(self):
+        """
+        Takes a snapshot of what is displayed for the current location,
+        typically because the user is about to navigate away from it.
+        """
+        sg_location = self._current_location
+        if (
+            sg_location is None
+            or sg_location.entity_type == "Note"
+            or self._location_refreshed_at is None
+        ):
+            # the note page is not covered by snapshots
+            return
+
+        details = {
+            "header": self.ui.details_text_header.text(),
+            "header_tooltip": self.ui.details_text_header.toolTip(),
+            "body": self.ui.details_text_middle.text(),
+            "body_tooltip": self.ui.details_text_middle.toolTip(),
+            "pixmap": self._details_model.get_pixmap(),
+        }
+
+        tab_name = sg_location.tab
+        tab = self._entity_tabs.get(tab_name) or {}
+        model = tab.get("model")
+        tab_load_key = None
+        list_items = None
+        if isinstance(model, SgEntityListingModel):
+            (args, kwargs) = self._get_entity_tab_load_args(tab_name)
+            tab_load_key = self._get_entity_tab_load_key(args, kwargs)
+            list_items = model.get_list_item_snapshot()
+
+        snapshot = NavigationSnapshot(
+            self._location_refreshed_at, details, tab_name, tab_load_key, list_items
+        )
+
+        view = tab.get("view")
+        if view and list_items is not None:
+            snapshot.scroll_position = view.verticalScrollBar().value()
+            for model_index in view.selectionModel().selectedIndexes():
+                sg_data = shotgun_model.get_sg_data(model_index)
+                if sg_data:
+                    snapshot.selected_entities.append((sg_data["type"], sg_data["id"]))
+
+        self._snapshots.store(sg_location.entity_type, sg_location.entity_id, snapshot)
+
+    def _restore_details_snapshot(self, snapshot):
+        """
+        Repaints the details area from a snapshot
+
+        :param snapshot: :class:`NavigationSnapshot` to restore
+        """
+        details = snapshot.details
+        self.ui.details_text_header.setText(details["header"])
+        self.ui.details_text_header.setToolTip(details["header_tooltip"])
+        self.ui.details_text_middle.setText(details["body"])
+        self.ui.details_text_middle.setToolTip(details["body_tooltip"])
+        if details["pixmap"]:
+            self.ui.details_thumb.setPixmap(details["pixmap"])
+
+    def _restore_tab_snapshot(self, tab, snapshot):
+        """
+        Repaints the rows of a listing tab from a snapshot and
+        restores its selection and scroll position.
+
+        :param tab: Entity tab dictionary
+        :param snapshot: :class:`NavigationSnapshot` to restore
+        """
+        tab["model"].restore_list_item_snapshot(snapshot.list_items)
+
+        view = tab.get("view")
+        if not view:
+            return
+
+        selected_entities = set(snapshot.selected_entities)
+        if selected_entities:
+            proxy_model = view.model()
+            for row in range(proxy_model.rowCount()):
+                model_index = proxy_model.index(row, 0)
+                sg_data = shotgun_model.get_sg_data(model_index)
+                if sg_data and (sg_data["type"], sg_data["id"]) in selected_entities:
+                    view.selectionModel().select(
+                        model_index, QtGui.QItemSelectionModel.Select
+                    )
+
+        # the view lays out its rows once control returns to the event loop
+        QtCore.QTimer.singleShot(
+            0,
+            functools.partial(
+                view.verticalScrollBar().setValue, snapshot.scroll_position
+            ),
+        )
+
+    def _get_entity_tab_load_args(self, tab_name, sg_location=None):
+        """
+        Returns the arguments to load the model of an entity tab with.
+
+        :param tab_name: Name of the entity tab
+        :param sg_location: Location to load the tab for. Defaults to
+            the current location.
+        :returns: Tuple with a list of args and a dictionary of kwargs
+        """
+        filter_checkbox = self._entity_tabs[tab_name].get("filter_checkbox")
+        return self.get_entity_tab_load_args(
+            tab_name,
+            sg_location or self._current_location,
+            bool(filter_checkbox and filter_checkbox.isChecked()),
+        )
+
+    @classmethod
+    def get_entity_tab_load_args(cls, tab_name, sg_location, filter_checked):
+        """
+        Returns the arguments to load the model of an entity tab with,
+        for the given state of the filter checkbox of the tab.
+
+        :param tab_name: Name of the entity tab
+        :param sg_location: Location to load the tab for
+        :param filter_checked: True if the filter checkbox of the tab is checked
+        :returns: Tuple with a list of args and a dictionary of kwargs
+        """
+        args = []
+        kwargs = {}
+
+        if tab_name == cls.ENTITY_TAB_ACTIVITY_STREAM:
+            args = [sg_location.entity_dict]
+
+        elif tab_name == cls.ENTITY_TAB_VERSIONS:
+            # note: the checkbox is only enabled if the current
+            # location supports it
+            show_pending_only = (
+                bool(
+                    sg_location.sg_formatter.get_tab_data(
+                        tab_name, "enable_checkbox", default_value=False
+                    )
+                )
+                and filter_checked
+            )
+            sort_field = sg_location.sg_formatter.get_tab_data(tab_name, "sort", "id")
+
+            args = [sg_location, show_pending_only]
+            kwargs = {"sort_field": sort_field}
+
+        elif tab_name == cls.ENTITY_TAB_PUBLISHES:
+            show_latest_only = (
+                bool(
+                    sg_location.sg_formatter.get_tab_data(
+                        tab_name, "enable_checkbox", default_value=False
+                    )
+                )
+                and filter_checked
+            )
+            args = [sg_location, show_latest_only]
+
+        else:
+            args = [sg_location]
+
+        return (args, kwargs)
+
+    def _get_entity_tab_load_key(self, args, kwargs):
+        """
+        Returns a key identifying the data loaded by a set of tab load arguments
+
+        :param args: List of args, as returned by :meth:`_get_entity_tab_load_args`
+        :param kwargs: Dictionary of kwargs
+        :returns: String key
+        """
+        return repr((args, sorted(kwargs.items())))
+
+    ###################################################################################################
+    # hidden tab prefetching
+
+    def _schedule_tab_prefetch(self):
+        """
+        Queues up background loading of all hidden tabs for the current location
+        """
+        self._tab_prefetch_queue = [
+            tab_name
+            for tab_name in self._current_entity_tabs
+            if tab_name in self.PREFETCH_ENTITY_TABS
+            and tab_name != self._current_location.tab
+            and self._entity_tabs[tab_name].get("model")
+        ]
+        self._queue_next_tab_prefetch()
+
+    def _queue_next_tab_prefetch(self):
+        """
+        Adds a low priority task which will trigger the prefetch
+        of the next hidden tab once it has run.
+        """
+        if not self._tab_prefetch_queue:
+            return
+
+        self._tab_prefetch_task_id = self._task_lanes.prefetch.add_task(
+            self._wait_for_idle_task_manager,
+            priority=self.TAB_PREFETCH_PRIORITY,
+            group=self.TAB_PREFETCH_TASK_GROUP,
+        )
+
+    @staticmethod
+    def _wait_for_idle_task_manager():
+        """
+        Background task which does nothing. It merely marks the
+        point when the task manager has no other work to do.
+        """
+        return None
+
+    def _cancel_tab_prefetch(self):
+        """
+        Stops prefetching hidden tabs, typically because the user navigated
+        to a different location.
+
+        :returns: Number of tabs which were waiting to be prefetched
+        """
+        num_cancelled = len(self._tab_prefetch_queue)
+        self._task_lanes.prefetch.stop_task_group(self.TAB_PREFETCH_TASK_GROUP)
+        self._tab_prefetch_queue = []
+        self._tab_prefetch_task_id = None
+        self._prefetched_tabs = {}
+
+        if self._tab_prefetch:
+            (_, _, model) = self._tab_prefetch
+            self._tab_prefetch = None
+            self._destroy_tab_prefetch_model(model)
+            num_cancelled += 1
+
+        return num_cancelled
+
+    def _on_tab_prefetch_task_completed(self, task_id, group, result):
+        """
+        Called when a background task has completed. Loads the next
+        hidden tab if it was a tab prefetch task.
+
+        :param task_id: Id of the task that completed
+        :param group: Group the task belongs to
+        :param result: Return value of the task
+        """
+        if task_id != self._tab_prefetch_task_id:
+            if group == self.TAB_PREFETCH_TASK_GROUP:
+                # completed after being cancelled
+                self._navigation_tracker.record_dropped("tab prefetch")
+            return
+        self._tab_prefetch_task_id = None
+
+        tab_name = self._tab_prefetch_queue.pop(0)
+        if tab_name == self._current_location.tab:
+            self._queue_next_tab_prefetch()
+            return
+
+        # the tab models run their work on the interactive lane, so the
+        # cache is refreshed by a dedicated model on the prefetch lane
+        self._app.log_debug("Prefetching %s tab." % tab_name)
+        (model, load_model) = self._create_prefetch_tab_model(
+            self._current_location, self, tab_name
+        )
+        (args, kwargs) = self._get_entity_tab_load_args(tab_name)
+        load_key = self._get_entity_tab_load_key(args, kwargs)
+        self._tab_prefetch = (tab_name, load_key, model)
+
+        model.data_refreshed.connect(
+            functools.partial(self._on_tab_prefetch_model_done, model, True)
+        )
+        model.data_refresh_fail.connect(
+            functools.partial(self._on_tab_prefetch_model_done, model, False)
+        )
+        load_model()
+
+    def _on_tab_prefetch_model_done(self, model, success, *args):
+        """
+        Called when the model prefetching a hidden tab has finished
+        refreshing. Moves on to the next hidden tab.
+
+        :param model: The model that finished
+        :param success: False if the model failed to refresh
+        :param args: Signal arguments, ignored
+        """
+        if not self._tab_prefetch or self._tab_prefetch[2] is not model:
+            return
+        (tab_name, load_key, _) = self._tab_prefetch
+        self._tab_prefetch = None
+
+        if success:
+            self._prefetched_tabs[tab_name] = load_key
+
+        # models can't be destroyed from within their own signals
+        QtCore.QTimer.singleShot(
+            0, functools.partial(self._destroy_tab_prefetch_model, model)
+        )
+        self._queue_next_tab_prefetch()
+
+    def _destroy_tab_prefetch_model(self, model):
+        """
+        Shuts down a model used to prefetch a hidden tab
+
+        :param model: Model to destroy
+        """
+        model.destroy()
+        model.deleteLater()
+
     ###################################################################################################
     # top detail area callbacks
 
@@ -549,6 +1073,125 @@ class AppDialog(QtGui.QWidget):
                 sg_location = ShotgunLocation(sg_item["type"], sg_item["id"])
                 self._navigate_to(sg_location)
 
+    def _on_entity_view_scrolled(self, entity_data):
+        """
+        The view of an entity tab was scrolled. Requests more items
+        from the model when the end of the view is near.
+
+        :param entity_data: Entity tab data for the view that was scrolled
+        """
+        self._fetch_entity_view_page(entity_data)
+        self._details_prefetch_timer.start()
+
+    def _on_entity_view_loaded(self, entity_data, *args):
+        """
+        Items were loaded into the model of an entity tab. If they don't
+        fill the view, it can't be scrolled, so more items are requested
+        once the view has laid out the items.
+
+        :param entity_data: Entity tab data for the model that was loaded
+        :param args: Signal arguments, ignored
+        """
+        QtCore.QTimer.singleShot(
+            0, functools.partial(self._fetch_entity_view_page, entity_data)
+        )
+
+    def _fetch_entity_view_page(self, entity_data):
+        """
+        Requests more items from the model of an entity tab if the
+        view is displayed and the end of the view is near.
+
+        :param entity_data: Entity tab data
+        """
+        if not entity_data["view"].isVisible():
+            return
+
+        scroll_bar = entity_data["view"].verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep():
+            entity_data["model"].fetch_next_page()
+
+    def _on_entity_hovered(self, model_index):
+        """
+        The mouse entered an item in the view of an entity tab.
+        Prefetches the details for that item first.
+
+        :param model_index: Index of the item
+        """
+        self._details_prefetcher.prioritize(shotgun_model.get_sg_data(model_index))
+
+    ###################################################################################################
+    # details prefetching
+
+    def _update_details_prefetch(self):
+        """
+        Prefetches details for the items visible in the current tab
+        """
+        index = self.ui.entity_tab_widget.currentIndex()
+        if (
+            self.ui.page_stack.currentIndex() != self.ENTITY_PAGE_IDX
+            or index < 0
+            or index >= len(self._current_entity_tabs)
+        ):
+            return
+
+        view = self._entity_tabs[self._current_entity_tabs[index]].get("view")
+        if view is None or view.model() is None:
+            return
+
+        # get the range of rows currently in the viewport
+        viewport_rect = view.viewport().rect()
+        first_index = view.indexAt(viewport_rect.topLeft())
+        last_index = view.indexAt(viewport_rect.bottomLeft())
+        if not first_index.isValid():
+            return
+        last_row = (
+            last_index.row() if last_index.isValid() else view.model().rowCount() - 1
+        )
+
+        self._details_prefetcher.set_candidates(
+            [
+                shotgun_model.get_sg_data(view.model().index(row, 0))
+                for row in range(first_index.row(), last_row + 1)
+            ]
+        )
+
+    def _create_prefetch_tab_model(self, sg_location, parent, tab_name=None):
+        """
+        Creates a model for prefetching a tab of a location on the prefetch
+        lane. Used for the default tab by the :class:`DetailsPrefetcher`.
+
+        :param sg_location: Location to prefetch
+        :param parent: QT parent object for the model
+        :param tab_name: Tab to prefetch. Defaults to the tab of the location.
+        :returns: Tuple with the model and a callable loading it,
+            or None if the tab cannot be prefetched.
+        """
+        tab_name = tab_name or sg_location.tab
+        if tab_name not in self.PREFETCH_ENTITY_TABS:
+            return None
+
+        if tab_name == self.ENTITY_TAB_INFO:
+            model = SgAllFieldsModel(
+                parent, self._task_lanes.prefetch, self._query_broker
+            )
+        else:
+            tab = self._entity_tabs[tab_name]
+            model = tab["model_class"](
+                tab["entity_type"],
+                parent,
+                self._task_lanes.prefetch,
+                **self._get_entity_model_kwargs(tab["model_class"])
+            )
+            if tab["model_class"] == SgPublishHistoryListingModel:
+                model.set_query_broker(self._query_broker)
+            if tab["entity_type"] == self._publish_entity_type:
+                model.set_publish_identity_cache(self._publish_identity_cache)
+            model.set_thumbnail_compositor(self._thumbnail_compositor)
+            model.set_pixmap_budget(self._pixmap_budget)
+
+        (args, kwargs) = self._get_entity_tab_load_args(tab_name, sg_location)
+        return (model, lambda: model.load_data(*args, **kwargs))
+
     def navigate_to_entity(self, entity_type, entity_id):
         """
         Navigate to a particular entity.
@@ -649,6 +1292,8 @@ class AppDialog(QtGui.QWidget):
 
         :param shotgun_location: Shotgun location object
         """
+        self._store_snapshot()
+
         # chop off history at the point we are currently
         self._history_items = self._history_items[: self._history_index]
         # add new record
@@ -713,33 +1358,47 @@ class AppDialog(QtGui.QWidget):
         """
         Navigate to the next item in the history
         """
+        self._store_snapshot()
+
         self._history_index += 1
         # get the data for this guy (note: index are one based)
         self._current_location = self._history_items[self._history_index - 1]
         self._compute_history_button_visibility()
 
-        # and set up the UI for this new location
+        # and set up the UI for this new location, repainting
+        # it from a snapshot if one is available
+        self._history_snapshot = self._snapshots.get(
+            self._current_location.entity_type, self._current_location.entity_id
+        )
         self._navigating = True
         try:
             self.setup_ui()
         finally:
             self._navigating = False
+            self._history_snapshot = None
 
     def _on_prev_clicked(self):
         """
         Navigate back in history
         """
+        self._store_snapshot()
+
         self._history_index += -1
         # get the data for this guy (note: index are one based)
         self._current_location = self._history_items[self._history_index - 1]
         self._compute_history_button_visibility()
 
-        # and set up the UI for this new location
+        # and set up the UI for this new location, repainting
+        # it from a snapshot if one is available
+        self._history_snapshot = self._snapshots.get(
+            self._current_location.entity_type, self._current_location.entity_id
+        )
         self._navigating = True
         try:
             self.setup_ui()
         finally:
             self._navigating = False
+            self._history_snapshot = None
 
     def _on_search_clicked(self):
         """
@@ -892,35 +1551,14 @@ class AppDialog(QtGui.QWidget):
                 "has_filter": False,
             }
 
-            if entity_tab_name == self.ENTITY_TAB_NOTES:
-                data["model_class"] = SgEntityListingModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = "Note"
-
-            elif entity_tab_name == self.ENTITY_TAB_TASKS:
-                data["model_class"] = SgTaskListingModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = "Task"
-
-            elif entity_tab_name == self.ENTITY_TAB_PUBLISH_HISTORY:
-                data["model_class"] = SgPublishHistoryListingModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = self._publish_entity_type
-
-            elif entity_tab_name == self.ENTITY_TAB_PUBLISH_UPSTREAM:
-                data["model_class"] = SgPublishDependencyUpstreamListingModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = self._publish_entity_type
-
-            elif entity_tab_name == self.ENTITY_TAB_PUBLISH_DOWNSTREAM:
-                data["model_class"] = SgPublishDependencyDownstreamListingModel
+            listing = self.get_entity_tab_listing(
+                entity_tab_name, self._publish_entity_type
+            )
+            if listing:
+                (data["model_class"], data["entity_type"]) = listing
                 data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = self._publish_entity_type
 
-            elif entity_tab_name == self.ENTITY_TAB_VERSIONS:
-                data["model_class"] = SgVersionModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = "Version"
+            if entity_tab_name == self.ENTITY_TAB_VERSIONS:
                 data["has_filter"] = True
 
                 # TODO handle checkbox filters more generically
@@ -928,21 +1566,20 @@ class AppDialog(QtGui.QWidget):
                     entity_tab_name, tab_widget, "Only show versions pending review",
                 )
                 checked = self._settings_manager.retrieve(
-                    "pending_versions_only", False
+                    *self.ENTITY_TAB_FILTER_SETTINGS[entity_tab_name]
                 )
                 checkbox.setChecked(checked)
                 checkbox.toggled.connect(self._on_pending_versions_toggled)
 
             elif entity_tab_name == self.ENTITY_TAB_PUBLISHES:
-                data["model_class"] = SgLatestPublishListingModel
-                data["delegate_class"] = ListItemDelegate
-                data["entity_type"] = self._publish_entity_type
                 data["has_filter"] = True
 
                 checkbox = self.create_entity_tab_checkbox(
                     entity_tab_name, tab_widget, "Only show latest versions"
                 )
-                checked = self._settings_manager.retrieve("latest_publishes_only", True)
+                checked = self._settings_manager.retrieve(
+                    *self.ENTITY_TAB_FILTER_SETTINGS[entity_tab_name]
+                )
                 checkbox.setChecked(checked)
                 checkbox.toggled.connect(self._on_latest_publishes_toggled)
 
@@ -971,7 +1608,7 @@ class AppDialog(QtGui.QWidget):
                 info_widget.link_activated.connect(self._on_link_clicked)
                 tab_widget.layout().addWidget(info_widget)
 
-                model = SgAllFieldsModel(self, self._task_manager)
+                model = SgAllFieldsModel(self, self._task_manager, self._query_broker)
                 model.data_updated.connect(info_widget.set_data)
                 data["model"] = model
 
@@ -1000,6 +1637,38 @@ class AppDialog(QtGui.QWidget):
 
         return tab_data
 
+    @classmethod
+    def get_entity_tab_listing(cls, tab_name, publish_entity_type):
+        """
+        Returns the model class and the entity type listed by an entity tab
+
+        :param tab_name: Name of the entity tab
+        :param publish_entity_type: Entity type used for publishes
+        :returns: Tuple with the model class and the entity type,
+            or None if the tab doesn't display a listing.
+        """
+        return {
+            cls.ENTITY_TAB_NOTES: (SgEntityListingModel, "Note"),
+            cls.ENTITY_TAB_TASKS: (SgTaskListingModel, "Task"),
+            cls.ENTITY_TAB_PUBLISH_HISTORY: (
+                SgPublishHistoryListingModel,
+                publish_entity_type,
+            ),
+            cls.ENTITY_TAB_PUBLISH_UPSTREAM: (
+                SgPublishDependencyUpstreamListingModel,
+                publish_entity_type,
+            ),
+            cls.ENTITY_TAB_PUBLISH_DOWNSTREAM: (
+                SgPublishDependencyDownstreamListingModel,
+                publish_entity_type,
+            ),
+            cls.ENTITY_TAB_VERSIONS: (SgVersionModel, "Version"),
+            cls.ENTITY_TAB_PUBLISHES: (
+                SgLatestPublishListingModel,
+                publish_entity_type,
+            ),
+        }.get(tab_name)
+
     def create_entity_tab_widget(self, name):
         """
         Create a QWidget to be used by an entity tab.
@@ -1080,6 +1749,17 @@ class AppDialog(QtGui.QWidget):
         checkbox.setObjectName("entity_" + name + "_checkbox")
         return checkbox
 
+    def _get_entity_model_kwargs(self, model_class):
+        """
+        Returns additional constructor arguments for an entity tab model class
+
+        :param model_class: Entity tab model class
+        :returns: Dictionary of keyword arguments
+        """
+        if model_class == SgTaskListingModel:
+            return {"thumbnail_task_manager": self._task_lanes.thumbnails}
+        return {}
+
     def setup_entity_model_view(self, entity_data):
         """
         Given the entiy tab data, set up a model and view for the tab. This method
@@ -1106,7 +1786,10 @@ class AppDialog(QtGui.QWidget):
 
         # create model
         entity_data["model"] = ModelClass(
-            entity_data["entity_type"], entity_data["view"], self._task_manager
+            entity_data["entity_type"],
+            entity_data["view"],
+            self._task_manager,
+            **self._get_entity_model_kwargs(ModelClass)
         )
 
         # create proxy for sorting
@@ -1124,6 +1807,11 @@ class AppDialog(QtGui.QWidget):
         entity_data["sort_proxy"].setDynamicSortFilter(True)
         entity_data["sort_proxy"].sort(0, QtCore.Qt.DescendingOrder)
 
+        if ModelClass == SgLatestPublishListingModel:
+            # the model flags the items to show in latest only mode
+            entity_data["sort_proxy"].setFilterRole(ModelClass.LATEST_FILTER_ROLE)
+            entity_data["sort_proxy"].setFilterFixedString(ModelClass.SHOWN)
+
         # set up model
         entity_data["view"].setModel(entity_data["sort_proxy"])
         # set up a global on-click handler for
@@ -1140,6 +1828,36 @@ class AppDialog(QtGui.QWidget):
             entity_data["model"], entity_data["view"]
         )
 
+        if isinstance(entity_data["model"], SgEntityListingModel):
+            # load more items as the user scrolls towards the end of the list
+            entity_data["view"].verticalScrollBar().valueChanged.connect(
+                lambda value, data=entity_data: self._on_entity_view_scrolled(data)
+            )
+            entity_data["model"].data_refreshed.connect(
+                functools.partial(self._on_entity_view_loaded, entity_data)
+            )
+            entity_data["model"].cache_loaded.connect(
+                functools.partial(self._on_entity_view_loaded, entity_data)
+            )
+
+            # prefetch details for the visible items, hovered items first
+            entity_data["model"].data_refreshed.connect(
+                lambda *args: self._details_prefetch_timer.start()
+            )
+            entity_data["model"].cache_loaded.connect(
+                lambda *args: self._details_prefetch_timer.start()
+            )
+            entity_data["view"].setMouseTracking(True)
+            entity_data["view"].entered.connect(self._on_entity_hovered)
+
+            if entity_data["entity_type"] == self._publish_entity_type:
+                entity_data["model"].set_publish_identity_cache(
+                    self._publish_identity_cache
+                )
+            entity_data["model"].set_thumbnail_compositor(self._thumbnail_compositor)
+            entity_data["model"].set_pixmap_budget(self._pixmap_budget)
+
         if ModelClass == SgPublishHistoryListingModel:
             # this class needs special access to the overlay
             entity_data["model"].set_overlay(entity_data["overlay"])
+            entity_data["model"].set_query_broker(self._query_broker)
@@ -0,0 +1,130 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Queries of the Shotgun event log used by :class:`EventLogWatcher`.
+
+These only use the Shotgun API, so they can be run against a mock
+Shotgun connection.
+"""
+
+import collections
+
+# maximum number of events fetched per poll
+MAX_EVENTS_PER_POLL = 500
+
+# entity types displayed by the panel which don't belong to a project.
+# Events about them have no project, so they are fetched in addition
+# to the events of the current project.
+NON_PROJECT_ENTITY_TYPES = [
+    "HumanUser",
+    "ApiUser",
+    "ClientUser",
+    "Group",
+    "Department",
+]
+
+
+def fetch_latest_event_id(sg, project=None):
+    """
+    Returns the id of the most recent event
+
+    :param sg: Shotgun connection
+    :param project: Optional project entity dictionary to restrict events to
+    :returns: Event id or 0 if there are no events
+    """
+    sg_data = sg.find_one(
+        "EventLogEntry",
+        _get_filters(project),
+        ["id"],
+        order=[{"field_name": "id", "direction": "desc"}],
+    )
+    return sg_data["id"] if sg_data else 0
+
+
+def fetch_events(sg, last_event_id, project=None):
+    """
+    Returns the events after an event, oldest first
+
+    :param sg: Shotgun connection
+    :param last_event_id: Id of the last event seen
+    :param project: Optional project entity dictionary to restrict events to
+    :returns: List of EventLogEntry dictionaries
+    """
+    return sg.find(
+        "EventLogEntry",
+        _get_filters(project) + [["id", "greater_than", last_event_id]],
+        ["id", "event_type", "entity", "meta"],
+        order=[{"field_name": "id", "direction": "asc"}],
+        limit=MAX_EVENTS_PER_POLL,
+    )
+
+
+def get_changed_entities(events):
+    """
+    Maps events to the entities they are about
+
+    :param events: List of EventLogEntry dictionaries
+    :returns: List of (entity_type, entity_id, created) tuples, in the
+        order the entities first changed
+    """
+    changes = collections.OrderedDict()
+    for event in events:
+        # the entity link is empty for retired entities,
+        # but the event metadata still identifies them
+        meta = event.get("meta") or {}
+        entity = event.get("entity") or {}
+        entity_type = meta.get("entity_type") or entity.get("type")
+        entity_id = meta.get("entity_id") or entity.get("id")
+        if not entity_type or not entity_id:
+            continue
+
+        created = meta.get("type") in ("new_entity", "entity_revival")
+        key = (entity_type, entity_id)
+        changes[key] = changes.get(key, False) or created
+
+    return [
+        (entity_type, entity_id, created)
+        for ((entity_type, entity_id), created) in changes.items()
+    ]
+
+
+def _get_filters(project):
+    """
+    Returns the filters restricting events to a project. Events without
+    a project are kept for the entity types which don't belong to one.
+
+    :param project: Project entity dictionary or None
+    :returns: List of filters
+    """
+    if not project:
+        return []
+
+    # event types are named Shotgun_<entity type>_<change>,
+    # which also covers events about retired entities
+    non_project_filters = {
+        "filter_operator": "any",
+        "filters": [
+            ["event_type", "starts_with", "Shotgun_%s_" % entity_type]
+            for entity_type in NON_PROJECT_ENTITY_TYPES
+        ],
+    }
+    return [
+        {
+            "filter_operator": "any",
+            "filters": [
+                ["project", "is", project],
+                {
+                    "filter_operator": "all",
+                    "filters": [["project", "is", None], non_project_filters],
+                },
+            ],
+        }
+    ]
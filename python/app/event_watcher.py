@@ -0,0 +1,176 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from . import event_log
+
+shotgun_data = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_data"
+)
+shotgun_model = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_model"
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class EventLogWatcher(QtCore.QObject):
+    """
+    Polls the Shotgun event log in the background and reports which
+    entities have changed, so that only the data displaying them needs
+    to be refreshed.
+
+    When started, the watcher looks up the most recent event and from
+    then on fetches the events after the last one it has seen, every
+    interval seconds. Events are mapped to the entity they are about,
+    including entities which have been retired.
+
+    The queries are made by the functions of the event_log module, which
+    only use the Shotgun API. A connection passed to the constructor is
+    used instead of the connection of the data retriever.
+
+    :signal entities_changed(list): Emitted with a list of
+        (entity_type, entity_id, created) tuples for the entities which
+        have changed since the previous poll. created is True if the
+        entity has been created or revived.
+    """
+
+    entities_changed = QtCore.Signal(list)
+
+    def __init__(self, parent, bg_task_manager, interval, shotgun=None):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        :param bg_task_manager: Task manager used to poll the event log
+        :param interval: Number of seconds between polls
+        :param shotgun: Optional Shotgun connection to poll with
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self._app = sgtk.platform.current_bundle()
+        self._shotgun = shotgun
+
+        project = self._app.context.project
+        self._project = {"type": "Project", "id": project["id"]} if project else None
+
+        # id of the last event seen, None until the watcher has started
+        self._last_event_id = None
+        # uid of the poll in flight
+        self._poll_uid = None
+
+        self._sg_data_retriever = shotgun_data.ShotgunDataRetriever(
+            self, bg_task_manager=bg_task_manager
+        )
+        self._sg_data_retriever.start()
+        self._sg_data_retriever.work_completed.connect(self._on_worker_signal)
+        self._sg_data_retriever.work_failure.connect(self._on_worker_failure)
+
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setInterval(int(interval * 1000))
+        self._poll_timer.timeout.connect(self.poll)
+
+    def __repr__(self):
+        return "<Event log watcher after event %s>" % self._last_event_id
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self.stop()
+        self._sg_data_retriever.stop()
+
+    ############################################################################################
+    # public interface
+
+    def start(self):
+        """
+        Starts polling the event log
+        """
+        self._poll_timer.start()
+        self.poll()
+
+    def stop(self):
+        """
+        Stops polling the event log. Events which happen while the
+        watcher is stopped are picked up once it is started again.
+        """
+        self._poll_timer.stop()
+        if self._poll_uid:
+            self._sg_data_retriever.stop_work(self._poll_uid)
+            self._poll_uid = None
+
+    def poll(self):
+        """
+        Fetches the events since the previous poll in the background.
+        Does nothing if a poll is already in flight.
+        """
+        if self._poll_uid:
+            return
+
+        data = {"last_event_id": self._last_event_id, "project": self._project}
+        uid = self._sg_data_retriever.execute_method(self._poll_event_log, data)
+        self._poll_uid = shotgun_model.sanitize_qt(uid)
+
+    ############################################################################################
+    # internal methods
+
+    def _poll_event_log(self, sg, data):
+        """
+        Async callback called by the data retriever.
+        Fetches the events after the last event seen.
+
+        :param sg: Shotgun connection of the data retriever
+        :param data: Dictionary with the last event id and the project
+        :returns: Tuple with the id of the last event and a list of changes
+        """
+        sg = self._shotgun or sg
+        if data["last_event_id"] is None:
+            # only report changes made after the watcher started
+            return (event_log.fetch_latest_event_id(sg, data["project"]), [])
+
+        events = event_log.fetch_events(sg, data["last_event_id"], data["project"])
+        if not events:
+            return (data["last_event_id"], [])
+        return (events[-1]["id"], event_log.get_changed_entities(events))
+
+    def _on_worker_signal(self, uid, request_type, data):
+        """
+        Signaled whenever the worker completes something.
+
+        :param uid: Unique id for request
+        :param request_type: String identifying the request class
+        :param data: the data that was returned
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if uid != self._poll_uid:
+            return
+        self._poll_uid = None
+
+        (self._last_event_id, changes) = shotgun_model.sanitize_qt(data)["return_value"]
+        if changes:
+            logger.debug("%d entities changed, %r", len(changes), self)
+            self.entities_changed.emit(changes)
+
+    def _on_worker_failure(self, uid, msg):
+        """
+        Asynchronous callback - the worker thread errored.
+
+        :param uid: Unique id for request that failed
+        :param msg: Error message
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if uid != self._poll_uid:
+            return
+        self._poll_uid = None
+        # the next poll picks up from the same event
+        logger.debug("Could not poll the event log: %s", shotgun_model.sanitize_qt(msg))
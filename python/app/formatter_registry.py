@@ -0,0 +1,326 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import time
+import inspect
+
+import sgtk
+from sgtk.platform.qt import QtGui
+
+from .shotgun_formatter import ShotgunTypeData
+from .schema_lookup import SchemaLookup
+from .hook_result_cache import HookResultCache
+from .utils import TimestampFormatter
+from .avatar_cache import AvatarCache
+from .thumbnail_cache import ThumbnailCache
+
+shotgun_globals = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_globals"
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class FormatterRegistry(object):
+    """
+    Process wide registry of entity type formatting data.
+
+    Building the formatting data for an entity type means running all
+    the shotgun_fields hook methods and compiling the returned token
+    strings. The registry does this once per entity type and shares the
+    resulting :class:`ShotgunTypeData` with all formatters, so that
+    creating a formatter for a location, a listing or the info tab is cheap.
+
+    The registry is owned by the app instance, which means that it is
+    rebuilt whenever the engine is reloaded. It is also cleared out whenever
+    the shotgun_fields hook files change on disk.
+
+    Unless disabled via the cache_shotgun_fields_hook setting, hook results
+    are also persisted in a :class:`HookResultCache`, so that subsequent
+    sessions only have to run the hook methods whose results depend on
+    the schema.
+    """
+
+    # the hook methods whose return values make up the type data
+    HOOK_METHODS = [
+        "get_list_item_definition",
+        "get_all_fields",
+        "get_main_view_definition",
+        "get_entity_tabs_definition",
+        "get_entity_default_tab",
+    ]
+
+    # the hook methods whose return values contain display names from the
+    # schema. These are never persisted, since the schema can change
+    # without the hook files changing.
+    SCHEMA_HOOK_METHODS = ["get_entity_tabs_definition"]
+
+    # minimum number of seconds between checks for modified hook files
+    HOOK_CHECK_INTERVAL = 2.0
+
+    # name of the hook result cache file in the app cache location
+    HOOK_CACHE_FILE_NAME = "shotgun_fields_hook_cache.json"
+
+    # name of the composited thumbnail folder in the app cache location
+    THUMBNAIL_CACHE_FOLDER_NAME = "composited_thumbnails"
+
+    def __init__(self, app):
+        """
+        Constructor
+
+        :param app: The app instance owning the registry.
+        """
+        self._app = app
+        self._type_data = {}
+        self._round_default_pixmap = None
+        self._rect_default_pixmap = None
+        self._schema_lookup = SchemaLookup()
+        self._timestamp_formatter = TimestampFormatter()
+        self._avatar_cache = AvatarCache()
+        self._thumbnail_cache = ThumbnailCache(
+            os.path.join(self._app.cache_location, self.THUMBNAIL_CACHE_FOLDER_NAME)
+        )
+
+        self._hook_paths = self._get_hook_paths()
+        self._hook_signature = self._get_hook_signature()
+        self._last_hook_check = time.time()
+
+        self._hook_result_cache = None
+        if self._app.get_setting("cache_shotgun_fields_hook"):
+            self._hook_result_cache = HookResultCache(
+                os.path.join(self._app.cache_location, self.HOOK_CACHE_FILE_NAME),
+                self._hook_paths,
+            )
+
+    def __repr__(self):
+        return "<SG formatter registry with %d types>" % len(self._type_data)
+
+    ###############################################################################################
+    # properties
+
+    @property
+    def round_default_pixmap(self):
+        """
+        Default pixmap used for round thumbnails
+        """
+        if self._round_default_pixmap is None:
+            self._round_default_pixmap = QtGui.QPixmap(
+                ":/tk_multi_infopanel/round_512x400.png"
+            )
+        return self._round_default_pixmap
+
+    @property
+    def rect_default_pixmap(self):
+        """
+        Default pixmap used for rectangular thumbnails
+        """
+        if self._rect_default_pixmap is None:
+            self._rect_default_pixmap = QtGui.QPixmap(
+                ":/tk_multi_infopanel/rect_512x400.png"
+            )
+        return self._rect_default_pixmap
+
+    @property
+    def schema_lookup(self):
+        """
+        The :class:`SchemaLookup` used to format values
+        """
+        return self._schema_lookup
+
+    @property
+    def timestamp_formatter(self):
+        """
+        The :class:`TimestampFormatter` used to format timestamps
+        """
+        return self._timestamp_formatter
+
+    @property
+    def avatar_cache(self):
+        """
+        The :class:`AvatarCache` holding user avatars
+        """
+        return self._avatar_cache
+
+    @property
+    def thumbnail_cache(self):
+        """
+        The :class:`ThumbnailCache` holding composited thumbnails
+        """
+        return self._thumbnail_cache
+
+    @property
+    def hook_paths(self):
+        """
+        Paths to the files making up the shotgun_fields hook. This may
+        be an empty list in case the paths cannot be determined.
+        """
+        return list(self._hook_paths)
+
+    ###############################################################################################
+    # public interface
+
+    def get_type_data(self, entity_type):
+        """
+        Returns the formatting data for the given entity type,
+        running the shotgun_fields hook if needed.
+
+        :param entity_type: Shotgun entity type
+        :returns: :class:`ShotgunTypeData` instance
+        """
+        self._check_hook_files()
+
+        type_data = self._type_data.get(entity_type)
+        if type_data is None:
+            hook_data = self._execute_hook_methods(entity_type)
+            type_data = ShotgunTypeData(
+                entity_type, hook_data, self._get_action_mapping_fields(entity_type)
+            )
+            self._type_data[entity_type] = type_data
+
+            self._schema_lookup.register_fields(
+                entity_type,
+                list(type_data.token_fields) + list(hook_data["get_all_fields"]),
+            )
+
+        return type_data
+
+    def invalidate(self):
+        """
+        Clears all cached formatting data. Formatters created after
+        this call will pick up fresh data from the hook.
+        """
+        logger.debug("Clearing formatter registry %s", self)
+        self._type_data = {}
+        self._round_default_pixmap = None
+        self._rect_default_pixmap = None
+
+    ###############################################################################################
+    # internal methods
+
+    def _execute_hook_methods(self, entity_type):
+        """
+        Runs all shotgun_fields hook methods for an entity type
+
+        :param entity_type: Shotgun entity type
+        :returns: Dictionary of hook return values keyed by hook method
+        """
+        hook_data = {}
+        if self._hook_result_cache:
+            cached_data = self._hook_result_cache.get(entity_type) or {}
+            if set(cached_data.keys()) == set(self._get_cached_hook_methods()):
+                hook_data.update(cached_data)
+
+        num_executed = 0
+        for method_name in self.HOOK_METHODS:
+            if method_name in hook_data:
+                continue
+            num_executed += 1
+            kwargs = {"entity_type": entity_type}
+            if method_name == "get_entity_tabs_definition":
+                kwargs["shotgun_globals"] = shotgun_globals
+
+            hook_data[method_name] = self._app.execute_hook_method(
+                "shotgun_fields_hook", method_name, **kwargs
+            )
+
+        if self._hook_result_cache and len(hook_data) == num_executed:
+            # nothing was cached for the entity type yet
+            self._hook_result_cache.set(
+                entity_type,
+                dict(
+                    (method_name, hook_data[method_name])
+                    for method_name in self._get_cached_hook_methods()
+                ),
+            )
+
+        return hook_data
+
+    def _get_cached_hook_methods(self):
+        """
+        Returns the hook methods whose return values are persisted
+        in the hook result cache, see SCHEMA_HOOK_METHODS.
+        """
+        return [
+            method_name
+            for method_name in self.HOOK_METHODS
+            if method_name not in self.SCHEMA_HOOK_METHODS
+        ]
+
+    def _get_action_mapping_fields(self, entity_type):
+        """
+        Returns the fields used by the action mapping filters of an entity type
+
+        :param entity_type: Shotgun entity type
+        :returns: List of field names
+        """
+        fields = []
+        mappings = self._app.get_setting("action_mappings") or {}
+        for mapping in mappings.get(entity_type) or []:
+            fields.extend((mapping.get("filters") or {}).keys())
+        return fields
+
+    def _check_hook_files(self):
+        """
+        Invalidates the registry if any of the hook files have
+        changed since the last check.
+        """
+        now = time.time()
+        if now - self._last_hook_check < self.HOOK_CHECK_INTERVAL:
+            return
+        self._last_hook_check = now
+
+        signature = self._get_hook_signature()
+        if signature != self._hook_signature:
+            logger.debug("The shotgun_fields hook has changed on disk.")
+            self._hook_signature = signature
+            self.invalidate()
+            if self._hook_result_cache:
+                self._hook_result_cache.reset(self._hook_paths)
+
+    def _get_hook_signature(self):
+        """
+        Returns a tuple with the paths and modification times
+        of the shotgun_fields hook files.
+        """
+        signature = []
+        for path in self._hook_paths:
+            try:
+                signature.append((path, os.path.getmtime(path)))
+            except OSError:
+                signature.append((path, None))
+        return tuple(signature)
+
+    def _get_hook_paths(self):
+        """
+        Resolves the files making up the shotgun_fields hook, including
+        any hooks it derives from.
+
+        :returns: List of file paths.
+        """
+        paths = []
+        try:
+            hook = self._app.create_hook_instance(
+                self._app.get_setting("shotgun_fields_hook")
+            )
+            for cls in inspect.getmro(type(hook)):
+                if cls is object or cls.__module__.startswith("tank."):
+                    continue
+                try:
+                    path = inspect.getfile(cls)
+                except TypeError:
+                    continue
+                if path not in paths:
+                    paths.append(path)
+        except Exception as e:
+            # older cores don't support creating hook instances
+            logger.debug("Could not resolve shotgun_fields hook paths: %s", e)
+
+        return paths
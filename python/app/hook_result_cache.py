@@ -0,0 +1,162 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import json
+import hashlib
+
+import sgtk
+from sgtk.util import filesystem
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class HookResultCache(object):
+    """
+    On disk cache of shotgun_fields hook return values, keyed by entity type.
+
+    All results are stored in a single json file together with a signature
+    of the hook files - their paths, modification times and content hashes.
+    The file is read once, the first time a result is requested, and its
+    contents are discarded if the signature does not match the hook files
+    currently in use.
+    """
+
+    # bump this whenever the file layout changes
+    FORMAT_VERSION = 2
+
+    def __init__(self, path, hook_paths):
+        """
+        Constructor
+
+        :param path: Path to the cache file.
+        :param hook_paths: Paths to the files making up the hook.
+        """
+        self._path = path
+        self._hook_paths = list(hook_paths)
+        self._signature = None
+        self._results = None
+
+    def __repr__(self):
+        return "<SG hook result cache %s>" % self._path
+
+    @property
+    def path(self):
+        """
+        Path to the cache file
+        """
+        return self._path
+
+    def get(self, entity_type):
+        """
+        Returns the cached hook results for an entity type
+
+        :param entity_type: Shotgun entity type
+        :returns: Dictionary of hook return values keyed by hook method
+            or None if nothing is cached for the entity type.
+        """
+        self._load()
+        return self._results.get(entity_type)
+
+    def set(self, entity_type, hook_data):
+        """
+        Stores hook results for an entity type and writes the cache file.
+
+        :param entity_type: Shotgun entity type
+        :param hook_data: Dictionary of hook return values keyed by hook method
+        """
+        if not self._hook_paths:
+            # without the hook files, there is no way to tell if
+            # the cached results are still valid
+            return
+
+        self._load()
+        self._results[entity_type] = hook_data
+        self._save()
+
+    def reset(self, hook_paths):
+        """
+        Discards all cached results, for example because the hook files changed.
+
+        :param hook_paths: Paths to the files making up the hook.
+        """
+        self._hook_paths = list(hook_paths)
+        self._signature = None
+        self._results = None
+
+    def _load(self):
+        """
+        Reads the cache file unless this has already been done
+        """
+        if self._results is not None:
+            return
+
+        self._results = {}
+        self._signature = self._get_signature()
+
+        if not self._hook_paths or not os.path.exists(self._path):
+            return
+
+        try:
+            with open(self._path, "r") as fh:
+                data = json.load(fh)
+        except Exception as e:
+            logger.debug("Could not read hook result cache %s: %s", self._path, e)
+            return
+
+        if data.get("version") != self.FORMAT_VERSION:
+            logger.debug("Ignoring hook result cache with a different version.")
+        elif data.get("signature") != self._signature:
+            logger.debug("The shotgun_fields hook has changed since it was cached.")
+        else:
+            logger.debug("Loaded hook results from %s", self._path)
+            self._results = data.get("results") or {}
+
+    def _save(self):
+        """
+        Writes all results to the cache file
+        """
+        data = {
+            "version": self.FORMAT_VERSION,
+            "signature": self._signature,
+            "results": self._results,
+        }
+
+        # write to a temp file and move it into place, so that other
+        # sessions never read a partially written file
+        tmp_path = "%s.%d.tmp" % (self._path, os.getpid())
+        try:
+            filesystem.ensure_folder_exists(os.path.dirname(self._path))
+            with open(tmp_path, "w") as fh:
+                json.dump(data, fh)
+            if os.path.exists(self._path):
+                os.remove(self._path)
+            os.rename(tmp_path, self._path)
+        except Exception as e:
+            logger.debug("Could not write hook result cache %s: %s", self._path, e)
+            if os.path.exists(tmp_path):
+                filesystem.safe_delete_file(tmp_path)
+
+    def _get_signature(self):
+        """
+        Computes the signature of the hook files
+
+        :returns: List of [path, mtime, sha1] lists
+        """
+        signature = []
+        for path in self._hook_paths:
+            try:
+                mtime = os.path.getmtime(path)
+                with open(path, "rb") as fh:
+                    sha1 = hashlib.sha1(fh.read()).hexdigest()
+            except (IOError, OSError):
+                (mtime, sha1) = (None, None)
+            signature.append([path, mtime, sha1])
+        return signature
@@ -26,6 +26,12 @@ class SgAllFieldsModel(ShotgunModel):
     model will use the sg_location.sg_formatter.all_fields to determine
     which fields to load in.
 
+    If a :class:`QueryBroker` is passed in, cached data is refreshed by
+    requesting the fields through the broker rather than by running the
+    query of the model, so that the request can be merged with other
+    requests for the same entity or served from memory. The record is
+    then merged into the model and its cache on disk.
+
     Once loaded or updated, a data_updated signal is emitted.
 
     :signal data_updated(dict): Signal emitted when shotgun data has arrived.
@@ -35,11 +41,13 @@ class SgAllFieldsModel(ShotgunModel):
 
     data_updated = QtCore.Signal(dict)
 
-    def __init__(self, parent, bg_task_manager):
+    def __init__(self, parent, bg_task_manager, query_broker=None):
         """
         Constructor
 
         :param parent: QT parent object.
+        :param bg_task_manager: task manager used to process data
+        :param query_broker: Optional :class:`QueryBroker` to refresh data through
         """
         # init base class
         ShotgunModel.__init__(
@@ -47,8 +55,24 @@ class SgAllFieldsModel(ShotgunModel):
         )
 
         self._sg_location = None
+        self._query_broker = query_broker
+        self._request_id = None
         self.data_refreshed.connect(self._on_data_refreshed)
 
+        if self._query_broker:
+            self._query_broker.request_completed.connect(self._on_request_completed)
+            self._query_broker.request_failed.connect(self._on_request_failed)
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        if self._query_broker:
+            self._cancel_request()
+            self._query_broker.request_completed.disconnect(self._on_request_completed)
+            self._query_broker.request_failed.disconnect(self._on_request_failed)
+        ShotgunModel.destroy(self)
+
     def _get_sg_data(self):
         """
         Returns the sg data dictionary for the associated item
@@ -70,21 +94,93 @@ class SgAllFieldsModel(ShotgunModel):
         sg_data = self._get_sg_data()
         self.data_updated.emit(sg_data)
 
+    def _cancel_request(self):
+        """
+        Cancels the broker request for the current location, if any
+        """
+        if self._request_id:
+            self._query_broker.cancel(self._request_id)
+            self._request_id = None
+
+    def _on_request_completed(self, uid, sg_data):
+        """
+        Merges the record served by the broker into the model
+
+        :param uid: Request id
+        :param sg_data: Shotgun data dictionary or None if the entity doesn't exist
+        """
+        if uid != self._request_id:
+            return
+        self._request_id = None
+
+        if not sg_data:
+            # let the model query clear out the item
+            self._refresh_data()
+            return
+
+        self.data_refreshed.emit(self._merge_record(sg_data))
+
+    def _on_request_failed(self, uid, msg):
+        """
+        Falls back on the model query if the broker request failed
+
+        :param uid: Request id
+        :param msg: Error message
+        """
+        if uid != self._request_id:
+            return
+        self._request_id = None
+        self._refresh_data()
+
+    def _merge_record(self, sg_data):
+        """
+        Merges a record into the model the same way as the result of a
+        refresh: the shotgun model data handler works out what changed
+        and the changes are applied to the item and saved to disk.
+
+        :param sg_data: Shotgun data dictionary for the current location
+        :returns: True if the data changed
+        """
+        modified_items = self._data_handler.update_data([sg_data])
+        if not modified_items:
+            return False
+
+        root = self.invisibleRootItem()
+        for modified_item in modified_items:
+            data_item = modified_item["data"]
+            if modified_item["mode"] == self._data_handler.ADDED:
+                self._create_item(root, data_item)
+            elif self.rowCount() > 0:
+                self.item(0).setData(
+                    shotgun_model.sanitize_for_qt_model(data_item.shotgun_data),
+                    ShotgunModel.SG_DATA_ROLE,
+                )
+
+        self._data_handler.save_cache()
+        return True
+
     ############################################################################################
     # public interface
 
-    def load_data(self, sg_location):
+    def load_data(self, sg_location, refresh=True):
         """
         Clears the model and sets it up for a particular entity.
-        Loads any cached data that exists.
+        Loads any cached data that exists and requests an update.
+
+        :param sg_location: Shotgun Location object of the object to load.
+        :param refresh: If False, cached data is not refreshed from Shotgun.
+            Data is always fetched if nothing was cached.
         """
+        if self._query_broker:
+            self._cancel_request()
+
         # set the current location to represent
         self._sg_location = sg_location
 
         filters = [["id", "is", self._sg_location.entity_id]]
         hierarchy = ["id"]
 
-        ShotgunModel._load_data(
+        cache_loaded = ShotgunModel._load_data(
             self,
             sg_location.sg_formatter.entity_type,
             filters,
@@ -93,4 +189,16 @@ class SgAllFieldsModel(ShotgunModel):
         )
         # signal to any views that data now may be available
         self.data_updated.emit(self._get_sg_data())
-        self._refresh_data()
+
+        if cache_loaded and not refresh:
+            return
+
+        if self._query_broker:
+            # usually merged with other requests for the entity
+            self._request_id = self._query_broker.request(
+                sg_location.sg_formatter.entity_type,
+                sg_location.entity_id,
+                sg_location.sg_formatter.all_fields,
+            )
+        else:
+            self._refresh_data()
@@ -8,6 +8,8 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import functools
+
 from sgtk.platform.qt import QtCore, QtGui
 import sgtk
 from . import utils
@@ -77,7 +79,22 @@ class SgCurrentUserModel(ShotgunModel):
         :param field: The Shotgun field which the thumbnail is associated with.
         :param path: A path on disk to the thumbnail. This is a file in jpeg format.
         """
-        self._current_pixmap = utils.create_round_thumbnail(image)
+        # the avatar is shared with the other models through the avatar cache
+        registry = self._app.formatter_registry
+        sg_data = item.get_sg_data() or {}
+        self._current_pixmap = registry.avatar_cache.get_avatar(
+            sg_data.get("type"),
+            sg_data.get("id"),
+            sg_data.get("image"),
+            "round",
+            image,
+            functools.partial(
+                registry.thumbnail_cache.get_pixmap,
+                path,
+                "round",
+                composite=utils.create_round_thumbnail,
+            ),
+        )
         self.thumbnail_updated.emit()
 
     ############################################################################################
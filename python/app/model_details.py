@@ -27,16 +27,24 @@ class SgEntityDetailsModel(ShotgunModel):
     arrived from Shotgun.
 
     Data can then be queried via the get_sg_data() and get_pixmap() methods.
+
+    If a :class:`QueryBroker` is passed in, the model acts as a carrier
+    for it: the result is published to the broker, so that consumers
+    requesting a subset of the details fields don't need a query of
+    their own. The details query itself is never widened, so that it
+    stays small and its cache key stays stable.
     """
 
     thumbnail_updated = QtCore.Signal()
     data_updated = QtCore.Signal()
 
-    def __init__(self, parent, bg_task_manager):
+    def __init__(self, parent, bg_task_manager, query_broker=None):
         """
         Constructor
 
         :param parent: QT parent object
+        :param bg_task_manager: task manager used to process data
+        :param query_broker: Optional :class:`QueryBroker` to carry queries for
         """
         # init base class
         ShotgunModel.__init__(
@@ -49,7 +57,16 @@ class SgEntityDetailsModel(ShotgunModel):
 
         self._sg_location = None
         self._current_pixmap = None
+        self._query_broker = query_broker
         self.data_refreshed.connect(self._on_data_refreshed)
+        self.data_refresh_fail.connect(self._on_data_refresh_fail)
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self._withdraw_from_broker()
+        ShotgunModel.destroy(self)
 
     def _on_data_refreshed(self):
         """
@@ -57,8 +74,32 @@ class SgEntityDetailsModel(ShotgunModel):
         so that a data_updated signal is consistenntly sent
         out both after the data has been updated and after a cache has been read in
         """
+        if self._query_broker and self._sg_location:
+            sg_data = self.get_sg_data()
+            if sg_data:
+                self._query_broker.publish(sg_data)
+            else:
+                self._withdraw_from_broker()
+
         self.data_updated.emit()
 
+    def _on_data_refresh_fail(self, msg):
+        """
+        Lets any consumers waiting for the data fetch it themselves
+
+        :param msg: Error message
+        """
+        self._withdraw_from_broker()
+
+    def _withdraw_from_broker(self):
+        """
+        Withdraws the query for the current location from the broker
+        """
+        if self._query_broker and self._sg_location:
+            self._query_broker.withdraw(
+                self._sg_location.entity_type, self._sg_location.entity_id
+            )
+
     def _populate_default_thumbnail(self, item):
         """
         Called whenever an item needs to get a default thumbnail attached to a node.
@@ -101,33 +142,39 @@ class SgEntityDetailsModel(ShotgunModel):
 
         sg_data = item.get_sg_data()
         self._current_pixmap = self._sg_location.sg_formatter.create_thumbnail(
-            image, sg_data
+            image, sg_data, path
         )
         self.thumbnail_updated.emit()
 
     ############################################################################################
     # public interface
 
-    def load_data(self, sg_location):
+    def load_data(self, sg_location, refresh=True):
         """
         Clears the model and sets it up for a particular entity.
         Loads any cached data that exists and requests an async update.
 
-        The fields defined in the sg_location.sg_formatter.fields
+        The fields defined in the sg_location.sg_formatter.details_fields
         property will be loaded.
 
         :param sg_location: Shotgun Location object of the object to load.
+        :param refresh: If False, cached data is not refreshed from Shotgun.
+            Data is always fetched if nothing was cached.
         """
         # set the current location to represent
+        self._withdraw_from_broker()
         self._sg_location = sg_location
 
-        fields = (
-            sg_location.sg_formatter.fields + sg_location.sg_formatter.thumbnail_fields
-        )
+        fields = sg_location.sg_formatter.details_fields
+        if self._query_broker:
+            # requests for other fields are fetched by the broker itself
+            self._query_broker.announce(
+                sg_location.entity_type, sg_location.entity_id, fields
+            )
 
         hierarchy = ["id"]
 
-        ShotgunModel._load_data(
+        cache_loaded = ShotgunModel._load_data(
             self,
             sg_location.entity_type,
             [["id", "is", sg_location.entity_id]],
@@ -137,7 +184,12 @@ class SgEntityDetailsModel(ShotgunModel):
 
         # signal to any views that data now may be available
         self.data_updated.emit()
-        self._refresh_data()
+
+        if refresh or not cache_loaded:
+            self._refresh_data()
+        elif self._query_broker:
+            # nothing to carry without a query
+            self._on_data_refreshed()
 
     def get_sg_data(self):
         """
@@ -8,17 +8,27 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import collections
+import datetime
+import functools
+
 import sgtk
-from sgtk.platform.qt import QtGui
+from sgtk.platform.qt import QtCore, QtGui
 from tank_vendor.six import string_types
 
 from .shotgun_formatter import ShotgunTypeFormatter
+from . import utils
 
 # import the shotgun_model module from the shotgun utils framework
 shotgun_model = sgtk.platform.import_framework(
     "tk-framework-shotgunutils", "shotgun_model"
 )
 ShotgunModel = shotgun_model.ShotgunModel
+shotgun_data = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_data"
+)
+
+logger = sgtk.platform.get_logger(__name__)
 
 
 class SgEntityListingModel(ShotgunModel):
@@ -30,13 +40,45 @@ class SgEntityListingModel(ShotgunModel):
 
     The associated object is defined in the shotgun location.
 
-    The returned data in this model is capped so that it will at
-    the most contain SG_RECORD_LIMIT items.
+    The returned data in this model is loaded in pages of SG_RECORD_LIMIT
+    items. The first page is loaded by the model itself, and additional pages
+    are fetched on request via :meth:`fetch_next_page`, typically as the user
+    scrolls towards the end of the view. Pages are kept in memory per query,
+    so that returning to a location restores all pages loaded so far without
+    fetching them again.
+
+    When cached data is refreshed, only the records updated since the most
+    recent ``updated_at`` value of the loaded items are fetched, along with
+    the ids of all items, which detects removed and added items. Updated
+    records are merged through the data handler of the model, which updates
+    the items and the cache on disk. Only when items were added or removed
+    is the full query run again.
+
+    The text displayed for each item is rendered in a background task
+    as soon as data arrives and is stored on the item in the
+    LIST_ITEM_TEXT_ROLE role as a (top_left, top_right, body) tuple.
     """
 
-    # maximum number of items to show in the listings
+    # number of items loaded per page
     SG_RECORD_LIMIT = 50
 
+    # number of queries for which additional pages are kept in memory
+    MAX_PAGED_QUERIES = 20
+
+    # custom roles holding the pre-rendered list item text and
+    # the updated_at/hook revision key it was rendered for
+    LIST_ITEM_TEXT_ROLE = QtCore.Qt.UserRole + 128
+    _LIST_ITEM_RENDER_KEY_ROLE = QtCore.Qt.UserRole + 129
+
+    # fields whose values can change without the updated_at field of the
+    # record itself changing, in addition to deep links into other entities
+    _UNTRACKED_FIELDS = ("read_by_current_user",)
+
+    # custom roles holding the path to the thumbnail of an item and
+    # whether it has been evicted to stay within the pixmap budget
+    _THUMBNAIL_PATH_ROLE = QtCore.Qt.UserRole + 131
+    _THUMBNAIL_EVICTED_ROLE = QtCore.Qt.UserRole + 132
+
     def __init__(self, entity_type, parent, bg_task_manager):
         """
         Constructor.
@@ -47,15 +89,82 @@ class SgEntityListingModel(ShotgunModel):
         self._sg_location = None
         self._sg_formatter = ShotgunTypeFormatter(entity_type)
 
+        # list item text is rendered by the background task manager
+        self._bg_task_manager = bg_task_manager
+        self._render_task_group = "list_item_rendering_%s" % id(self)
+        self._render_task_ids = set()
+        # True while waiting for the schema to render the text again
+        self._render_deferred = False
+
+        # the query for the current location, used to fetch additional pages
+        self._page_query = None
+        # pages beyond the first one, keyed by query, then by page number
+        self._page_cache = collections.OrderedDict()
+        self._page_request = None
+        self._more_pages_available = False
+
+        # outstanding incremental refresh requests, uid -> request kind,
+        # and the results which have arrived so far, kind -> list of records
+        self._change_requests = {}
+        self._change_results = {}
+        # number of items the id check covers
+        self._change_window = 0
+        # True if changes were signaled while an incremental refresh was running
+        self._change_refresh_pending = False
+
+        # optional cache recording the identity of loaded publishes
+        self._publish_identity_cache = None
+
+        # optional compositor to composite thumbnails in the background
+        self._thumbnail_compositor = None
+
+        # optional budget bounding the memory used by thumbnails, and the
+        # items whose evicted thumbnails should be restored
+        self._pixmap_budget = None
+        self._thumbnails_to_restore = set()
+
         # init base class
         ShotgunModel.__init__(
             self,
             parent,
             download_thumbs=True,
-            bg_load_thumbs=True,
+            # thumbnails are loaded at the size they are displayed at
+            bg_load_thumbs=False,
             bg_task_manager=bg_task_manager,
         )
 
+        self._page_retriever = shotgun_data.ShotgunDataRetriever(
+            self, bg_task_manager=bg_task_manager
+        )
+        self._page_retriever.start()
+        self._page_retriever.work_completed.connect(self._on_page_retrieved)
+        self._page_retriever.work_failure.connect(self._on_page_retrieval_failed)
+        self._page_retriever.work_completed.connect(self._on_change_retrieved)
+        self._page_retriever.work_failure.connect(self._on_change_retrieval_failed)
+
+        self._bg_task_manager.task_completed.connect(self._on_render_task_completed)
+        self._bg_task_manager.task_failed.connect(self._on_render_task_failed)
+
+        self._restore_timer = QtCore.QTimer(self)
+        self._restore_timer.setSingleShot(True)
+        self._restore_timer.setInterval(0)
+        self._restore_timer.timeout.connect(self._restore_evicted_thumbnails)
+
+        self.cache_loaded.connect(self._schedule_list_item_rendering)
+        self.data_refreshed.connect(self._schedule_list_item_rendering)
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self._cancel_list_item_rendering()
+        self._render_deferred = False
+        self._release_thumbnails()
+        self._bg_task_manager.task_completed.disconnect(self._on_render_task_completed)
+        self._bg_task_manager.task_failed.disconnect(self._on_render_task_failed)
+        self._page_retriever.stop()
+        ShotgunModel.destroy(self)
+
     ############################################################################################
     # public interface
 
@@ -77,7 +186,208 @@ class SgEntityListingModel(ShotgunModel):
         """
         return False
 
-    def load_data(self, sg_location, additional_fields=None, sort_field=None, direction="desc"):
+    def set_publish_identity_cache(self, publish_identity_cache):
+        """
+        Specify a cache to record the identity of the publishes loaded
+        by this model in, for models listing publishes.
+
+        :param publish_identity_cache: :class:`PublishIdentityCache` instance
+        """
+        self._publish_identity_cache = publish_identity_cache
+
+    def set_thumbnail_compositor(self, thumbnail_compositor):
+        """
+        Specify a compositor to composite thumbnails in the background.
+        Without one, thumbnails are composited as soon as they arrive.
+
+        :param thumbnail_compositor: :class:`ThumbnailCompositor` instance
+        """
+        self._thumbnail_compositor = thumbnail_compositor
+
+    def set_pixmap_budget(self, pixmap_budget):
+        """
+        Specify a budget to account the thumbnails of this model in.
+        Thumbnails evicted by the budget are restored once their
+        items are painted again, see :meth:`notify_item_painted`.
+
+        :param pixmap_budget: :class:`PixmapBudget` instance
+        """
+        self._pixmap_budget = pixmap_budget
+
+    def is_displayed(self):
+        """
+        Checks if the model is displayed, which is the case when
+        its parent is a visible view.
+        """
+        parent = QtCore.QObject.parent(self)
+        return isinstance(parent, QtGui.QWidget) and parent.isVisible()
+
+    def evict_images(self, key):
+        """
+        Replaces the thumbnail of an item with the default thumbnail,
+        to release its memory. Called by the pixmap budget.
+
+        :param key: (entity_type, entity_id) tuple identifying the item
+        """
+        item = self.item_from_entity(*key)
+        if item and item.data(self._THUMBNAIL_PATH_ROLE):
+            self._populate_default_thumbnail(item)
+            item.setData(True, self._THUMBNAIL_EVICTED_ROLE)
+
+    def notify_item_painted(self, model_index):
+        """
+        Called by the delegate whenever an item is painted, so that its
+        thumbnail is evicted last and restored if it has been evicted.
+
+        :param model_index: Model index of the item in this model
+        """
+        if self._pixmap_budget is None:
+            return
+
+        item = self.itemFromIndex(model_index)
+        sg_data = item.get_sg_data() if item else None
+        if not sg_data:
+            return
+
+        key = (sg_data["type"], sg_data["id"])
+        if item.data(self._THUMBNAIL_EVICTED_ROLE):
+            # don't change the model while it is being painted
+            self._thumbnails_to_restore.add(key)
+            self._restore_timer.start()
+        else:
+            self._pixmap_budget.touch(self, key)
+
+    @property
+    def more_pages_available(self):
+        """
+        True if the current location has more items than what has been loaded
+        """
+        return self._more_pages_available
+
+    def fetch_next_page(self):
+        """
+        Requests the next page of items for the current location. The items
+        are added to the model once they arrive. Calling this while a page
+        is being fetched or when no more pages are available does nothing.
+        """
+        if self._page_request or not self._more_pages_available:
+            return
+
+        (entity_type, filters, fields, order) = self._page_query
+        query_key = self._get_page_query_key()
+        page = len(self._page_cache.get(query_key, {})) + 2
+
+        uid = self._page_retriever.execute_find(
+            entity_type,
+            filters,
+            fields,
+            order,
+            limit=self.SG_RECORD_LIMIT,
+            page=page,
+        )
+        self._page_request = (shotgun_model.sanitize_qt(uid), query_key, page)
+
+    def refresh_changes(self):
+        """
+        Refreshes the items for the current location, typically because
+        some of them are known to have changed. Only the changes are
+        fetched, see :meth:`_refresh_changes`. Models loaded by deriving
+        classes with their own queries are fully refreshed. Does nothing
+        if the model isn't loaded. If an incremental refresh is already
+        running, another one is made once it has completed.
+        """
+        if self._change_requests:
+            self._change_refresh_pending = True
+            return
+        if self._page_query is not None:
+            self._refresh_changes()
+        elif self.rowCount() > 0:
+            self._refresh_data()
+
+    def cancel_pending_work(self):
+        """
+        Stops all outstanding work for the current location and clears the
+        model, typically because the user navigated to a different location.
+        Results of queries and thumbnail downloads still in flight are
+        dropped by the model once they arrive.
+
+        :returns: Number of requests which were cancelled
+        """
+        num_cancelled = len(self._render_task_ids) + len(self._change_requests)
+        if self._page_request:
+            num_cancelled += 1
+
+        self._cancel_list_item_rendering()
+        self._cancel_page_request()
+        self._cancel_change_requests()
+        self._page_query = None
+        self._more_pages_available = False
+        self._release_thumbnails()
+        self.clear()
+
+        return num_cancelled
+
+    def get_list_item_snapshot(self):
+        """
+        Returns the rendered state of all items in the model, so
+        that it can be restored without rendering the items again.
+
+        :returns: List of (entity_type, entity_id, render_key, text, icon) tuples
+        """
+        snapshot = []
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            item = root.child(row)
+            sg_data = item.get_sg_data()
+            if not sg_data:
+                continue
+            snapshot.append(
+                (
+                    sg_data["type"],
+                    sg_data["id"],
+                    item.data(self._LIST_ITEM_RENDER_KEY_ROLE),
+                    item.data(self.LIST_ITEM_TEXT_ROLE),
+                    item.icon(),
+                )
+            )
+        return snapshot
+
+    def restore_list_item_snapshot(self, snapshot):
+        """
+        Restores the rendered text and icons of items from a snapshot taken
+        with :meth:`get_list_item_snapshot`. Text is only restored for items
+        whose data hasn't changed since the snapshot was taken.
+
+        :param snapshot: List of (entity_type, entity_id, render_key, text, icon) tuples
+        :returns: Number of items restored
+        """
+        num_restored = 0
+        for (entity_type, entity_id, render_key, text, icon) in snapshot:
+            item = self.item_from_entity(entity_type, entity_id)
+            if item is None:
+                continue
+            if icon is not None and not icon.isNull():
+                item.setIcon(icon)
+                if self._pixmap_budget is not None:
+                    self._pixmap_budget.add(self, (entity_type, entity_id), [icon])
+            if text and self._get_render_key(item.get_sg_data()) == render_key:
+                item.setData(text, self.LIST_ITEM_TEXT_ROLE)
+                item.setData(render_key, self._LIST_ITEM_RENDER_KEY_ROLE)
+                num_restored += 1
+
+        # only render what the snapshot didn't cover
+        self._cancel_list_item_rendering()
+        self._schedule_list_item_rendering()
+        return num_restored
+
+    def load_data(
+        self,
+        sg_location,
+        additional_fields=None,
+        sort_field=None,
+        direction="desc",
+        refresh=True,
+    ):
         """
         Clears the model and sets it up for a particular entity.
         Loads any cached data that exists and schedules an async refresh.
@@ -86,17 +396,26 @@ class SgEntityListingModel(ShotgunModel):
                object for which items should be loaded. NOTE! If the model is
                configured to display tasks, this sg_location could for example
                point to a Shot for which we want to display tasks.
-        :param additional_fields: Additional fields to load apart from those
-               defined in the sg formatter object associated with the entity
-               type.
+        :param additional_fields: Additional fields to load apart from the list
+               item fields defined in the sg formatter object associated with
+               the entity type.
         :param sort_field: Field to use to sort the data. The data will be
                sorted in descending order (this happens in a proxy model
                outside the model itself, so not strictly part of this class,
                but rather defined outside in the main dialog). The sort field
                is the main 'text' field in the model that is set.
         :param direction: Order direction user to gather the data. Can be "desc" or "asc
+        :param refresh: If False, cached data is not refreshed from Shotgun.
+               Data is always fetched if nothing was cached. Cached data
+               is refreshed incrementally, see :meth:`_refresh_changes`.
         """
         self._sg_location = sg_location
+        self._cancel_list_item_rendering()
+        self._cancel_page_request()
+        self._cancel_change_requests()
+        self._page_query = None
+        self._more_pages_available = False
+        self._release_thumbnails()
 
         # if a sort field has not been specified, default to
         # update date (unix time), in descending order
@@ -113,9 +432,10 @@ class SgEntityListingModel(ShotgunModel):
         else:
             raise TypeError("Invalid sort field argument type '%s'" % type(sort_field))
 
-        fields = self._sg_formatter.fields
+        fields = self._sg_formatter.list_item_fields
         if additional_fields:
-            fields += additional_fields
+            # keep the field list canonical so that cache keys are stable
+            fields = sorted(set(fields + additional_fields))
 
         # This is wrapped here to account for the situation where we can't
         # query for the My Tasks tab if we don't have a Shotgun user. This
@@ -127,7 +447,9 @@ class SgEntityListingModel(ShotgunModel):
             self.data_refresh_fail.emit(exc.message)
             return
 
-        ShotgunModel._load_data(
+        self._page_query = (self._sg_formatter.entity_type, filters, fields, sort_order)
+
+        cache_loaded = ShotgunModel._load_data(
             self,
             self._sg_formatter.entity_type,
             filters,
@@ -136,8 +458,543 @@ class SgEntityListingModel(ShotgunModel):
             sort_order,
             limit=self.SG_RECORD_LIMIT,
         )
+        if not cache_loaded:
+            self._refresh_data()
+        elif refresh:
+            self._refresh_changes()
+
+    ############################################################################################
+    # paging
+
+    def _get_page_query_key(self):
+        """
+        Returns a key identifying the query for the current location
+        """
+        return str(self._page_query)
+
+    def _cancel_page_request(self):
+        """
+        Stops any outstanding page request
+        """
+        if self._page_request:
+            self._page_retriever.stop_work(self._page_request[0])
+            self._page_request = None
+
+    def _on_page_retrieved(self, uid, request_type, data):
+        """
+        Stores a page of items that arrived from Shotgun and
+        merges it into the model.
+
+        :param uid: Unique id of the request
+        :param request_type: Type of request
+        :param data: Request result
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if not self._page_request or self._page_request[0] != uid:
+            return
+        (_, query_key, page) = self._page_request
+        self._page_request = None
+
+        data = shotgun_model.sanitize_qt(data)
+        if self._publish_identity_cache:
+            self._publish_identity_cache.add_records(data["sg"])
+
+        pages = self._page_cache.pop(query_key, {})
+        pages[page] = data["sg"]
+        self._page_cache[query_key] = pages
+
+        # only keep pages around for the most recent queries
+        while len(self._page_cache) > self.MAX_PAGED_QUERIES:
+            self._page_cache.popitem(last=False)
+
+        self._on_page_stored(data["sg"])
+
+    def _on_page_stored(self, page_data):
+        """
+        Called when an additional page has been stored. Merges the page
+        into the model. Deriving classes can reimplement this to chain
+        page requests before merging.
+
+        :param page_data: List of shotgun dictionaries in the page
+        """
+        self._merge_pages()
+
+    def _merge_pages(self):
+        """
+        Merges all stored pages for the current query into the loaded items,
+        without fetching the first page again. The items are added through
+        the data handler, so the pages are also saved in the cache on disk.
+        """
+        loaded_data = []
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            sg_data = root.child(row).get_sg_data()
+            if sg_data:
+                loaded_data.append(sg_data)
+
+        modified = self._merge_data(self._append_pages(loaded_data))
+
+        # let views and derived classes know that more data is available
+        self.data_refreshed.emit(modified)
+
+    def _append_pages(self, sg_data_list):
+        """
+        Appends the additional pages stored for the current query to a list
+        of items, skipping items which are already in the list. Also works
+        out if more pages are available, from the size of the last page.
+
+        :param sg_data_list: List of shotgun dictionaries
+        :returns: List of shotgun dictionaries including all stored pages
+        """
+        pages = self._page_cache.get(self._get_page_query_key(), {})
+        last_page = sg_data_list
+        all_data = list(sg_data_list)
+        seen_ids = set(sg_item["id"] for sg_item in sg_data_list)
+
+        for page in sorted(pages.keys()):
+            last_page = pages[page]
+            for sg_item in last_page:
+                # items may have moved between pages since they were fetched
+                if sg_item["id"] not in seen_ids:
+                    seen_ids.add(sg_item["id"])
+                    all_data.append(sg_item)
+
+        self._more_pages_available = len(last_page) == self.SG_RECORD_LIMIT
+        return all_data
+
+    def _on_page_retrieval_failed(self, uid, msg):
+        """
+        Logs page request failures
+
+        :param uid: Unique id of the request
+        :param msg: Error message
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if not self._page_request or self._page_request[0] != uid:
+            return
+        self._page_request = None
+        sgtk.platform.current_bundle().log_warning(
+            "Could not load more items: %s" % shotgun_model.sanitize_qt(msg)
+        )
+
+    def _before_data_processing(self, sg_data_list):
+        """
+        Called just after data has been retrieved from Shotgun but before any processing
+        takes place. Appends any additional pages loaded for the current query.
+
+        :param sg_data_list: list of shotgun dictionaries, as returned by the find() call.
+        :returns: should return a list of shotgun dictionaries, on the same form as the input.
+        """
+        if self._publish_identity_cache:
+            self._publish_identity_cache.add_records(sg_data_list)
+
+        if self._page_query is None:
+            # data not loaded via load_data, no paging
+            return ShotgunModel._before_data_processing(self, sg_data_list)
+
+        all_data = self._append_pages(sg_data_list)
+        return ShotgunModel._before_data_processing(self, all_data)
+
+    ############################################################################################
+    # incremental refresh
+
+    def _get_watermark(self):
+        """
+        Returns the most recent update time of the loaded items. All changes
+        made after the loaded data was fetched are more recent than this.
+
+        :returns: Unix time or None if not known
+        """
+        watermark = None
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            sg_data = root.child(row).get_sg_data()
+            updated_at = sg_data.get("updated_at") if sg_data else None
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+        return watermark
+
+    def _refresh_changes(self):
+        """
+        Refreshes the loaded data by fetching only the records which were
+        updated since the loaded data was fetched, along with the ids of the
+        items for the current location to detect added and removed items.
+        Falls back to a full refresh if the update time of the loaded data
+        isn't known, or if changes to any of the fields wouldn't be caught
+        by it, see :meth:`_has_untracked_fields`.
+        """
+        (entity_type, filters, fields, order) = self._page_query
+        num_loaded = len(self.entity_ids)
+        watermark = self._get_watermark()
+        if (
+            watermark is None
+            or "updated_at" not in fields
+            or not num_loaded
+            or self._has_untracked_fields(fields)
+        ):
+            self._refresh_data()
+            return
+
+        # cover all loaded pages, plus one item to tell if there are more
+        num_pages = (num_loaded + self.SG_RECORD_LIMIT - 1) // self.SG_RECORD_LIMIT
+        self._change_window = num_pages * self.SG_RECORD_LIMIT
+
+        # update times only have a precision of one second, so records updated
+        # in the same second as the watermark are fetched again. Records that
+        # haven't changed are not modified by the merge.
+        since = datetime.datetime.fromtimestamp(watermark - 1)
+        updated_filters = list(filters) + [["updated_at", "greater_than", since]]
+        uid = self._page_retriever.execute_find(
+            entity_type, updated_filters, fields, order, limit=self._change_window
+        )
+        self._change_requests[shotgun_model.sanitize_qt(uid)] = "updated"
+
+        uid = self._page_retriever.execute_find(
+            entity_type, filters, ["id"], order, limit=self._change_window + 1
+        )
+        self._change_requests[shotgun_model.sanitize_qt(uid)] = "ids"
+
+    def _has_untracked_fields(self, fields):
+        """
+        Checks if any of the fields can change without the updated_at field
+        of the record changing. This is the case for deep links, like
+        created_by.HumanUser.image, whose values change when the linked
+        entity changes, and for fields which depend on the current user.
+
+        :param fields: List of fields
+        """
+        return any("." in field or field in self._UNTRACKED_FIELDS for field in fields)
+
+    def _cancel_change_requests(self):
+        """
+        Stops any outstanding incremental refresh
+        """
+        for uid in self._change_requests:
+            self._page_retriever.stop_work(uid)
+        self._change_requests = {}
+        self._change_results = {}
+        self._change_refresh_pending = False
+
+    def _on_change_retrieved(self, uid, request_type, data):
+        """
+        Stores the result of an incremental refresh request and merges
+        the changes once the results of both requests have arrived.
+
+        :param uid: Unique id of the request
+        :param request_type: Type of request
+        :param data: Request result
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        kind = self._change_requests.pop(uid, None)
+        if kind is None:
+            return
+
+        self._change_results[kind] = shotgun_model.sanitize_qt(data)["sg"]
+        if self._change_requests:
+            # still waiting for the other request
+            return
+
+        results = self._change_results
+        self._change_results = {}
+        self._merge_changes(results["updated"], results["ids"])
+
+        if self._change_refresh_pending:
+            # pick up the changes signaled while the refresh was running
+            self._change_refresh_pending = False
+            self.refresh_changes()
+
+    def _on_change_retrieval_failed(self, uid, msg):
+        """
+        Falls back to a full refresh if an incremental refresh request failed
+
+        :param uid: Unique id of the request
+        :param msg: Error message
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if uid not in self._change_requests:
+            return
+        logger.debug(
+            "Incremental refresh failed, refreshing all items: %s",
+            shotgun_model.sanitize_qt(msg),
+        )
+        self._cancel_change_requests()
         self._refresh_data()
 
+    def _merge_changes(self, updated_records, id_records):
+        """
+        Merges updated records into the existing items. If items were
+        added or removed, the model is fully refreshed instead.
+
+        :param updated_records: Shotgun dictionaries updated since the
+            loaded data was fetched
+        :param id_records: Shotgun dictionaries holding the ids of the
+            items for the current location, in display order
+        """
+        loaded_ids = set(self.entity_ids)
+        current_ids = set(
+            sg_item["id"] for sg_item in id_records[: self._change_window]
+        )
+        if (
+            current_ids != loaded_ids
+            or len(updated_records) >= self._change_window
+            or any(sg_item["id"] not in loaded_ids for sg_item in updated_records)
+        ):
+            logger.debug("Items were added or removed, refreshing all items")
+            # the full refresh also covers any pending changes
+            self._change_refresh_pending = False
+            self._refresh_data()
+            return
+
+        self._more_pages_available = len(id_records) > self._change_window
+
+        if self._publish_identity_cache:
+            self._publish_identity_cache.add_records(updated_records)
+        self._update_page_cache(updated_records)
+
+        updated = dict((sg_item["id"], sg_item) for sg_item in updated_records)
+        sg_data_list = []
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            sg_data = root.child(row).get_sg_data()
+            if sg_data:
+                sg_data_list.append(updated.get(sg_data["id"], sg_data))
+        modified = self._merge_data(sg_data_list)
+
+        logger.debug(
+            "Merged %d updated items out of %d", len(updated_records), len(loaded_ids)
+        )
+        # let views and derived classes know that the data is up to date
+        self.data_refreshed.emit(modified)
+
+    def _merge_data(self, sg_data_list):
+        """
+        Merges data for the current query into the model the same way as
+        the result of a refresh, but without querying Shotgun: the shotgun
+        model data handler works out what changed, the changes are applied
+        to the items and the cache is saved to disk.
+
+        :param sg_data_list: List of shotgun dictionaries covering all items
+            for the current query, including those in additional pages.
+        :returns: True if the data changed
+        """
+        modified_items = self._data_handler.update_data(sg_data_list)
+        if not modified_items:
+            return False
+
+        root = self.invisibleRootItem()
+        for modified_item in modified_items:
+            data_item = modified_item["data"]
+            if modified_item["mode"] == self._data_handler.ADDED:
+                self._create_item(root, data_item)
+                continue
+
+            sg_data = data_item.shotgun_data
+            item = self.item_from_entity(sg_data["type"], sg_data["id"])
+            if item is None:
+                continue
+            if modified_item["mode"] == self._data_handler.DELETED:
+                root.removeRow(item.row())
+            else:
+                self._merge_item(item, sg_data)
+
+        self._data_handler.save_cache()
+        return True
+
+    def _merge_item(self, item, sg_data):
+        """
+        Replaces the data of an existing item with updated data
+        and downloads its thumbnail again if it has changed.
+
+        :param item: QStandardItem to update
+        :param sg_data: Updated shotgun dictionary, as held by the data handler
+        """
+        previous_data = item.get_sg_data() or {}
+        sg_data = shotgun_model.sanitize_for_qt_model(sg_data)
+        item.setData(sg_data, ShotgunModel.SG_DATA_ROLE)
+
+        # the text of the item holds the sort field
+        (_, _, _, order) = self._page_query
+        item.setText(self._generate_display_name(order[0]["field_name"], sg_data))
+
+        for field in self._sg_formatter.thumbnail_fields:
+            url = sg_data.get(field)
+            if self._get_url_key(url) == self._get_url_key(previous_data.get(field)):
+                continue
+            if url:
+                self._request_thumbnail_download(
+                    item, field, url, sg_data["type"], sg_data["id"]
+                )
+            else:
+                item.setData(None, self._THUMBNAIL_PATH_ROLE)
+                self._populate_default_thumbnail(item)
+
+    def _update_page_cache(self, updated_records):
+        """
+        Replaces records in the additional pages of the current
+        query, so that the pages are merged in up to date.
+
+        :param updated_records: Updated shotgun dictionaries
+        """
+        updated = dict((sg_item["id"], sg_item) for sg_item in updated_records)
+        pages = self._page_cache.get(self._get_page_query_key(), {})
+        for page in pages:
+            pages[page] = [
+                updated.get(sg_item["id"], sg_item) for sg_item in pages[page]
+            ]
+
+    def _get_url_key(self, url):
+        """
+        Returns the part of a thumbnail url identifying the image.
+        Thumbnail urls are signed, so the query string changes
+        every time they are fetched.
+
+        :param url: Thumbnail url or None
+        :returns: String or None
+        """
+        if not url:
+            return None
+        return url.split("?")[0]
+
+    ############################################################################################
+    # list item rendering
+
+    def _get_render_key(self, sg_data):
+        """
+        Returns the key identifying the pre-rendered text for an item.
+        Text only has to be rendered again when this key changes. Text
+        rendered before the schema was loaded holds fallback values, like
+        raw entity type names, so the state of the schema is part of the key.
+
+        :param sg_data: Shotgun data for the item
+        :returns: String key
+        """
+        schema_lookup = self._sg_formatter.schema_lookup
+        return "%s:%s:%s:%s" % (
+            sg_data.get("updated_at"),
+            self._sg_formatter.revision,
+            schema_lookup.generation,
+            schema_lookup.schema_loaded,
+        )
+
+    def _schedule_list_item_rendering(self):
+        """
+        Kicks off a background task rendering the list item text for
+        all items whose text is missing or out of date.
+
+        Until the schema is loaded, schema lookups query Shotgun, which the
+        background task can't do. The delegate renders the text itself in
+        the meantime, and rendering is scheduled once the schema is loaded.
+        """
+        schema_lookup = self._sg_formatter.schema_lookup
+        if not schema_lookup.schema_loaded:
+            if not self._render_deferred:
+                self._render_deferred = True
+                schema_lookup.run_on_schema_loaded(self._on_schema_loaded)
+            return
+
+        pending = []
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            item = root.child(row)
+            sg_data = item.get_sg_data()
+            if not sg_data:
+                continue
+            render_key = self._get_render_key(sg_data)
+            if item.data(self._LIST_ITEM_RENDER_KEY_ROLE) != render_key:
+                pending.append((render_key, sg_data))
+
+        if not pending:
+            return
+
+        # the type data and the schema values are resolved here, since
+        # looking them up may read the hook or query the schema again,
+        # which can't be done by the background task
+        self._sg_formatter.resolve_schema_values([sg_data for (_, sg_data) in pending])
+        task_id = self._bg_task_manager.add_task(
+            self._render_list_items,
+            group=self._render_task_group,
+            task_kwargs={
+                "formatter": self._sg_formatter,
+                "type_data": self._sg_formatter.type_data,
+                "pending": pending,
+            },
+        )
+        self._render_task_ids.add(task_id)
+
+    def _on_schema_loaded(self):
+        """
+        Renders the list item text once the schema has been loaded
+        """
+        if not self._render_deferred:
+            # the model has been destroyed since
+            return
+        self._render_deferred = False
+        self._schedule_list_item_rendering()
+
+    def _cancel_list_item_rendering(self):
+        """
+        Stops any outstanding list item rendering
+        """
+        self._bg_task_manager.stop_task_group(self._render_task_group)
+        self._render_task_ids.clear()
+
+    @staticmethod
+    def _render_list_items(formatter, type_data, pending):
+        """
+        Background task rendering text for a list of items.
+
+        :param formatter: Formatter to render the text with
+        :param type_data: :class:`ShotgunTypeData` to render the text with
+        :param pending: List of (render_key, sg_data) tuples
+        :returns: List of (entity_type, entity_id, render_key, text) tuples
+        """
+        texts = formatter.format_list_items_details(
+            [sg_data for (_, sg_data) in pending], type_data
+        )
+        return [
+            (sg_data["type"], sg_data["id"], render_key, text)
+            for ((render_key, sg_data), text) in zip(pending, texts)
+        ]
+
+    def _on_render_task_completed(self, task_id, group, result):
+        """
+        Applies rendered list item text to the items in the model
+
+        :param task_id: Id of the task that completed
+        :param group: Group the task belongs to
+        :param result: Return value of :meth:`_render_list_items`
+        """
+        if task_id not in self._render_task_ids:
+            return
+        self._render_task_ids.discard(task_id)
+
+        for (entity_type, entity_id, render_key, text) in result:
+            item = self.item_from_entity(entity_type, entity_id)
+            if item is None:
+                continue
+            # data may have changed while we were busy rendering
+            if self._get_render_key(item.get_sg_data()) != render_key:
+                continue
+            item.setData(text, self.LIST_ITEM_TEXT_ROLE)
+            item.setData(render_key, self._LIST_ITEM_RENDER_KEY_ROLE)
+
+    def _on_render_task_failed(self, task_id, group, message, traceback_str):
+        """
+        Logs list item rendering failures. The delegate will
+        fall back on rendering the text itself.
+
+        :param task_id: Id of the task that failed
+        :param group: Group the task belongs to
+        :param message: Error message
+        :param traceback_str: Stack trace for the error
+        """
+        if task_id not in self._render_task_ids:
+            return
+        self._render_task_ids.discard(task_id)
+        sgtk.platform.current_bundle().log_warning(
+            "Could not render list items: %s" % message
+        )
+
     ############################################################################################
     # protected methods
 
@@ -158,23 +1015,15 @@ class SgEntityListingModel(ShotgunModel):
         # set up publishes with a "thumbnail loading" icon
         item.setIcon(self._sg_formatter.default_pixmap)
 
-    def _populate_thumbnail_image(self, item, field, image, path):
+    def _populate_thumbnail(self, item, field, path):
         """
         Called whenever a thumbnail for an item has arrived on disk. In the case of
         an already cached thumbnail, this may be called very soon after data has been
         loaded, in cases when the thumbs are downloaded from Shotgun, it may happen later.
 
-        This method will be called only if the model has been instantiated with the
-        download_thumbs flag set to be true. It will be called for items which are
-        associated with shotgun entities (in a tree data layout, this is typically
-        leaf nodes).
-
-        This method makes it possible to control how the thumbnail is applied and associated
-        with the item. The default implementation will simply set the thumbnail to be icon
-        of the item, but this can be altered by subclassing this method.
-
-        Any thumbnails requested via the _request_thumbnail_download() method will also
-        resurface via this callback method.
+        The model is instantiated with the bg_load_thumbs flag set to false, so that
+        thumbnails aren't loaded at full size. Instead, the thumbnail is loaded and
+        composited at the size of a list item by :meth:`_request_item_thumbnail`.
 
         :param item: QStandardItem which is associated with the given thumbnail
         :param field: The Shotgun field which the thumbnail is associated with.
@@ -186,6 +1035,77 @@ class SgEntityListingModel(ShotgunModel):
             # ignore and not display.
             return
 
+        self._request_item_thumbnail(item, path)
+
+    def _request_item_thumbnail(self, item, path):
+        """
+        Requests a formatted thumbnail for an item and sets it as
+        the icon of the item, once it is available. The thumbnail is
+        loaded and composited at the size of a list item.
+
+        :param item: QStandardItem which is associated with the given thumbnail
+        :param path: A path on disk to the thumbnail
+        """
+        # keep the path around to restore the thumbnail if it gets evicted
+        item.setData(path, self._THUMBNAIL_PATH_ROLE)
+        item.setData(None, self._THUMBNAIL_EVICTED_ROLE)
+
         sg_data = item.get_sg_data()
-        icon = self._sg_formatter.create_thumbnail(image, sg_data)
-        item.setIcon(QtGui.QIcon(icon))
+        pixmap = self._sg_formatter.request_thumbnail(
+            self._thumbnail_compositor,
+            None,
+            sg_data,
+            path,
+            functools.partial(
+                self._on_item_thumbnail_composited, sg_data["type"], sg_data["id"]
+            ),
+            scale=utils.LIST_ITEM_THUMBNAIL_SCALE,
+        )
+        if pixmap is not None:
+            self._set_item_thumbnail(item, pixmap)
+
+    def _on_item_thumbnail_composited(self, entity_type, entity_id, pixmap):
+        """
+        Sets a thumbnail composited in the background as the icon of an item
+
+        :param entity_type: Entity type of the item
+        :param entity_id: Entity id of the item
+        :param pixmap: Composited thumbnail
+        """
+        item = self.item_from_entity(entity_type, entity_id)
+        if item and not item.data(self._THUMBNAIL_EVICTED_ROLE):
+            self._set_item_thumbnail(item, pixmap)
+
+    def _set_item_thumbnail(self, item, pixmap):
+        """
+        Sets a thumbnail as the icon of an item and
+        accounts for it in the pixmap budget.
+
+        :param item: QStandardItem to set the thumbnail for
+        :param pixmap: Composited thumbnail
+        """
+        item.setIcon(QtGui.QIcon(pixmap))
+        if self._pixmap_budget is not None:
+            sg_data = item.get_sg_data()
+            self._pixmap_budget.add(self, (sg_data["type"], sg_data["id"]), [pixmap])
+
+    def _restore_evicted_thumbnails(self):
+        """
+        Restores the evicted thumbnails of items which have been painted
+        """
+        keys = self._thumbnails_to_restore
+        self._thumbnails_to_restore = set()
+        for key in keys:
+            item = self.item_from_entity(*key)
+            if item and item.data(self._THUMBNAIL_EVICTED_ROLE):
+                self._request_item_thumbnail(item, item.data(self._THUMBNAIL_PATH_ROLE))
+
+    def _release_thumbnails(self):
+        """
+        Stops accounting for the thumbnails of the current items,
+        because the model is about to be cleared.
+        """
+        self._thumbnails_to_restore = set()
+        self._restore_timer.stop()
+        if self._pixmap_budget is not None:
+            self._pixmap_budget.release(self)
@@ -22,7 +22,7 @@ class SgPublishDependencyDownstreamListingModel(SgEntityListingModel):
 
     # note: no constructor implemented - use base class version
 
-    def load_data(self, sg_location):
+    def load_data(self, sg_location, refresh=True):
         """
         Clears the model and sets it up for a particular entity.
         Loads any cached data that exists and schedules an async refresh.
@@ -31,10 +31,13 @@ class SgPublishDependencyDownstreamListingModel(SgEntityListingModel):
                object for which items should be loaded. NOTE! If the model is
                configured to display tasks, this sg_location could for example
                point to a Shot for which we want to display tasks.
+        :param refresh: If False, cached data is not refreshed from Shotgun.
         """
         # for publishes, sort them by id (e.g. creation date) rather than
         # by update date.
-        SgEntityListingModel.load_data(self, sg_location, sort_field="id")
+        SgEntityListingModel.load_data(
+            self, sg_location, sort_field="id", refresh=refresh
+        )
 
     def _get_filters(self):
         """
@@ -34,6 +34,11 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
     version number, type, task etc. Once we have those fields,
     the shotgun model is updated to retrieve all associated
     publishes.
+
+    If a :class:`PublishIdentityCache` has been set and it knows
+    the publish, the first pass is skipped and the associated
+    publishes are retrieved right away. The identity of all
+    publishes in the history is recorded in the cache.
     """
 
     def __init__(self, entity_type, parent, bg_task_manager):
@@ -55,9 +60,15 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
         # tracking the background task
         self._sg_query_id = None
 
+        # whether to refresh the history once the publish details are known
+        self._refresh_history = True
+
         # overlay for reporting errors
         self._overlay = None
 
+        # optional broker to look up the publish details through
+        self._query_broker = None
+
         # init base class
         SgEntityListingModel.__init__(self, entity_type, parent, bg_task_manager)
 
@@ -79,6 +90,26 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
         """
         self._overlay = overlay
 
+    def set_query_broker(self, query_broker):
+        """
+        Specify a query broker to look up the details of the publish through,
+        rather than running a separate query.
+
+        :param query_broker: :class:`QueryBroker` instance
+        """
+        self._query_broker = query_broker
+        self._query_broker.request_completed.connect(self.__on_broker_signal)
+        self._query_broker.request_failed.connect(self.__on_worker_failure)
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        if self._query_broker:
+            self._query_broker.request_completed.disconnect(self.__on_broker_signal)
+            self._query_broker.request_failed.disconnect(self.__on_worker_failure)
+        SgEntityListingModel.destroy(self)
+
     ############################################################################################
     # slots
 
@@ -95,6 +126,13 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
             if self._overlay:
                 self._overlay.show_error_message(full_msg)
 
+    def __on_broker_signal(self, uid, sg_data):
+        """
+        Signaled whenever the query broker completes a request.
+        """
+        if self._sg_query_id == uid:
+            self.__on_worker_signal(uid, None, {"sg": [sg_data] if sg_data else []})
+
     def __on_worker_signal(self, uid, request_type, data):
         """
         Signaled whenever the worker completes something.
@@ -105,6 +143,8 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
         data = shotgun_model.sanitize_qt(data)
 
         if self._sg_query_id == uid:
+            self._sg_query_id = None
+
             # hide spinner
             if self._overlay:
                 self._overlay.hide()
@@ -116,43 +156,9 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
 
             if num_records == 1:
                 sg_data = sg_records[0]
-
-                # figure out which publish type we are after
-                if self._sg_formatter.entity_type == "PublishedFile":
-                    publish_type_field = "published_file_type"
-                else:
-                    publish_type_field = "tank_type"
-
-                # when we filter out which other publishes are associated with this one,
-                # to effectively get the "version history", we look for items
-                # which have the same project, same entity assocation, same name, same type
-                # and the same task.
-                filters = [
-                    ["project", "is", sg_data["project"]],
-                    ["name", "is", sg_data["name"]],
-                    ["task", "is", sg_data["task"]],
-                    ["entity", "is", sg_data["entity"]],
-                    [publish_type_field, "is", sg_data[publish_type_field]],
-                ]
-
-                # the proxy model that is sorting this model will
-                # sort based on id (pk), meaning that more recently
-                # commited transactions will appear later in the list.
-                # This ensures that publishes with no version number defined
-                # (yes, these exist) are also sorted correctly.
-                hierarchy = ["created_at"]
-
-                self._current_version = sg_data["version_number"]
-
-                ShotgunModel._load_data(
-                    self,
-                    self._sg_formatter.entity_type,
-                    filters,
-                    hierarchy,
-                    self._sg_formatter.fields,
-                )
-
-                self._refresh_data()
+                if self._publish_identity_cache:
+                    self._publish_identity_cache.add(sg_data)
+                self.__load_history(sg_data)
 
             elif num_records < 1:
                 error_msg = "Publish could not be found!"
@@ -165,10 +171,95 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
                 else:
                     raise TankError(error_msg)
 
+    def __load_history(self, identity):
+        """
+        Loads all publishes in the version history of a publish
+
+        :param identity: Dictionary with the project, name, task, entity,
+            publish type and version number of the publish
+        """
+        # figure out which publish type we are after
+        if self._sg_formatter.entity_type == "PublishedFile":
+            publish_type_field = "published_file_type"
+        else:
+            publish_type_field = "tank_type"
+
+        # when we filter out which other publishes are associated with this one,
+        # to effectively get the "version history", we look for items
+        # which have the same project, same entity assocation, same name, same type
+        # and the same task.
+        filters = [
+            ["project", "is", identity["project"]],
+            ["name", "is", identity["name"]],
+            ["task", "is", identity["task"]],
+            ["entity", "is", identity["entity"]],
+            [publish_type_field, "is", identity[publish_type_field]],
+        ]
+
+        # the proxy model that is sorting this model will
+        # sort based on id (pk), meaning that more recently
+        # commited transactions will appear later in the list.
+        # This ensures that publishes with no version number defined
+        # (yes, these exist) are also sorted correctly.
+        hierarchy = ["created_at"]
+
+        self._current_version = identity["version_number"]
+
+        # load the identity fields for all versions, so that visiting the
+        # history of any of them can skip the publish details lookup
+        fields = self._sg_formatter.list_item_fields + [
+            "project",
+            "name",
+            "task",
+            "entity",
+            publish_type_field,
+            "version_number",
+        ]
+
+        cache_loaded = ShotgunModel._load_data(
+            self,
+            self._sg_formatter.entity_type,
+            filters,
+            hierarchy,
+            sorted(set(fields)),
+        )
+
+        if self._refresh_history or not cache_loaded:
+            self._refresh_data()
+
+    def __cancel_publish_lookup(self):
+        """
+        Stops the first pass lookup of the publish details, if any
+
+        :returns: True if a lookup was cancelled
+        """
+        self.__sg_data_retriever.clear()
+        if not self._sg_query_id:
+            return False
+
+        if self._query_broker:
+            self._query_broker.cancel(self._sg_query_id)
+        else:
+            self.__sg_data_retriever.stop_work(self._sg_query_id)
+        self._sg_query_id = None
+        return True
+
     ############################################################################################
     # public interface
 
-    def load_data(self, sg_location):
+    def cancel_pending_work(self):
+        """
+        Stops all outstanding work for the current location, including
+        the publish details lookup, and clears the model.
+
+        :returns: Number of requests which were cancelled
+        """
+        num_cancelled = SgEntityListingModel.cancel_pending_work(self)
+        if self.__cancel_publish_lookup():
+            num_cancelled += 1
+        return num_cancelled
+
+    def load_data(self, sg_location, refresh=True):
         """
         Clears the model and sets it up for a particular entity.
         Loads any cached data that exists.
@@ -176,10 +267,21 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
         :param sg_location: Location object representing the *associated*
                object for which items should be loaded. For this class,
                the location should always represent a published file.
+        :param refresh: If False, cached history data is not refreshed
+               from Shotgun once the publish details are known.
         """
         self._sg_location = sg_location
         self._current_version = None
-        self.__sg_data_retriever.clear()
+        self._refresh_history = refresh
+        self.__cancel_publish_lookup()
+
+        identity = None
+        if self._publish_identity_cache:
+            identity = self._publish_identity_cache.get(sg_location.entity_id)
+        if identity:
+            # the version history can be queried right away
+            self.__load_history(identity)
+            return
 
         # figure out which publish type we are after
         if self._sg_formatter.entity_type == "PublishedFile":
@@ -199,9 +301,15 @@ class SgPublishHistoryListingModel(SgEntityListingModel):
         ]
 
         # get publish details async
-        self._sg_query_id = self.__sg_data_retriever.execute_find(
-            self._sg_formatter.entity_type, filters, fields
-        )
+        if self._query_broker:
+            # usually served by the details query for the same publish
+            self._sg_query_id = self._query_broker.request(
+                self._sg_formatter.entity_type, sg_location.entity_id, fields
+            )
+        else:
+            self._sg_query_id = self.__sg_data_retriever.execute_find(
+                self._sg_formatter.entity_type, filters, fields
+            )
 
     def is_highlighted(self, model_index):
         """
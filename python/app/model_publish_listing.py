@@ -19,8 +19,23 @@ class SgLatestPublishListingModel(SgEntityListingModel):
     Model which fetches publish objects with the option to collapse
     the list of returned data so that only the latest version of each
     publish is shown.
+
+    The model always holds all versions it has loaded. Each item is
+    flagged in the LATEST_FILTER_ROLE role with SHOWN if it should be
+    displayed in the current mode, so that a proxy model filtering on
+    this role can collapse the listing. Toggling the mode only updates
+    the flags and doesn't require any new data.
+
+    When only the latest versions are shown, additional pages are loaded
+    until SG_RECORD_LIMIT distinct publishes are available, so that the
+    first page of the listing is filled even if many versions exist for
+    each publish.
     """
 
+    # role holding SHOWN for items to display in the current mode
+    LATEST_FILTER_ROLE = QtCore.Qt.UserRole + 130
+    (SHOWN, HIDDEN) = ("shown", "hidden")
+
     def __init__(self, entity_type, parent, bg_task_manager):
         """
         Constructor.
@@ -33,18 +48,29 @@ class SgLatestPublishListingModel(SgEntityListingModel):
         self._show_latest_only = False
         self._publish_type_field = None
 
+        # the location and query the model was last loaded for
+        self._loaded_query = None
+
         # init base class
         SgEntityListingModel.__init__(self, entity_type, parent, bg_task_manager)
 
-    def load_data(self, sg_location, show_latest_only):
+        self.cache_loaded.connect(self._on_data_loaded)
+        self.data_refreshed.connect(self._on_data_loaded)
+
+    def load_data(self, sg_location, show_latest_only, refresh=True):
         """
         Clears the model and sets it up for a particular entity.
 
+        If the model is already loaded for the location, only the
+        latest only mode is updated, using the data already loaded.
+
         :param sg_location: Location object representing the *associated*
                object for which items should be loaded.
 
         :param show_latest_only: If true, the listing will be culled so that
                only latest items are shown.
+
+        :param refresh: If False, cached data is not refreshed from Shotgun.
         """
         # figure out our current entity type
         if self._sg_formatter.entity_type == "PublishedFile":
@@ -52,86 +78,158 @@ class SgLatestPublishListingModel(SgEntityListingModel):
         else:
             self._publish_type_field = "tank_type"
 
+        loaded_query = (sg_location.entity_type, sg_location.entity_id)
+        if (
+            show_latest_only != self._show_latest_only
+            and loaded_query == self._loaded_query
+            and self._page_query is not None
+            and self.rowCount() > 0
+        ):
+            # only the mode changed and the data for both modes is loaded
+            self._show_latest_only = show_latest_only
+            self._on_data_loaded()
+            return
+
         self._show_latest_only = show_latest_only
+        self._loaded_query = loaded_query
 
         SgEntityListingModel.load_data(
             self,
             sg_location,
-            additional_fields=["version", "task", self._publish_type_field],
+            # the identity fields allow the version history of the
+            # listed publishes to be loaded in a single query
+            additional_fields=[
+                "version",
+                "task",
+                self._publish_type_field,
+                "project",
+                "name",
+                "entity",
+                "version_number",
+            ],
             sort_field="created_at",
+            refresh=refresh,
         )
 
-    def _before_data_processing(self, sg_data_list):
+    def cancel_pending_work(self):
         """
-        Called just after data has been retrieved from Shotgun but before any processing
-        takes place. This makes it possible for deriving classes to perform summaries,
-        calculations and other manipulations of the data before it is passed on to the model
-        class.
+        Stops all outstanding work for the current location and clears the model.
 
-        :param sg_data_list: list of shotgun dictionaries, as returned by the find() call.
-        :returns: should return a list of shotgun dictionaries, on the same form as the input.
+        :returns: Number of requests which were cancelled
         """
-        if not self._show_latest_only:
-            # show everything
-            new_sg_data_list = sg_data_list
+        self._loaded_query = None
+        return SgEntityListingModel.cancel_pending_work(self)
 
-        else:
+    def _get_publish_key(self, sg_item):
+        """
+        Returns the key grouping all versions of a publish
+
+        :param sg_item: Shotgun data dictionary for a publish
+        :returns: (name, type id, task id) tuple
+        """
+        # get the associated type
+        type_id = None
+        type_link = sg_item.get(self._publish_type_field)
+        if type_link:
+            type_id = type_link["id"]
+
+        # also get the associated task
+        task_id = None
+        task_link = sg_item.get("task")
+        if task_link:
+            task_id = task_link["id"]
 
-            # filter the shotgun data so that we only return the latest publish for each file.
-
-            # FIRST PASS!
-            # get a dict with only the latest versions, grouped by type and task
-            # rely on the fact that versions are returned in desc order from sg.
-            # (this is defined in SgEntityListingModel)
-            #
-            # for example, if there are these publishes:
-            # name FOO, version 1, task ANIM, type XXX
-            # name FOO, version 2, task ANIM, type XXX
-            # name FOO, version 3, task ANIM, type XXX
-            # name FOO, version 1, task ANIM, type YYY
-            # name FOO, version 2, task ANIM, type YYY
-            # name FOO, version 5, task LAY,  type YYY
-            # name FOO, version 6, task LAY,  type YYY
-            # name FOO, version 7, task LAY,  type YYY
-            #
-            # three items should show up:
-            # - Foo v3 (type XXX)
-            # - Foo v2 (type YYY, task ANIM)
-            # - Foo v7 (type YYY, task LAY)
-
-            unique_data = {}
-
-            # the data is passed from sg in desc order, with the highest version
-            # first.
-            for sg_item in sg_data_list:
-
-                # get the associated type
-                type_id = None
-                type_link = sg_item[self._publish_type_field]
-                if type_link:
-                    type_id = type_link["id"]
-
-                # also get the associated task
-                task_id = None
-                task_link = sg_item["task"]
-                if task_link:
-                    task_id = task_link["id"]
-
-                # get a unique key to track this publish group
-                unique_key = (sg_item["name"], type_id, task_id)
-
-                # add records only if a record doesn't already exist
-                # the data arrives in desc order, so we know that
-                # if a record already exists, it must have a higher
-                # version than the current one. So skip current one.
-                if unique_key not in unique_data:
-                    unique_data[unique_key] = sg_item
-
-            # Make sure we get a list because the model is going to filter
-            # this list of entries in place and Python3's .values returns
-            # an iterator.
-            new_sg_data_list = list(unique_data.values())
-
-        # now return this culled data set as our new set of shotgun data, now only
-        # including the latest publishes
-        return SgEntityListingModel._before_data_processing(self, new_sg_data_list)
+        return (sg_item.get("name"), type_id, task_id)
+
+    def _count_distinct_publishes(self):
+        """
+        Returns the number of distinct publishes loaded for the current
+        query, including pages which have not been merged in yet.
+        """
+        keys = set()
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            sg_data = root.child(row).get_sg_data()
+            if sg_data:
+                keys.add(self._get_publish_key(sg_data))
+
+        pages = self._page_cache.get(self._get_page_query_key(), {})
+        for page_data in pages.values():
+            for sg_item in page_data:
+                keys.add(self._get_publish_key(sg_item))
+
+        return len(keys)
+
+    def _on_data_loaded(self):
+        """
+        Flags the items to display in the current mode and requests more
+        pages if not enough distinct publishes have been loaded.
+        """
+        # filter the shotgun data so that we only show the latest publish for each file.
+        #
+        # for example, if there are these publishes:
+        # name FOO, version 1, task ANIM, type XXX
+        # name FOO, version 2, task ANIM, type XXX
+        # name FOO, version 3, task ANIM, type XXX
+        # name FOO, version 1, task ANIM, type YYY
+        # name FOO, version 2, task ANIM, type YYY
+        # name FOO, version 5, task LAY,  type YYY
+        # name FOO, version 6, task LAY,  type YYY
+        # name FOO, version 7, task LAY,  type YYY
+        #
+        # three items should show up:
+        # - Foo v3 (type XXX)
+        # - Foo v2 (type YYY, task ANIM)
+        # - Foo v7 (type YYY, task LAY)
+        latest_items = {}
+        items = []
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            item = root.child(row)
+            sg_data = item.get_sg_data()
+            if not sg_data:
+                continue
+            items.append(item)
+
+            # items may be in any order, so compare creation dates explicitly
+            # rather than relying on the desc order of the data from sg.
+            unique_key = self._get_publish_key(sg_data)
+            order_key = (sg_data.get("created_at") or 0, sg_data["id"])
+            if (
+                unique_key not in latest_items
+                or latest_items[unique_key][0] < order_key
+            ):
+                latest_items[unique_key] = (order_key, item)
+
+        latest = set(id(item) for (_, item) in latest_items.values())
+        for item in items:
+            if not self._show_latest_only or id(item) in latest:
+                flag = self.SHOWN
+            else:
+                flag = self.HIDDEN
+            if item.data(self.LATEST_FILTER_ROLE) != flag:
+                item.setData(flag, self.LATEST_FILTER_ROLE)
+
+        if (
+            self._show_latest_only
+            and self.more_pages_available
+            and self._count_distinct_publishes() < self.SG_RECORD_LIMIT
+        ):
+            self.fetch_next_page()
+
+    def _on_page_stored(self, page_data):
+        """
+        Chains page requests while only the latest versions are shown and
+        not enough distinct publishes have been loaded. The pages are
+        merged into the model once the last page of the chain has arrived.
+
+        :param page_data: List of shotgun dictionaries in the page
+        """
+        if (
+            self._show_latest_only
+            and len(page_data) == self.SG_RECORD_LIMIT
+            and self._count_distinct_publishes() < self.SG_RECORD_LIMIT
+        ):
+            self.fetch_next_page()
+        else:
+            SgEntityListingModel._on_page_stored(self, page_data)
@@ -8,11 +8,13 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import functools
+
 from sgtk.platform.qt import QtCore, QtGui
 import sgtk
-from . import utils
 
 from .model_entity_listing import SgEntityListingModel
+from . import utils
 
 # import the shotgun_model module from the shotgun utils framework
 shotgun_model = sgtk.platform.import_framework(
@@ -31,6 +33,11 @@ class SgTaskListingModel(SgEntityListingModel):
     Therefore, when the task list has arrived, a signal is set to a second
     model which then fetches the thumbnails for all users assigned to tasks.
 
+    The tasks assigned to each user are indexed when the task list arrives,
+    and each user thumbnail is taken from the panel wide avatar cache and
+    shared by all of their tasks. Thumbnails are only requested for users
+    whose image isn't in the avatar cache yet.
+
     :signal request_user_thumbnails(list): Emitted when this class is signalling
         that it needs thumbnails for users. A list of user ids for which
         thumbnails are needed are passed as arguments with the signal.
@@ -38,20 +45,30 @@ class SgTaskListingModel(SgEntityListingModel):
 
     request_user_thumbnails = QtCore.Signal(list)
 
-    def __init__(self, entity_type, parent, bg_task_manager):
+    def __init__(
+        self, entity_type, parent, bg_task_manager, thumbnail_task_manager=None
+    ):
         """
         Constructor.
 
         :param entity_type: The entity type that should be loaded into this model.
                             Needs to be a PublishedFile or TankPublishedFile.
         :param parent: QT parent object
+        :param bg_task_manager: task manager used to process data
+        :param thumbnail_task_manager: Optional task manager used to fetch
+            the thumbnails of task assignees. Defaults to bg_task_manager.
         """
         # init base class
         SgEntityListingModel.__init__(self, entity_type, parent, bg_task_manager)
         self.data_refreshed.connect(self._on_data_refreshed)
 
+        # user id -> list of (task type, task id) for the tasks assigned to the user
+        self._assignee_index = {}
+
         # have a model to pull down user's thumbnails for task assingments
-        self._task_assignee_model = TaskAssigneeModel(self, bg_task_manager)
+        self._task_assignee_model = TaskAssigneeModel(
+            self, thumbnail_task_manager or bg_task_manager
+        )
         self._task_assignee_model.thumbnail_updated.connect(self._on_user_thumb)
 
     def destroy(self):
@@ -68,41 +85,99 @@ class SgTaskListingModel(SgEntityListingModel):
     ############################################################################################
     # public interface
 
+    def cancel_pending_work(self):
+        """
+        Stops all outstanding work for the current location, including
+        the assignee thumbnails, and clears the model.
+
+        :returns: Number of requests which were cancelled
+        """
+        # assignee thumbnails still in flight are dropped once cleared
+        self._task_assignee_model.clear()
+        self._assignee_index = {}
+        return SgEntityListingModel.cancel_pending_work(self)
+
     def _on_data_refreshed(self):
         """
         helper method. dispatches the after-refresh signal
         so that a data_updated signal is consistently sent
         out both after the data has been updated and after a cache has been read in
         """
-        if self._sg_location.entity_type not in ["HumanUser", "Project"]:
-            # show square thumbs for users and project (my tasks)
-            # for other types, fetch user thumbnails
-            rows = self.rowCount()
+        self._assignee_index = {}
 
-            # get the task assignees
-            assignees = []
-            for x in range(rows):
-                data = self.item(x).get_sg_data()
-                assignees.extend(data["task_assignees"])
-            user_ids = [x["id"] for x in assignees]
+        if self._sg_location.entity_type in ["HumanUser", "Project"]:
+            # show square thumbs for users and project (my tasks)
+            return
 
+        # for other types, index the tasks by assignee
+        # user id -> icon from the avatar cache, or None if not cached
+        icons = {}
+        for row in range(self.rowCount()):
+            item = self.item(row)
+            data = item.get_sg_data()
+            icon = None
+            for assignee in data.get("task_assignees") or []:
+                if assignee.get("type") != "HumanUser":
+                    # groups don't have thumbnails
+                    continue
+                task_keys = self._assignee_index.setdefault(assignee["id"], [])
+                task_keys.append((data["type"], data["id"]))
+                if assignee["id"] not in icons:
+                    icons[assignee["id"]] = self._get_cached_icon(assignee["id"])
+                icon = icon or icons[assignee["id"]]
+
+            if icon:
+                # the thumbnail has already been composited
+                item.setIcon(icon)
+
+        # only fetch thumbnails for users not in the avatar cache
+        user_ids = sorted(user_id for (user_id, icon) in icons.items() if not icon)
+        if user_ids:
             self.request_user_thumbnails.emit(user_ids)
 
-    def _on_user_thumb(self, sg_data, image):
+    def _on_user_thumb(self, sg_data, image, path):
         """
         When a user thumb arrives from the
         user thumbnail retriever
         """
-        rows = self.rowCount()
+        pixmap = self._sg_formatter.request_thumbnail(
+            self._thumbnail_compositor,
+            image,
+            sg_data,
+            path,
+            functools.partial(self._set_assignee_thumbnail, sg_data["id"]),
+            scale=utils.LIST_ITEM_THUMBNAIL_SCALE,
+        )
+        if pixmap is not None:
+            self._set_assignee_thumbnail(sg_data["id"], pixmap)
 
-        for x in range(rows):
-            item = self.item(x)
-            data = item.get_sg_data()
-            user_ids = [x["id"] for x in data["task_assignees"]]
-            if sg_data["id"] in user_ids:
+    def _set_assignee_thumbnail(self, user_id, pixmap):
+        """
+        Sets a user thumbnail as the icon of all tasks assigned to the user
+
+        :param user_id: Id of the user
+        :param pixmap: Composited user thumbnail
+        """
+        icon = QtGui.QIcon(pixmap)
+        for (task_type, task_id) in self._assignee_index.get(user_id, []):
+            item = self.item_from_entity(task_type, task_id)
+            if item:
                 # this thumbnail should be assigned
-                icon = self._sg_formatter.create_thumbnail(image, sg_data)
-                item.setIcon(QtGui.QIcon(icon))
+                item.setIcon(icon)
+
+    def _get_cached_icon(self, user_id):
+        """
+        Returns an icon for a user from the avatar cache
+
+        :param user_id: Id of a HumanUser
+        :returns: QIcon or None if the user image isn't cached
+        """
+        pixmap = self._sg_formatter.get_cached_avatar(
+            "HumanUser", user_id, scale=utils.LIST_ITEM_THUMBNAIL_SCALE
+        )
+        if pixmap is None:
+            return None
+        return QtGui.QIcon(pixmap)
 
     def _populate_default_thumbnail(self, item):
         """
@@ -115,27 +190,19 @@ class SgTaskListingModel(SgEntityListingModel):
         if self._sg_location.entity_type in ["HumanUser", "Project"]:
             # TODO - refactor this into a nicer piece of code
             # show square thumbs for users and project (my tasks)
-            item.setIcon(self._sg_formatter._rect_default_icon)
+            item.setIcon(self._sg_formatter.rect_default_pixmap)
         else:
-            item.setIcon(self._sg_formatter._round_default_icon)
+            item.setIcon(self._sg_formatter.round_default_pixmap)
 
-    def _populate_thumbnail_image(self, item, field, image, path):
+    def _populate_thumbnail(self, item, field, path):
         """
         Called whenever a thumbnail for an item has arrived on disk. In the case of
         an already cached thumbnail, this may be called very soon after data has been
         loaded, in cases when the thumbs are downloaded from Shotgun, it may happen later.
 
-        This method will be called only if the model has been instantiated with the
-        download_thumbs flag set to be true. It will be called for items which are
-        associated with shotgun entities (in a tree data layout, this is typically
-        leaf nodes).
-
-        This method makes it possible to control how the thumbnail is applied and associated
-        with the item. The default implementation will simply set the thumbnail to be icon
-        of the item, but this can be altered by subclassing this method.
-
-        Any thumbnails requested via the _request_thumbnail_download() method will also
-        resurface via this callback method.
+        The model is instantiated with the bg_load_thumbs flag set to false, so that
+        thumbnails aren't loaded at full size. Instead, the thumbnail is loaded and
+        composited at the size of a list item by :meth:`_request_item_thumbnail`.
 
         :param item: QStandardItem which is associated with the given thumbnail
         :param field: The Shotgun field which the thumbnail is associated with.
@@ -149,9 +216,7 @@ class SgTaskListingModel(SgEntityListingModel):
 
         if self._sg_location.entity_type in ["HumanUser", "Project"]:
             # show square thumbs for users and project (my tasks)
-            sg_data = item.get_sg_data()
-            icon = self._sg_formatter.create_thumbnail(image, sg_data)
-            item.setIcon(QtGui.QIcon(icon))
+            self._request_item_thumbnail(item, path)
 
 
 class TaskAssigneeModel(ShotgunModel):
@@ -167,12 +232,13 @@ class TaskAssigneeModel(ShotgunModel):
     and whenever this fires, it retrieves those thumbnails from shotgun
     and emits a thumbnail_updated signal for each one of them.
 
-    :signal thumbnail_updated(dict, QImage): Emitted whenever a thumbnail
+    :signal thumbnail_updated(dict, QImage, str): Emitted whenever a thumbnail
         is available. the dictionary contains shotgun data about the user
-        and the thumbnail and the QImage holds the actual thumbnail object.
+        and the thumbnail, the QImage holds the actual thumbnail object and
+        the string is the path to the thumbnail on disk.
     """
 
-    thumbnail_updated = QtCore.Signal(dict, QtGui.QImage)
+    thumbnail_updated = QtCore.Signal(dict, QtGui.QImage, object)
 
     def __init__(self, parent, bg_task_manager):
         """
@@ -226,6 +292,5 @@ class TaskAssigneeModel(ShotgunModel):
         :param image: Image object representing the thumbnail
         :param path: A path on disk to the thumbnail. This is a file in jpeg format.
         """
-        self._current_pixmap = utils.create_round_thumbnail(image)
         sg_data = item.get_sg_data()
-        self.thumbnail_updated.emit(sg_data, image)
+        self.thumbnail_updated.emit(sg_data, image, path)
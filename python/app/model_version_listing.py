@@ -78,7 +78,7 @@ class SgVersionModel(SgEntityListingModel):
     ############################################################################################
     # public interface
 
-    def load_data(self, sg_location, show_pending_only, sort_field="id"):
+    def load_data(self, sg_location, show_pending_only, sort_field="id", refresh=True):
         """
         Clears the model and sets it up for a particular entity.
 
@@ -87,6 +87,8 @@ class SgVersionModel(SgEntityListingModel):
 
         :param show_pending_only: If true, the listing will be culled so that
                only items pending review are shown
+
+        :param refresh: If False, cached data is not refreshed from Shotgun.
         """
         # figure out our current entity type
         self._show_pending_only = show_pending_only
@@ -99,4 +101,5 @@ class SgVersionModel(SgEntityListingModel):
             sg_location,
             additional_fields=["sg_status_list"],
             sort_field=sort_field,
+            refresh=refresh,
         )
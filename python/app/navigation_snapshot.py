@@ -0,0 +1,187 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import time
+
+
+class NavigationSnapshot(object):
+    """
+    In memory snapshot of what the panel displayed for a location,
+    used to repaint the panel right away when stepping through history.
+    """
+
+    def __init__(self, timestamp, details, tab_name, tab_load_key, list_items):
+        """
+        Constructor
+
+        :param timestamp: Unix time at which the data was last refreshed from Shotgun
+        :param details: Dictionary with the details area state, with the keys
+            header, header_tooltip, body, body_tooltip and pixmap.
+        :param tab_name: Name of the tab which was displayed
+        :param tab_load_key: Key identifying the data loaded into the tab
+        :param list_items: Rendered list items of the tab, as returned by
+            :meth:`SgEntityListingModel.get_list_item_snapshot`, or None
+            if the tab doesn't display a listing.
+        """
+        self.timestamp = timestamp
+        self.details = details
+        self.tab_name = tab_name
+        self.tab_load_key = tab_load_key
+        self.list_items = list_items
+
+        # view state of the tab, set once captured
+        self.scroll_position = 0
+        self.selected_entities = []
+
+    def __repr__(self):
+        return "<Snapshot of %s tab, %d seconds old>" % (self.tab_name, self.age)
+
+    @property
+    def age(self):
+        """
+        Number of seconds since the data was refreshed from Shotgun
+        """
+        return time.time() - self.timestamp
+
+    @property
+    def images(self):
+        """
+        List of the pixmaps and icons held by the snapshot
+        """
+        images = [self.details.get("pixmap")]
+        if self.list_items:
+            images.extend(list_item[4] for list_item in self.list_items)
+        return images
+
+    def discard_images(self):
+        """
+        Releases the pixmaps and icons held by the snapshot. Once restored,
+        the thumbnails are loaded the same way as for a new location.
+        """
+        self.details["pixmap"] = None
+        if self.list_items:
+            self.list_items = [list_item[:4] + (None,) for list_item in self.list_items]
+
+
+class NavigationSnapshotCache(object):
+    """
+    Bounded cache of :class:`NavigationSnapshot` objects, keyed by location.
+    The least recently used snapshots are discarded first.
+
+    If a :class:`PixmapBudget` is given, the images held by the snapshots are
+    accounted in it, and discarded when the budget evicts them.
+    """
+
+    # number of snapshots kept in memory
+    MAX_ENTRIES = 20
+
+    def __init__(self, max_age, pixmap_budget=None):
+        """
+        Constructor
+
+        :param max_age: Number of seconds after which snapshots are
+            considered too old to be displayed without a refresh.
+        :param pixmap_budget: Optional :class:`PixmapBudget` instance
+        """
+        self._max_age = max_age
+        self._pixmap_budget = pixmap_budget
+        self._snapshots = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def get(self, entity_type, entity_id):
+        """
+        Returns the snapshot for a location
+
+        :param entity_type: Entity type of the location
+        :param entity_id: Entity id of the location
+        :returns: :class:`NavigationSnapshot` or None
+        """
+        key = (entity_type, entity_id)
+        snapshot = self._snapshots.pop(key, None)
+        if snapshot is not None:
+            self._snapshots[key] = snapshot
+            if self._pixmap_budget is not None:
+                self._pixmap_budget.touch(self, key)
+        return snapshot
+
+    def store(self, entity_type, entity_id, snapshot):
+        """
+        Stores the snapshot for a location, replacing any previous one
+
+        :param entity_type: Entity type of the location
+        :param entity_id: Entity id of the location
+        :param snapshot: :class:`NavigationSnapshot` to store
+        """
+        key = (entity_type, entity_id)
+        self._snapshots.pop(key, None)
+        self._snapshots[key] = snapshot
+        while len(self._snapshots) > self.MAX_ENTRIES:
+            (evicted_key, _) = self._snapshots.popitem(last=False)
+            if self._pixmap_budget is not None:
+                self._pixmap_budget.discard(self, evicted_key)
+
+        if self._pixmap_budget is not None:
+            self._pixmap_budget.add(self, key, snapshot.images)
+
+    def is_fresh(self, snapshot):
+        """
+        Checks if a snapshot can be displayed without a refresh
+
+        :param snapshot: :class:`NavigationSnapshot` to check
+        """
+        return snapshot.age <= self._max_age
+
+    def invalidate(self, entity_keys):
+        """
+        Discards the snapshots of locations which are, or display,
+        any of the given entities, for example because they changed.
+
+        :param entity_keys: Set of (entity_type, entity_id) tuples
+        :returns: Number of snapshots discarded
+        """
+        num_discarded = 0
+        for (key, snapshot) in list(self._snapshots.items()):
+            if key not in entity_keys and not any(
+                list_item[:2] in entity_keys for list_item in snapshot.list_items or []
+            ):
+                continue
+            del self._snapshots[key]
+            if self._pixmap_budget is not None:
+                self._pixmap_budget.discard(self, key)
+            num_discarded += 1
+        return num_discarded
+
+    def clear(self):
+        """
+        Discards all snapshots
+        """
+        self._snapshots = collections.OrderedDict()
+        if self._pixmap_budget is not None:
+            self._pixmap_budget.release(self)
+
+    def is_displayed(self):
+        """
+        Snapshots are never displayed directly, see :class:`PixmapBudget`.
+        """
+        return False
+
+    def evict_images(self, key):
+        """
+        Releases the images held by the snapshot of a location.
+        Called by the pixmap budget.
+
+        :param key: (entity_type, entity_id) tuple identifying the location
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            snapshot.discard_images()
@@ -0,0 +1,90 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+
+import sgtk
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class NavigationTracker(object):
+    """
+    Keeps track of navigation generations in the panel.
+
+    Every time the panel navigates to a different location, a new generation
+    starts, and all work belonging to the previous location is stale.
+    Refreshing the current location does not start a new generation.
+
+    The tracker also logs debug statistics of how much stale work was
+    cancelled before it ran or dropped after it completed.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._generation = 0
+        self._location_key = None
+        self._cancelled = collections.defaultdict(int)
+        self._dropped = collections.defaultdict(int)
+
+    def __repr__(self):
+        return "<Navigation generation %d>" % self._generation
+
+    def navigate(self, entity_type, entity_id):
+        """
+        Starts a new generation if the given location differs from the
+        location of the current generation.
+
+        :param entity_type: Entity type of the location
+        :param entity_id: Entity id of the location
+        :returns: True if a new generation was started
+        """
+        location_key = (entity_type, entity_id)
+        if location_key == self._location_key:
+            return False
+
+        self._location_key = location_key
+        self._generation += 1
+        logger.debug("Navigated to %s %s, %r", entity_type, entity_id, self)
+        return True
+
+    def record_cancelled(self, kind, count=1):
+        """
+        Records stale work that was cancelled before it ran
+
+        :param kind: Kind of work, e.g. "tab prefetch"
+        :param count: Number of items cancelled
+        """
+        if count:
+            self._cancelled[kind] += count
+            logger.debug(
+                "Cancelled %d stale %s item(s), %d in total.",
+                count,
+                kind,
+                self._cancelled[kind],
+            )
+
+    def record_dropped(self, kind, count=1):
+        """
+        Records stale work that completed but was dropped
+
+        :param kind: Kind of work, e.g. "thumbnail"
+        :param count: Number of items dropped
+        """
+        if count:
+            self._dropped[kind] += count
+            logger.debug(
+                "Dropped %d stale %s item(s), %d in total.",
+                count,
+                kind,
+                self._dropped[kind],
+            )
@@ -0,0 +1,176 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+
+import sgtk
+from sgtk.platform.qt import QtGui
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class PixmapBudget(object):
+    """
+    Bounds the memory used by the thumbnails the panel holds on to.
+
+    Owners, like the tab models and the navigation history, add the images
+    they hold under a key of their choice and touch them whenever they are
+    displayed. Once the total size of all images exceeds the budget, the
+    least recently displayed images are evicted by calling the
+    ``evict_images(key)`` method of their owner. Owners which are currently
+    displayed, as reported by their ``is_displayed()`` method, are skipped.
+    Owners are expected to restore evicted images when they are needed again.
+
+    Images are identified by their cache key, so that an image held by
+    several owners, like a tab model and a snapshot of it, is only counted
+    once, and only frees memory once all owners holding it have evicted it.
+    Images are counted whether or not the thumbnail cache also holds them,
+    since they outlive their entry in it.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Constructor
+
+        :param max_bytes: Number of bytes of image data to keep
+        """
+        self._max_bytes = max_bytes
+        # (id(owner), key) -> (owner, key, list of image cache keys)
+        self._entries = collections.OrderedDict()
+        # image cache key -> [number of bytes, number of entries holding it]
+        self._images = {}
+        self._total_bytes = 0
+
+    def __repr__(self):
+        return "<Pixmap budget using %d of %d bytes>" % (
+            self._total_bytes,
+            self._max_bytes,
+        )
+
+    @property
+    def total_bytes(self):
+        """
+        Number of bytes of image data currently accounted for
+        """
+        return self._total_bytes
+
+    def add(self, owner, key, images):
+        """
+        Accounts for images held by an owner, replacing any images previously
+        added under the same key, and evicts images if the budget is exceeded.
+
+        :param owner: Object holding the images
+        :param key: Key identifying the images for the owner
+        :param images: List of QPixmap or QIcon objects, which may contain None
+        """
+        image_keys = []
+        for image in images:
+            if image is None or image.isNull():
+                continue
+            image_key = self._get_cache_key(image)
+            if image_key in self._images:
+                self._images[image_key][1] += 1
+            else:
+                self._images[image_key] = [self._get_size(image), 1]
+                self._total_bytes += self._images[image_key][0]
+            image_keys.append(image_key)
+
+        self.discard(owner, key)
+        self._entries[(id(owner), key)] = (owner, key, image_keys)
+        self._evict()
+
+    def touch(self, owner, key):
+        """
+        Marks images as displayed, so that they are evicted last
+
+        :param owner: Object holding the images
+        :param key: Key identifying the images for the owner
+        """
+        entry = self._entries.pop((id(owner), key), None)
+        if entry is not None:
+            self._entries[(id(owner), key)] = entry
+
+    def discard(self, owner, key):
+        """
+        Stops accounting for images, for example because the owner released them
+
+        :param owner: Object holding the images
+        :param key: Key identifying the images for the owner
+        """
+        entry = self._entries.pop((id(owner), key), None)
+        if entry is not None:
+            self._release_images(entry[2])
+
+    def release(self, owner):
+        """
+        Stops accounting for all images of an owner
+
+        :param owner: Object holding the images
+        """
+        for entry_key in list(self._entries):
+            if entry_key[0] == id(owner):
+                (_, _, image_keys) = self._entries.pop(entry_key)
+                self._release_images(image_keys)
+
+    def _evict(self):
+        """
+        Evicts the least recently displayed images of owners which
+        are not displayed until the budget is met.
+        """
+        if self._total_bytes <= self._max_bytes:
+            return
+
+        num_evicted = 0
+        for (entry_key, (owner, key, image_keys)) in list(self._entries.items()):
+            if self._total_bytes <= self._max_bytes:
+                break
+            if owner.is_displayed():
+                continue
+            del self._entries[entry_key]
+            self._release_images(image_keys)
+            owner.evict_images(key)
+            num_evicted += 1
+
+        logger.debug("Evicted %d images, %r", num_evicted, self)
+
+    def _release_images(self, image_keys):
+        """
+        Stops accounting for images no longer held by an entry
+
+        :param image_keys: List of image cache keys
+        """
+        for image_key in image_keys:
+            image = self._images[image_key]
+            image[1] -= 1
+            if not image[1]:
+                del self._images[image_key]
+                self._total_bytes -= image[0]
+
+    def _get_cache_key(self, image):
+        """
+        Returns the cache key of a QPixmap, or of the pixmap held by a QIcon.
+        Icons created from a pixmap return it as is at its own size, so both
+        share the same cache key.
+        """
+        if isinstance(image, QtGui.QIcon):
+            sizes = image.availableSizes()
+            return image.pixmap(sizes[0]).cacheKey() if sizes else image.cacheKey()
+        return image.cacheKey()
+
+    def _get_size(self, image):
+        """
+        Returns the number of bytes used by a QPixmap or all sizes of a QIcon
+        """
+        if isinstance(image, QtGui.QIcon):
+            # icons hold 32 bit pixmaps
+            return sum(
+                size.width() * size.height() * 4 for size in image.availableSizes()
+            )
+        return image.width() * image.height() * max(image.depth(), 8) // 8
@@ -0,0 +1,101 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+
+
+class PublishIdentityCache(object):
+    """
+    In memory cache of the fields identifying which version history a
+    publish belongs to: its project, name, task, entity and publish type.
+
+    The cache is filled from any data containing these fields, typically
+    listings of publishes, so that the version history of a publish can be
+    queried right away rather than after looking up the publish itself.
+    """
+
+    # number of publishes kept in memory
+    MAX_ENTRIES = 2000
+
+    def __init__(self, entity_type):
+        """
+        Constructor
+
+        :param entity_type: Publish entity type, PublishedFile or TankPublishedFile
+        """
+        self._entity_type = entity_type
+        if entity_type == "PublishedFile":
+            self._publish_type_field = "published_file_type"
+        else:
+            self._publish_type_field = "tank_type"
+
+        # publish id -> identity dictionary
+        self._identities = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._identities)
+
+    @property
+    def identity_fields(self):
+        """
+        List of fields making up the identity of a publish
+        """
+        return [
+            "project",
+            "name",
+            "task",
+            "entity",
+            self._publish_type_field,
+            "version_number",
+        ]
+
+    def get(self, publish_id):
+        """
+        Returns the identity of a publish
+
+        :param publish_id: Id of the publish
+        :returns: Dictionary with the identity fields or None if unknown
+        """
+        identity = self._identities.pop(publish_id, None)
+        if identity is not None:
+            self._identities[publish_id] = identity
+        return identity
+
+    def add(self, sg_data):
+        """
+        Records the identity of a publish, if the data contains all
+        identity fields.
+
+        :param sg_data: Shotgun data dictionary for a publish
+        :returns: True if the identity was recorded
+        """
+        if not sg_data or sg_data.get("type") != self._entity_type:
+            return False
+
+        fields = self.identity_fields
+        if not all(field in sg_data for field in fields):
+            return False
+
+        self._identities.pop(sg_data["id"], None)
+        self._identities[sg_data["id"]] = dict(
+            (field, sg_data[field]) for field in fields
+        )
+        while len(self._identities) > self.MAX_ENTRIES:
+            self._identities.popitem(last=False)
+        return True
+
+    def add_records(self, sg_data_list):
+        """
+        Records the identity of all publishes containing the identity fields
+
+        :param sg_data_list: List of shotgun data dictionaries
+        """
+        for sg_data in sg_data_list:
+            self.add(sg_data)
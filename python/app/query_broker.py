@@ -0,0 +1,396 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import datetime
+import itertools
+import time
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+shotgun_model = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_model"
+)
+shotgun_data = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_data"
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class QueryBroker(QtCore.QObject):
+    """
+    Panel wide broker for requests of fields of single entities.
+
+    Requests made during the same event loop iteration are merged, so that
+    all requests for an entity type are served by a single find with the
+    union of the requested fields. Requests are also attached to queries
+    already in flight when those cover the requested fields, and recently
+    fetched records are served from memory.
+
+    Models running their own queries, like the details model, can act
+    as carriers: they announce the entity and fields they are loading and
+    publish the result, which then serves any requests it covers. Requests
+    for fields outside of what a carrier loads are fetched separately.
+
+    :signal request_completed(str, object): Emitted with the request id and
+        the shotgun data dictionary for the entity, or None if the entity
+        doesn't exist.
+    :signal request_failed(str, str): Emitted with the request id and an
+        error message.
+    """
+
+    request_completed = QtCore.Signal(str, object)
+    request_failed = QtCore.Signal(str, str)
+
+    # number of records kept in memory
+    MAX_MEMO_ENTRIES = 100
+
+    # number of seconds records are served from memory
+    MEMO_TIME_TO_LIVE = 30.0
+
+    def __init__(self, parent, bg_task_manager):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        :param bg_task_manager: Task manager used to run queries
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self._uid_counter = itertools.count(1)
+
+        # requests to dispatch at the end of the event loop iteration
+        self._pending = []
+        self._flush_scheduled = False
+
+        # (entity_type, entity_id) keys -> list of (uid, fields) tuples
+        # for requests waiting for a carrier or a find
+        self._waiting = {}
+
+        # (entity_type, entity_id) keys -> fields being loaded by carriers
+        self._carriers = {}
+
+        # retriever uid -> (entity_type, entity_ids, fields)
+        self._finds = {}
+
+        # (entity_type, entity_id) keys -> (timestamp, sg_data)
+        self._memo = collections.OrderedDict()
+
+        self._sg_data_retriever = shotgun_data.ShotgunDataRetriever(
+            self, bg_task_manager=bg_task_manager
+        )
+        self._sg_data_retriever.start()
+        self._sg_data_retriever.work_completed.connect(self._on_worker_signal)
+        self._sg_data_retriever.work_failure.connect(self._on_worker_failure)
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self._sg_data_retriever.stop()
+        self._pending = []
+        self._waiting = {}
+        self._carriers = {}
+        self._finds = {}
+
+    ############################################################################################
+    # consumer interface
+
+    def request(self, entity_type, entity_id, fields):
+        """
+        Requests fields for an entity. The result is emitted
+        asynchronously via the request_completed signal.
+
+        :param entity_type: Shotgun entity type
+        :param entity_id: Shotgun entity id
+        :param fields: List of fields to retrieve
+        :returns: Unique request id
+        """
+        uid = "query_broker_%d" % next(self._uid_counter)
+        fields = frozenset(fields)
+
+        self._pending.append((uid, (entity_type, entity_id), fields))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QtCore.QTimer.singleShot(0, self._flush)
+
+        return uid
+
+    def cancel(self, uid):
+        """
+        Cancels a request. Its result will not be emitted.
+
+        :param uid: Request id returned by :meth:`request`
+        """
+        self._pending = [request for request in self._pending if request[0] != uid]
+        for waiting in self._waiting.values():
+            waiting[:] = [waiter for waiter in waiting if waiter[0] != uid]
+
+    def cancel_all(self):
+        """
+        Cancels all outstanding requests and stops all finds in flight,
+        typically because the user navigated to a different location.
+        Records in memory are kept.
+
+        :returns: Number of requests which were cancelled
+        """
+        num_cancelled = len(self._pending)
+        num_cancelled += sum(len(waiting) for waiting in self._waiting.values())
+
+        for uid in self._finds:
+            self._sg_data_retriever.stop_work(uid)
+
+        self._pending = []
+        self._waiting = {}
+        self._carriers = {}
+        self._finds = {}
+        return num_cancelled
+
+    def forget(self, entity_type, entity_id):
+        """
+        Discards the record of an entity kept in memory,
+        for example because the entity has changed.
+
+        :param entity_type: Shotgun entity type
+        :param entity_id: Shotgun entity id
+        """
+        self._memo.pop((entity_type, entity_id), None)
+
+    ############################################################################################
+    # carrier interface
+
+    def announce(self, entity_type, entity_id, fields):
+        """
+        Registers a carrier query in flight, typically made by a
+        model. Requests covered by it will wait for its result.
+
+        :param entity_type: Shotgun entity type
+        :param entity_id: Shotgun entity id
+        :param fields: Fields the query retrieves
+        """
+        self._carriers[(entity_type, entity_id)] = frozenset(fields)
+
+    def publish(self, sg_data):
+        """
+        Publishes the result of a carrier query, serving all
+        waiting requests covered by it.
+
+        :param sg_data: Shotgun data dictionary for the entity
+        """
+        key = (sg_data["type"], sg_data["id"])
+        self._carriers.pop(key, None)
+        self._remember(key, sg_data)
+        self._serve(key, sg_data, frozenset(sg_data.keys()))
+
+    def withdraw(self, entity_type, entity_id):
+        """
+        Withdraws a carrier query, for example because it failed.
+        Requests waiting for it are dispatched again.
+
+        :param entity_type: Shotgun entity type
+        :param entity_id: Shotgun entity id
+        """
+        key = (entity_type, entity_id)
+        if self._carriers.pop(key, None) is not None:
+            self._requeue(key)
+
+    ############################################################################################
+    # internal methods
+
+    def _flush(self):
+        """
+        Dispatches all pending requests
+        """
+        self._flush_scheduled = False
+        pending = self._pending
+        self._pending = []
+
+        # fields and ids to fetch, per entity type
+        to_fetch = collections.OrderedDict()
+
+        for (uid, key, fields) in pending:
+            sg_data = self._get_memo(key, fields)
+            if sg_data is not None:
+                self.request_completed.emit(uid, sg_data)
+                continue
+
+            self._waiting.setdefault(key, []).append((uid, fields))
+            if self._is_in_flight(key, fields):
+                continue
+
+            (ids, all_fields) = to_fetch.setdefault(key[0], ([], set()))
+            if key[1] not in ids:
+                ids.append(key[1])
+            all_fields.update(fields)
+
+        for (entity_type, (ids, fields)) in to_fetch.items():
+            # make sure all waiting requests for the entities are covered
+            for entity_id in ids:
+                for (_, waiter_fields) in self._waiting.get((entity_type, entity_id), []):
+                    fields.update(waiter_fields)
+
+            logger.debug(
+                "Fetching %d fields for %s %s", len(fields), entity_type, ids
+            )
+            uid = self._sg_data_retriever.execute_find(
+                entity_type, [["id", "in", ids]], sorted(fields)
+            )
+            self._finds[shotgun_model.sanitize_qt(uid)] = (
+                entity_type,
+                ids,
+                frozenset(fields),
+            )
+
+    def _is_in_flight(self, key, fields):
+        """
+        Checks if a carrier or a find in flight covers the given fields of an entity
+
+        :param key: (entity_type, entity_id) tuple
+        :param fields: Set of fields
+        """
+        if fields.issubset(self._carriers.get(key, ())):
+            return True
+
+        for (entity_type, ids, find_fields) in self._finds.values():
+            if entity_type == key[0] and key[1] in ids and fields.issubset(find_fields):
+                return True
+
+        return False
+
+    def _serve(self, key, sg_data, available_fields):
+        """
+        Emits the result for all waiting requests covered by the available fields
+
+        :param key: (entity_type, entity_id) tuple
+        :param sg_data: Shotgun data dictionary or None if the entity doesn't exist
+        :param available_fields: Set of fields the data covers
+        """
+        waiting = self._waiting.pop(key, [])
+        remaining = []
+        for (uid, fields) in waiting:
+            if sg_data is None or fields.issubset(available_fields):
+                self.request_completed.emit(uid, sg_data)
+            else:
+                remaining.append((uid, fields))
+
+        if remaining:
+            # dispatch again, they will attach to queries in flight if possible
+            self._waiting[key] = remaining
+            self._requeue(key)
+
+    def _requeue(self, key):
+        """
+        Moves all requests waiting for an entity back into the pending queue
+
+        :param key: (entity_type, entity_id) tuple
+        """
+        for (uid, fields) in self._waiting.pop(key, []):
+            self._pending.append((uid, key, fields))
+
+        if self._pending and not self._flush_scheduled:
+            self._flush_scheduled = True
+            QtCore.QTimer.singleShot(0, self._flush)
+
+    def _get_memo(self, key, fields):
+        """
+        Returns a recently fetched record covering the given fields
+
+        :param key: (entity_type, entity_id) tuple
+        :param fields: Set of fields
+        :returns: Shotgun data dictionary or None
+        """
+        memo = self._memo.get(key)
+        if memo is None:
+            return None
+
+        (timestamp, sg_data) = memo
+        if time.time() - timestamp > self.MEMO_TIME_TO_LIVE:
+            del self._memo[key]
+            return None
+
+        if not fields.issubset(sg_data.keys()):
+            return None
+
+        return sg_data
+
+    def _remember(self, key, sg_data):
+        """
+        Keeps a record in memory
+
+        :param key: (entity_type, entity_id) tuple
+        :param sg_data: Shotgun data dictionary
+        """
+        self._memo.pop(key, None)
+        self._memo[key] = (time.time(), sg_data)
+        while len(self._memo) > self.MAX_MEMO_ENTRIES:
+            self._memo.popitem(last=False)
+
+    def _sanitize_sg_data(self, sg_data):
+        """
+        Converts datetimes to unix timestamps, the same way as the
+        shotgun model does, so that all consumers get the same data
+        regardless of where it came from.
+
+        :param sg_data: Shotgun data dictionary, as returned by find()
+        :returns: Sanitized dictionary
+        """
+        sanitized = {}
+        for (field, value) in sg_data.items():
+            if isinstance(value, datetime.datetime):
+                value = time.mktime(value.timetuple())
+            sanitized[field] = value
+        return sanitized
+
+    def _on_worker_signal(self, uid, request_type, data):
+        """
+        Serves all requests covered by a completed find
+
+        :param uid: Unique id of the find
+        :param request_type: Type of request
+        :param data: Request result
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if uid not in self._finds:
+            return
+        (entity_type, ids, fields) = self._finds.pop(uid)
+
+        data = shotgun_model.sanitize_qt(data)
+        records = dict(
+            (sg_data["id"], self._sanitize_sg_data(sg_data)) for sg_data in data["sg"]
+        )
+
+        for entity_id in ids:
+            key = (entity_type, entity_id)
+            sg_data = records.get(entity_id)
+            if sg_data is not None:
+                self._remember(key, sg_data)
+            self._serve(key, sg_data, fields)
+
+    def _on_worker_failure(self, uid, msg):
+        """
+        Fails all requests waiting for a failed find
+
+        :param uid: Unique id of the find
+        :param msg: Error message
+        """
+        uid = shotgun_model.sanitize_qt(uid)  # qstring on pyqt, str on pyside
+        if uid not in self._finds:
+            return
+        (entity_type, ids, fields) = self._finds.pop(uid)
+
+        msg = shotgun_model.sanitize_qt(msg)
+        logger.warning("Query broker find failed: %s", msg)
+
+        for entity_id in ids:
+            for (request_uid, _) in self._waiting.pop((entity_type, entity_id), []):
+                self.request_failed.emit(request_uid, msg)
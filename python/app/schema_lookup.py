@@ -0,0 +1,247 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+
+shotgun_globals = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "shotgun_globals"
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class SchemaLookup(object):
+    """
+    Lookup tables for the schema information needed when formatting
+    shotgun values: empty phrases per entity type and field, display
+    names per entity type and display name and color html per status.
+
+    Until the schema has been loaded, all lookups go straight to
+    shotgun_globals, which returns fallback values and triggers the
+    schema load. Once the schema is available, the tables are built
+    and all subsequent lookups are served from memory.
+
+    Tables are replaced rather than modified in place, including when a
+    lookup misses, so lookups are safe to do from background threads.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # fields known to be formatted for each entity type
+        self._known_fields = {}
+
+        # the actual tables
+        self._empty_phrases = {}
+        self._type_display_names = {}
+        self._status_html = {}
+
+        self._schema_loaded = False
+        self._generation = 0
+
+        # callables to run once the schema has been loaded
+        self._schema_loaded_callbacks = []
+
+        self.reset()
+
+    def __repr__(self):
+        return "<SG schema lookup for %d types>" % len(self._empty_phrases)
+
+    @property
+    def schema_loaded(self):
+        """
+        True once the schema has been loaded and lookups are served from the tables
+        """
+        return self._schema_loaded
+
+    @property
+    def generation(self):
+        """
+        Number identifying the current set of tables. This changes whenever
+        the tables are thrown away because the schema may have changed.
+        """
+        return self._generation
+
+    def run_on_schema_loaded(self, callback):
+        """
+        Runs a callable once the schema has been loaded and the tables are
+        built, or right away if this is already the case.
+
+        :param callback: Callable taking no arguments
+        """
+        if self._schema_loaded:
+            callback()
+        else:
+            self._schema_loaded_callbacks.append(callback)
+
+    def reset(self):
+        """
+        Throw away all tables and rebuild them once the schema has been
+        (re)loaded. This should be called when the schema may have
+        changed, for example after a context change.
+        """
+        self._generation += 1
+        self._schema_loaded = False
+        self._empty_phrases = {}
+        self._type_display_names = {}
+        self._status_html = {}
+
+        # this fires right away if the schema is already loaded
+        generation = self._generation
+        shotgun_globals.run_on_schema_loaded(
+            lambda: self._on_schema_loaded(generation)
+        )
+
+    def register_fields(self, entity_type, fields):
+        """
+        Registers fields which will be formatted for an entity type, so
+        that their empty phrases can be looked up in one go.
+
+        :param entity_type: Shotgun entity type
+        :param fields: List of field names
+        """
+        known_fields = dict(self._known_fields)
+        known_fields[entity_type] = known_fields.get(entity_type, set()).union(fields)
+        self._known_fields = known_fields
+
+        if self._schema_loaded:
+            self._build_empty_phrases(entity_type)
+
+    def get_empty_phrase(self, entity_type, field_name):
+        """
+        Returns the phrase to display for an empty value
+
+        :param entity_type: Shotgun entity type
+        :param field_name: Shotgun field name
+        :returns: String
+        """
+        if not self._schema_loaded:
+            return shotgun_globals.get_empty_phrase(entity_type, field_name)
+
+        table = self._empty_phrases.get(entity_type)
+        if table is None:
+            table = self._build_empty_phrases(entity_type)
+
+        phrase = table.get(field_name)
+        if phrase is None:
+            phrase = shotgun_globals.get_empty_phrase(entity_type, field_name)
+            table = dict(table)
+            table[field_name] = phrase
+            empty_phrases = dict(self._empty_phrases)
+            empty_phrases[entity_type] = table
+            self._empty_phrases = empty_phrases
+
+        return phrase
+
+    def get_type_display_name(self, entity_type):
+        """
+        Returns the display name for an entity type, e.g.
+        "Level" instead of "CustomEntity013"
+
+        :param entity_type: Shotgun entity type
+        :returns: String
+        """
+        if not self._schema_loaded:
+            return shotgun_globals.get_type_display_name(entity_type)
+
+        display_name = self._type_display_names.get(entity_type)
+        if display_name is None:
+            display_name = shotgun_globals.get_type_display_name(entity_type)
+            type_display_names = dict(self._type_display_names)
+            type_display_names[entity_type] = display_name
+            self._type_display_names = type_display_names
+
+        return display_name
+
+    def get_status_html(self, status_code):
+        """
+        Returns the display name for a status, prefixed with a colored box
+        indicating the status color if the status has a color.
+
+        :param status_code: Shotgun status code, e.g. "ip"
+        :returns: Html string
+        """
+        if not self._schema_loaded:
+            return self._create_status_html(status_code)
+
+        status_html = self._status_html.get(status_code)
+        if status_html is None:
+            status_html = self._create_status_html(status_code)
+            status_html_table = dict(self._status_html)
+            status_html_table[status_code] = status_html
+            self._status_html = status_html_table
+
+        return status_html
+
+    def _create_status_html(self, status_code):
+        """
+        Resolves the html representing a status
+
+        :param status_code: Shotgun status code, e.g. "ip"
+        :returns: Html string
+        """
+        str_val = shotgun_globals.get_status_display_name(status_code)
+
+        color_str = shotgun_globals.get_status_color(status_code)
+        if color_str:
+            # append colored box to indicate status color
+            str_val = "<span style='color: rgb(%s)'>" "&#9608;</span>&nbsp;%s" % (
+                color_str,
+                str_val,
+            )
+
+        return str_val
+
+    def _build_empty_phrases(self, entity_type):
+        """
+        Builds the empty phrase table for all known fields of an entity type
+
+        :param entity_type: Shotgun entity type
+        :returns: The new table
+        """
+        table = dict(self._empty_phrases.get(entity_type, {}))
+        # the sets of known fields are replaced rather than modified
+        for field_name in self._known_fields.get(entity_type, ()):
+            if field_name not in table:
+                table[field_name] = shotgun_globals.get_empty_phrase(
+                    entity_type, field_name
+                )
+
+        empty_phrases = dict(self._empty_phrases)
+        empty_phrases[entity_type] = table
+        self._empty_phrases = empty_phrases
+
+        return table
+
+    def _on_schema_loaded(self, generation):
+        """
+        Called when the schema is available. Builds the tables for
+        all entity types seen so far.
+
+        :param generation: The reset generation the callback was registered for
+        """
+        if generation != self._generation:
+            # a newer reset has happened since
+            return
+
+        logger.debug("Schema loaded, building lookup tables.")
+        self._empty_phrases = {}
+        self._type_display_names = {}
+        self._status_html = {}
+        self._schema_loaded = True
+
+        for entity_type in list(self._known_fields.keys()):
+            self._build_empty_phrases(entity_type)
+
+        callbacks = self._schema_loaded_callbacks
+        self._schema_loaded_callbacks = []
+        for callback in callbacks:
+            callback()
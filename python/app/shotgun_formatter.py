@@ -12,7 +12,8 @@ import sgtk
 from sgtk import TankError
 from sgtk.platform.qt import QtCore, QtGui
 import re
-import datetime
+import itertools
+import functools
 import pprint
 from . import utils
 
@@ -22,194 +23,354 @@ shotgun_globals = sgtk.platform.import_framework(
 qtwidgets_utils = sgtk.platform.import_framework("tk-framework-qtwidgets", "utils",)
 
 
-class ShotgunTypeFormatter(object):
+class ShotgunTokenTemplate(object):
     """
-    The Shotgun Formatter object holds information on
-    how a particular shotgun entity type should be formatted
-    and displayed.
+    A token string from the shotgun_fields hook, compiled once into a
+    sequence of literal and token segments so that it can be rendered
+    over and over again without any parsing.
 
-    A lot of the information accessible from this class comes from
-    the shotgun_fields hook which defines how information should be
-    presented, which fields should be displayed etc.
+    Tokens are on the following form:
+
+        {[preroll]shotgun.field.name|sg_field_name_fallback::directive[postroll]}
+
+    Basic Examples:
+
+    - {code}                         # simple format
+    - {sg_sequence.Sequence.code}    # deep links
+    - {artist|created_by}            # if artist is null, use creted_by
+
+    Directives are also supported - these are used by the formatting logic
+    and include the following:
+
+    - {sg_sequence::showtype}        # will generate a link saying
+                                     # 'Sequence ABC123' instead of just
+                                     # 'ABC123' like it does by default
+    - {sg_sequence::nolink}          # no url link will be created
+
+    Optional pre/post roll - if a value is null, pre- and post-strings are
+    omitted from the final result. Examples of this syntax:
+
+    - {[Name: ]code}                 # If code is set, 'Name: xxx' will be
+                                     # printed out, otherwise nothing.
+    - {[Name: ]code[<br>]}           # Same but with a post line break
     """
 
-    def __init__(self, entity_type):
+    # matches {tokens} - the capturing group makes split() return
+    # the token contents interleaved with the literal parts
+    TOKEN_REGEX = re.compile(r"{([^}^{]*)}")
+    PRE_ROLL_REGEX = re.compile(r"^\[([^\]]+)\]")
+    POST_ROLL_REGEX = re.compile(r".*\[([^\]]+)\]$")
+
+    def __init__(self, token_str):
         """
         Constructor
-        """
-        self._entity_type = entity_type
-        self._round_default_icon = QtGui.QPixmap(
-            ":/tk_multi_infopanel/round_512x400.png"
-        )
-        self._rect_default_icon = QtGui.QPixmap(":/tk_multi_infopanel/rect_512x400.png")
 
-        self._app = sgtk.platform.current_bundle()
-
-        # read in the hook data into a dict
-        self._hook_data = {}
+        :param token_str: String with tokens, e.g. "{code}_{created_by}"
+        """
+        self._token_str = token_str
 
-        self._hook_data["get_list_item_definition"] = self._app.execute_hook_method(
-            "shotgun_fields_hook", "get_list_item_definition", entity_type=entity_type
-        )
+        try:
+            # ["literal", "token", "literal", "token", ..., "literal"]
+            parts = self.TOKEN_REGEX.split(token_str)
+        except Exception as error:
+            raise TankError("Could not parse '%s' - Error: %s" % (token_str, error))
 
-        self._hook_data["get_all_fields"] = self._app.execute_hook_method(
-            "shotgun_fields_hook", "get_all_fields", entity_type=entity_type
-        )
+        # list of (literal, token) tuples where only one of the two is set.
+        # tokens are tuples with (sg_fields, directive, pre_roll, post_roll)
+        self._segments = []
+        self._fields = []
 
-        self._hook_data["get_main_view_definition"] = self._app.execute_hook_method(
-            "shotgun_fields_hook", "get_main_view_definition", entity_type=entity_type
-        )
+        for (index, part) in enumerate(parts):
+            if index % 2 == 0:
+                if part:
+                    self._segments.append((part, None))
+            else:
+                token = self._parse_token(part)
+                self._segments.append((None, token))
+                for sg_field in token[0]:
+                    if sg_field not in self._fields:
+                        self._fields.append(sg_field)
 
-        self._hook_data["get_entity_tabs_definition"] = self._app.execute_hook_method(
-            "shotgun_fields_hook",
-            "get_entity_tabs_definition",
-            entity_type=entity_type,
-            shotgun_globals=shotgun_globals,
-        )
+    def __repr__(self):
+        return "<SG token template %r>" % self._token_str
 
-        self._hook_data["get_entity_default_tab"] = self._app.execute_hook_method(
-            "shotgun_fields_hook", "get_entity_default_tab", entity_type=entity_type
-        )
+    @classmethod
+    def _parse_token(cls, raw_token):
+        """
+        Split the contents of a single token into its parts.
 
-        # extract a list of fields given all the different {tokens} defined
-        fields = []
-        fields += self._resolve_sg_fields(
-            self._get_hook_value("get_list_item_definition", "top_left")
-        )
-        fields += self._resolve_sg_fields(
-            self._get_hook_value("get_list_item_definition", "top_right")
-        )
-        fields += self._resolve_sg_fields(
-            self._get_hook_value("get_list_item_definition", "body")
-        )
-        fields += self._resolve_sg_fields(
-            self._get_hook_value("get_main_view_definition", "title")
-        )
-        fields += self._resolve_sg_fields(
-            self._get_hook_value("get_main_view_definition", "body")
-        )
+        :param raw_token: Token without curly brackets, e.g. "[By: ]artist|created_by"
+        :returns: tuple with (sg_fields, directive, preroll, postroll)
+        """
+        pre_roll = None
+        post_roll = None
+        directive = None
+
+        processed_token = raw_token
+
+        match = cls.PRE_ROLL_REGEX.match(processed_token)
+        if match:
+            pre_roll = match.group(1)
+            # remove preroll part from main token
+            processed_token = processed_token[len(pre_roll) + 2 :]
+
+        match = cls.POST_ROLL_REGEX.match(processed_token)
+        if match:
+            post_roll = match.group(1)
+            # remove postroll part from main token
+            processed_token = processed_token[: -(len(post_roll) + 2)]
+
+        if "::" in processed_token:
+            # we have a special formatting directive
+            # e.g. created_at::ago
+            (sg_field_str, directive) = processed_token.split("::")
+        else:
+            sg_field_str = processed_token
 
-        # also include the thumbnail field so that it gets retrieved as part of the general
-        # query payload
-        fields.extend(self.thumbnail_fields)
-
-        # include system fields that are needed for the app
-        if entity_type == "Version":
-            fields.append("sg_uploaded_movie")
-            fields.append("sg_path_to_frames")
-            fields.append("project")
-        if entity_type == "Note":
-            fields.append("read_by_current_user")
-            fields.append("client_note")
-            fields.append("project")
-        if entity_type == "PublishedFile" or entity_type == "TankPublishedFile":
-            fields.append("path")
-            fields.append("project")
-        if entity_type == "Task":
-            fields.append("project")
-
-        self._token_fields = set(fields)
+        # if there is more than one sg field, we have a
+        # series of fallbacks
+        sg_fields = tuple(sg_field_str.split("|"))
 
-    def __repr__(self):
-        return "<SG '%s' type formatter>" % self._entity_type
+        return (sg_fields, directive, pre_roll, post_roll)
 
-    ###############################################################################################
-    # helper methods
+    @property
+    def fields(self):
+        """
+        All shotgun fields used by the template, in order of appearance.
+        """
+        return list(self._fields)
 
-    def _resolve_sg_fields(self, token_str):
+    def render(self, sg_data, value_formatter):
         """
-        Convenience method. Returns the sg fields for all tokens
-        given a token_str
+        Render the template given a shotgun data dict
 
-        :param token_str: String with tokens, e.g. "{code}_{created_by}"
-        :returns: All shotgun fields, e.g. ["code", "created_by"]
+        :param sg_data: Data dictionary to get values from
+        :param value_formatter: Callable turning a value into a string. Called
+            with the shotgun type, field name, value and formatting directive.
+        :returns: string with tokens replaced with actual values
         """
-        fields = []
+        chunks = []
 
-        for (_, sg_fields, _, _, _) in self._resolve_tokens(token_str):
-            fields.extend(sg_fields)
+        for (literal, token) in self._segments:
 
-        return fields
+            if token is None:
+                chunks.append(literal)
+                continue
+
+            (sg_fields, directive, pre_roll, post_roll) = token
+
+            # get the first sg field value we find
+            # this is usef when we have a fallback syntax in the token string,
+            # for example {artist|created_by}
+            for sg_field in sg_fields:
+                sg_value = sg_data.get(sg_field)
+                if sg_value:
+                    # got a value so stop looking
+                    break
+
+            if (sg_value is None or sg_value == []) and (pre_roll or post_roll):
+                # shotgun value is empty
+                # if we have a pre or post roll part of the token
+                # then we basicaly just skip the display of both
+                # those and the value entirely
+                # e.g. Hello {[Shot:]sg_shot} becomes:
+                # for shot abc: 'Hello Shot:abc'
+                # for shot <empty>: 'Hello '
+                continue
+
+            # potentially add pre/and post
+            if pre_roll:
+                chunks.append(pre_roll)
+            chunks.append(
+                value_formatter(sg_data["type"], sg_field, sg_value, directive)
+            )
+            if post_roll:
+                chunks.append(post_roll)
+
+        return "".join(chunks)
+
+
+class ShotgunTypeData(object):
+    """
+    Holds the formatting information for a particular shotgun entity
+    type, as returned by the shotgun_fields hook, together with the
+    compiled token templates and the fields needed to render them.
+
+    Objects of this class are shared between all formatters of the same
+    entity type and are managed by the :class:`FormatterRegistry`.
+    """
 
-    def _resolve_tokens(self, token_str):
+    # (hook method, dictionary key) for all token strings
+    # that are rendered by the formatter
+    TEMPLATE_KEYS = [
+        ("get_list_item_definition", "top_left"),
+        ("get_list_item_definition", "top_right"),
+        ("get_list_item_definition", "body"),
+        ("get_main_view_definition", "title"),
+        ("get_main_view_definition", "body"),
+    ]
+
+    # fields needed by the app itself, regardless of the hook
+    SYSTEM_FIELDS = {
+        "Version": ["sg_uploaded_movie", "sg_path_to_frames", "project"],
+        "Note": ["read_by_current_user", "client_note", "project"],
+        "PublishedFile": ["path", "project"],
+        "TankPublishedFile": ["path", "project"],
+        "Task": ["project"],
+    }
+
+    # fields needed by the actions in the general actions hook
+    ACTION_FIELDS = {
+        "Version": [
+            "sg_path_to_movie",
+            "sg_path_to_frames",
+            "sg_uploaded_movie",
+            "playlists",
+            "project",
+        ],
+        "PublishedFile": ["path", "project"],
+        "TankPublishedFile": ["path", "project"],
+        "Task": ["project", "task_assignees"],
+    }
+
+    # source of unique revision numbers for type data objects
+    _revision_counter = itertools.count(1)
+
+    def __init__(self, entity_type, hook_data, action_fields=None):
         """
-        Resolve a list of tokens from a string.
+        Constructor
 
-        Tokens are on the following form:
+        :param entity_type: Shotgun entity type
+        :param hook_data: Dictionary with the return value of each
+            of the shotgun_fields hook methods, keyed by method name.
+        :param action_fields: Optional list of additional fields that
+            actions for this entity type depend on, for example fields
+            used in action mapping filters.
+        """
+        self._entity_type = entity_type
+        self._hook_data = hook_data
+        self._revision = next(self._revision_counter)
+
+        # compile all token strings up front so that rendering
+        # doesn't have to parse them over and over again
+        self._templates = {}
+        for (method_name, hook_key) in self.TEMPLATE_KEYS:
+            self._templates[(method_name, hook_key)] = ShotgunTokenTemplate(
+                self.get_hook_value(method_name, hook_key)
+            )
 
-            {[preroll]shotgun.field.name|sg_field_name_fallback::directive[postroll]}
+        # plan the fields needed by each view. Actions are available both
+        # for list items and the details area, so both need the action
+        # fields. All field lists are sorted, so that identical hook data
+        # always results in identical queries and cache keys.
+        self._action_fields = self._canonical_fields(
+            self.ACTION_FIELDS.get(entity_type, []) + list(action_fields or [])
+        )
+        base_fields = (
+            self.thumbnail_fields
+            + self.SYSTEM_FIELDS.get(entity_type, [])
+            + self._action_fields
+        )
+        self._list_item_fields = self._canonical_fields(
+            self._get_template_fields("get_list_item_definition")
+            + base_fields
+            # used to detect when list item text needs to be rendered again
+            + ["updated_at"]
+        )
+        self._details_fields = self._canonical_fields(
+            self._get_template_fields("get_main_view_definition") + base_fields
+        )
 
-        Basic Examples:
+        self._token_fields = set(self._list_item_fields + self._details_fields)
 
-        - {code}                         # simple format
-        - {sg_sequence.Sequence.code}    # deep links
-        - {artist|created_by}            # if artist is null, use creted_by
+    def __repr__(self):
+        return "<SG '%s' type data>" % self._entity_type
 
-        Directives are also supported - these are used by the formatting logic
-        and include the following:
+    @property
+    def entity_type(self):
+        """
+        The entity type this data describes
+        """
+        return self._entity_type
 
-        - {sg_sequence::showtype}        # will generate a link saying
-                                         # 'Sequence ABC123' instead of just
-                                         # 'ABC123' like it does by default
-        - {sg_sequence::nolink}          # no url link will be created
+    @property
+    def revision(self):
+        """
+        Number uniquely identifying this set of hook data. A new revision
+        is created whenever the hook data is re-read.
+        """
+        return self._revision
 
-        Optional pre/post roll - if a value is null, pre- and post-strings are
-        omitted from the final result. Examples of this syntax:
+    @property
+    def hook_data(self):
+        """
+        Raw shotgun_fields hook return values, keyed by hook method name
+        """
+        return self._hook_data
 
-        - {[Name: ]code}                 # If code is set, 'Name: xxx' will be
-                                         # printed out, otherwise nothing.
-        - {[Name: ]code[<br>]}           # Same but with a post line break
+    @property
+    def thumbnail_fields(self):
+        """
+        The field names to use when looking for thumbnails
+        """
+        if self._entity_type == "Note":
+            return [
+                "user.HumanUser.image",
+                "user.ClientUser.image",
+                "user.ApiUser.image",
+            ]
+        else:
+            return ["image"]
 
-        :param token_str: String with tokens, e.g. "{code}_{created_by}"
-        returns: a list of tuples with (full_token, sg_fields, directive, preroll, postroll)
+    @property
+    def token_fields(self):
         """
+        Set of fields needed to render list items or main details
+        """
+        return self._token_fields
 
-        try:
-            # find all field names ["xx", "yy", "zz.xx"] from "{xx}_{yy}_{zz.xx}"
-            raw_tokens = set(re.findall("{([^}^{]*)}", token_str))
-        except Exception as error:
-            raise TankError("Could not parse '%s' - Error: %s" % (token_str, error))
+    @property
+    def list_item_fields(self):
+        """
+        Sorted list of fields needed to display and act on list items
+        """
+        return self._list_item_fields
 
-        fields = []
-        for raw_token in raw_tokens:
-
-            pre_roll = None
-            post_roll = None
-            directive = None
-
-            processed_token = raw_token
-
-            match = re.match("^\[([^\]]+)\]", processed_token)
-            if match:
-                pre_roll = match.group(1)
-                # remove preroll part from main token
-                processed_token = processed_token[len(pre_roll) + 2 :]
-
-            match = re.match(".*\[([^\]]+)\]$", processed_token)
-            if match:
-                post_roll = match.group(1)
-                # remove preroll part from main token
-                processed_token = processed_token[: -(len(post_roll) + 2)]
-
-            if "::" in processed_token:
-                # we have a special formatting directive
-                # e.g. created_at::ago
-                (sg_field_str, directive) = processed_token.split("::")
-            else:
-                sg_field_str = processed_token
+    @property
+    def details_fields(self):
+        """
+        Sorted list of fields needed to display and act on the details header
+        """
+        return self._details_fields
 
-            if "|" in sg_field_str:
-                # there is more than one sg field, we have a
-                # series of fallbacks
-                sg_fields = sg_field_str.split("|")
-            else:
-                sg_fields = [sg_field_str]
+    @property
+    def action_fields(self):
+        """
+        Sorted list of fields needed by actions
+        """
+        return self._action_fields
 
-            fields.append((raw_token, sg_fields, directive, pre_roll, post_roll))
+    def _get_template_fields(self, method_name):
+        """
+        Returns the fields used by all token strings of a hook method
 
+        :param method_name: shotgun_fields hook method defining the strings
+        :returns: List of field names
+        """
+        fields = []
+        for (template_method, hook_key) in self.TEMPLATE_KEYS:
+            if template_method == method_name:
+                fields += self._templates[(template_method, hook_key)].fields
         return fields
 
-    def _get_hook_value(self, method_name, hook_key):
+    @staticmethod
+    def _canonical_fields(fields):
+        """
+        Returns a sorted list of unique field names
+        """
+        return sorted(set(fields))
+
+    def get_hook_value(self, method_name, hook_key):
         """
         Validate that value is correct and return it
         """
@@ -227,6 +388,62 @@ class ShotgunTypeFormatter(object):
 
         return data[hook_key]
 
+    def get_template(self, method_name, hook_key):
+        """
+        Returns the compiled template for a hook token string
+
+        :param method_name: shotgun_fields hook method defining the string
+        :param hook_key: Dictionary key returned by the hook method
+        :returns: :class:`ShotgunTokenTemplate` instance
+        """
+        return self._templates[(method_name, hook_key)]
+
+
+class ShotgunTypeFormatter(object):
+    """
+    The Shotgun Formatter object holds information on
+    how a particular shotgun entity type should be formatted
+    and displayed.
+
+    A lot of the information accessible from this class comes from
+    the shotgun_fields hook which defines how information should be
+    presented, which fields should be displayed etc. The hook data
+    itself is shared between formatters and is looked up in the
+    app's formatter registry.
+    """
+
+    def __init__(self, entity_type):
+        """
+        Constructor
+        """
+        self._entity_type = entity_type
+        self._app = sgtk.platform.current_bundle()
+        self._registry = self._app.formatter_registry
+        self._schema = self._registry.schema_lookup
+        # make sure the hook data is loaded up front
+        self._registry.get_type_data(entity_type)
+
+    def __repr__(self):
+        return "<SG '%s' type formatter>" % self._entity_type
+
+    @property
+    def _type_data(self):
+        """
+        The shared :class:`ShotgunTypeData` for this entity type. This is
+        looked up on every access so that long lived formatters pick up
+        changes to the hook.
+        """
+        return self._registry.get_type_data(self._entity_type)
+
+    ###############################################################################################
+    # helper methods
+
+    def _get_hook_value(self, method_name, hook_key):
+        """
+        Validate that value is correct and return it
+        """
+        return self._type_data.get_hook_value(method_name, hook_key)
+
     def _sg_field_to_str(self, sg_type, sg_field, value, directive=None):
         """
         Converts a Shotgun field value to a string.
@@ -247,7 +464,7 @@ class ShotgunTypeFormatter(object):
         str_val = ""
 
         if value is None:
-            return shotgun_globals.get_empty_phrase(sg_type, sg_field)
+            return self._schema.get_empty_phrase(sg_type, sg_field)
 
         elif isinstance(value, dict) and set(["type", "id", "name"]) == set(
             value.keys()
@@ -259,7 +476,7 @@ class ShotgunTypeFormatter(object):
 
                 # get the nice name from our schema
                 # this is so that it says "Level" instead of "CustomEntity013"
-                entity_type_display_name = shotgun_globals.get_type_display_name(
+                entity_type_display_name = self._schema.get_type_display_name(
                     value["type"]
                 )
                 link_name = "%s %s" % (entity_type_display_name, value["name"])
@@ -284,19 +501,10 @@ class ShotgunTypeFormatter(object):
             str_val = ", ".join(link_urls)
 
         elif sg_field in ["created_at", "updated_at"]:
-            created_datetime = datetime.datetime.fromtimestamp(value)
-            (str_val, _) = utils.create_human_readable_timestamp(created_datetime)
+            (str_val, _) = self._registry.timestamp_formatter.format_unix_time(value)
 
         elif sg_field == "sg_status_list":
-            str_val = shotgun_globals.get_status_display_name(value)
-
-            color_str = shotgun_globals.get_status_color(value)
-            if color_str:
-                # append colored box to indicate status color
-                str_val = "<span style='color: rgb(%s)'>" "&#9608;</span>&nbsp;%s" % (
-                    color_str,
-                    str_val,
-                )
+            str_val = self._schema.get_status_html(value)
 
         else:
             str_val = str(value)
@@ -305,6 +513,25 @@ class ShotgunTypeFormatter(object):
 
         return str_val
 
+    def _resolve_schema_value(self, sg_type, sg_field, value):
+        """
+        Looks up the schema information :meth:`_sg_field_to_str` needs
+        to convert a value, see :meth:`resolve_schema_values`.
+
+        :param sg_type: Shotgun data type
+        :param sg_field: Shotgun field name
+        :param value: Shotgun value
+        """
+        if value is None:
+            self._schema.get_empty_phrase(sg_type, sg_field)
+        elif isinstance(value, dict) and "type" in value:
+            self._schema.get_type_display_name(value["type"])
+        elif isinstance(value, list):
+            for list_item in value:
+                self._resolve_schema_value(sg_type, sg_field, list_item)
+        elif sg_field == "sg_status_list":
+            self._schema.get_status_html(value)
+
     def _generates_links(self, entity_type):
         """
         Returns true if the given entity type
@@ -315,56 +542,183 @@ class ShotgunTypeFormatter(object):
         else:
             return True
 
-    def _convert_token_string(self, token_str, sg_data):
+    def _render_template(self, method_name, hook_key, sg_data, type_data=None):
         """
-        Convert a string with {tokens} given a shotgun data dict
+        Render one of the compiled hook token strings given a shotgun data dict
 
-        :param token_str: Token string as defined in the shotgun fields hook
+        :param method_name: shotgun_fields hook method defining the string
+        :param hook_key: Dictionary key returned by the hook method
         :param sg_data: Data dictionary to get values from
+        :param type_data: Optional :class:`ShotgunTypeData` to render with,
+            rather than the current type data.
         :returns: string with tokens replaced with actual values
         """
-        # extract all tokens and process them one after the other
-        for (
-            full_token,
-            sg_fields,
-            directive,
-            pre_roll,
-            post_roll,
-        ) in self._resolve_tokens(token_str):
+        type_data = type_data or self._type_data
+        return type_data.get_template(method_name, hook_key).render(
+            sg_data, self._sg_field_to_str
+        )
 
-            # get the first sg field value we find
-            # this is usef when we have a fallback syntax in the token string,
-            # for example {artist|created_by}
-            for sg_field in sg_fields:
-                sg_value = sg_data.get(sg_field)
-                if sg_value:
-                    # got a value so stop looking
-                    break
+    def _get_avatar_variant(self, client, unread, scale):
+        """
+        Returns the avatar cache variant name for a round note thumbnail
 
-            if (sg_value is None or sg_value == []) and (pre_roll or post_roll):
-                # shotgun value is empty
-                # if we have a pre or post roll part of the token
-                # then we basicaly just skip the display of both
-                # those and the value entirely
-                # e.g. Hello {[Shot:]sg_shot} becomes:
-                # for shot abc: 'Hello Shot:abc'
-                # for shot <empty>: 'Hello '
-                token_str = token_str.replace("{%s}" % full_token, "")
+        :param client: True for the client variant
+        :param unread: True for the unread variant
+        :param scale: Scale of the thumbnail relative to 512x400
+        :returns: Variant name
+        """
+        return "note_%d_%d_%d" % (client, unread, utils.get_thumbnail_size(scale)[0])
+
+    def _get_thumbnail_spec(self, sg_data, scale):
+        """
+        Returns how a thumbnail for the given data is composited and cached
 
+        :param sg_data: Data associated with the thumbnail
+        :param scale: Scale of the thumbnail relative to 512x400
+        :returns: Tuple with the user the thumbnail is an avatar of, or None,
+            the url of the user image, the variant name and a callable
+            compositing a QImage from the source QImage.
+        """
+        if self.entity_type in ["HumanUser", "ApiUser", "ClientUser"]:
+            user = sg_data
+            image_url = sg_data.get("image")
+            client = self.entity_type == "ClientUser"
+            unread = False
+
+        elif self.entity_type == "Note":
+
+            client = sg_data.get("client_note") or False
+
+            if sg_data["read_by_current_user"] == "unread":
+                unread = True
             else:
-                resolved_value = self._sg_field_to_str(
-                    sg_data["type"], sg_field, sg_value, directive
-                )
+                unread = False
 
-                # potentially add pre/and post
-                if pre_roll:
-                    resolved_value = "%s%s" % (pre_roll, resolved_value)
-                if post_roll:
-                    resolved_value = "%s%s" % (resolved_value, post_roll)
-                # and replace the token with the value
-                token_str = token_str.replace("{%s}" % full_token, resolved_value)
+            # the note thumbnail is the avatar of the note author
+            user = sg_data.get("user") or {}
+            image_url = None
+            if user.get("type"):
+                image_url = sg_data.get("user.%s.image" % user["type"])
+
+        elif self.entity_type == "Task" and sg_data["type"] == "HumanUser":
+            # a user icon for a task
+            # todo: refcator this logic to make it clearer
+            user = sg_data
+            image_url = sg_data.get("image")
+            (client, unread) = (False, False)
 
-        return token_str
+        else:
+            return (
+                None,
+                None,
+                "rect_%d" % utils.get_thumbnail_size(scale)[0],
+                functools.partial(
+                    utils.create_rectangular_512x400_thumbnail_image, scale=scale
+                ),
+            )
+
+        return (
+            user,
+            image_url,
+            self._get_avatar_variant(client, unread, scale),
+            functools.partial(
+                utils.create_round_512x400_note_thumbnail_image,
+                client=client,
+                unread=unread,
+                scale=scale,
+            ),
+        )
+
+    @staticmethod
+    def _composite_thumbnail(composite, path, scale, image):
+        """
+        Composites a thumbnail, loading the source image at the size
+        needed for the scale if it hasn't been loaded yet.
+
+        This can be called from any thread.
+
+        :param composite: Callable compositing a QImage from the source QImage
+        :param path: Path to the thumbnail on disk
+        :param scale: Scale of the thumbnail relative to 512x400
+        :param image: QImage representing the shotgun thumbnail or None
+        :returns: Composited QImage
+        """
+        if image is None:
+            image = utils.load_thumbnail_image(path, scale)
+        return composite(image)
+
+    @staticmethod
+    def _composite_and_save_thumbnail(
+        composite, path, scale, thumbnail_cache, variant, image
+    ):
+        """
+        Composites a thumbnail, see :meth:`_composite_thumbnail`, and stores
+        it in the thumbnail cache on disk. This is run in a background task,
+        so that encoding and writing the png doesn't block the main thread.
+
+        :param composite: Callable compositing a QImage from the source QImage
+        :param path: Path to the thumbnail on disk
+        :param scale: Scale of the thumbnail relative to 512x400
+        :param thumbnail_cache: :class:`ThumbnailCache` to store the thumbnail in
+        :param variant: Variant name of the thumbnail
+        :param image: QImage representing the shotgun thumbnail or None
+        :returns: Composited QImage
+        """
+        result = ShotgunTypeFormatter._composite_thumbnail(
+            composite, path, scale, image
+        )
+        thumbnail_cache.save_image(path, variant, result)
+        return result
+
+    def _find_thumbnail(self, thumbnail_spec, image, path):
+        """
+        Returns a composited thumbnail from the avatar or thumbnail cache
+
+        :param thumbnail_spec: Tuple returned by :meth:`_get_thumbnail_spec`
+        :param image: QImage representing the shotgun thumbnail
+        :param path: Path to the thumbnail on disk or None
+        :returns: Pixmap object or None if the thumbnail isn't cached
+        """
+        (user, image_url, variant, _) = thumbnail_spec
+        if user is not None:
+            pixmap = self._registry.avatar_cache.find_avatar(
+                user.get("type"), user.get("id"), image_url, variant
+            )
+            if pixmap is not None:
+                return pixmap
+
+        pixmap = self._registry.thumbnail_cache.find_pixmap(path, variant)
+        if pixmap is not None and user is not None:
+            self._registry.avatar_cache.add_avatar(
+                user.get("type"), user.get("id"), image_url, variant, image, pixmap
+            )
+        return pixmap
+
+    def _add_thumbnail(self, thumbnail_spec, image, path, pixmap, save=True):
+        """
+        Stores a composited thumbnail in the avatar and thumbnail caches
+
+        :param thumbnail_spec: Tuple returned by :meth:`_get_thumbnail_spec`
+        :param image: QImage representing the shotgun thumbnail
+        :param path: Path to the thumbnail on disk or None
+        :param pixmap: Composited pixmap object
+        :param save: False if the thumbnail has already been stored on disk
+        """
+        (user, image_url, variant, _) = thumbnail_spec
+        if user is not None:
+            self._registry.avatar_cache.add_avatar(
+                user.get("type"), user.get("id"), image_url, variant, image, pixmap
+            )
+        self._registry.thumbnail_cache.add_pixmap(path, variant, pixmap, save=save)
+
+    def _on_thumbnail_composited(self, thumbnail_spec, image, path, callback, pixmap):
+        """
+        Called when a thumbnail requested via :meth:`request_thumbnail`
+        has been composited. The thumbnail has already been stored on
+        disk by the background task.
+        """
+        self._add_thumbnail(thumbnail_spec, image, path, pixmap, save=False)
+        callback(pixmap)
 
     ####################################################################################################
     # properties
@@ -375,23 +729,39 @@ class ShotgunTypeFormatter(object):
         Returns the default pixmap associated with this location
         """
         if self.entity_type in ["Note", "HumanUser", "ApiUser", "ClientUser"]:
-            return self._round_default_icon
+            return self.round_default_pixmap
         else:
-            return self._rect_default_icon
+            return self.rect_default_pixmap
+
+    @property
+    def round_default_pixmap(self):
+        """
+        Returns the default pixmap used for round thumbnails
+        """
+        return self._registry.round_default_pixmap
+
+    @property
+    def rect_default_pixmap(self):
+        """
+        Returns the default pixmap used for rectangular thumbnails
+        """
+        return self._registry.rect_default_pixmap
+
+    @property
+    def type_data(self):
+        """
+        Returns the current :class:`ShotgunTypeData` for the entity type.
+        Type data objects are never modified, so this can be handed to
+        background tasks as a snapshot of the formatting information.
+        """
+        return self._type_data
 
     @property
     def thumbnail_fields(self):
         """
         Returns the field names to use when looking for thumbnails
         """
-        if self.entity_type == "Note":
-            return [
-                "user.HumanUser.image",
-                "user.ClientUser.image",
-                "user.ApiUser.image",
-            ]
-        else:
-            return ["image"]
+        return self._type_data.thumbnail_fields
 
     @property
     def entity_type(self):
@@ -400,6 +770,21 @@ class ShotgunTypeFormatter(object):
         """
         return self._entity_type
 
+    @property
+    def schema_lookup(self):
+        """
+        The :class:`SchemaLookup` used to format values
+        """
+        return self._schema
+
+    @property
+    def revision(self):
+        """
+        Revision of the hook data used by this formatter. This changes
+        whenever the shotgun_fields hook definitions are re-read.
+        """
+        return self._type_data.revision
+
     @property
     def should_open_in_shotgun_web(self):
         """
@@ -419,51 +804,132 @@ class ShotgunTypeFormatter(object):
         """
         All fields listing
         """
-        return self._hook_data["get_all_fields"]
+        return self._type_data.hook_data["get_all_fields"]
 
     @property
     def fields(self):
         """
         fields needed to render list or main details
         """
-        return list(self._token_fields)
+        return sorted(self._type_data.token_fields)
+
+    @property
+    def list_item_fields(self):
+        """
+        fields needed to render and act on list items, sorted
+        """
+        return list(self._type_data.list_item_fields)
+
+    @property
+    def details_fields(self):
+        """
+        fields needed to render and act on the main details, sorted
+        """
+        return list(self._type_data.details_fields)
 
     ####################################################################################################
     # public methods
 
-    def create_thumbnail(self, image, sg_data):
+    def create_thumbnail(self, image, sg_data, path=None, scale=1.0):
         """
         Given a QImage representing a thumbnail and return a formatted
         pixmap that is suitable for that data type.
 
-        :param image: QImage representing a shotgun thumbnail
+        Round user thumbnails are shared through the avatar cache, so each
+        user image is only composited once for each variant. If the path to
+        the thumbnail is given, composited thumbnails are also cached in the
+        thumbnail cache, in memory and on disk.
+
+        :param image: QImage representing a shotgun thumbnail, or None to
+            load it from the path at the size needed for the scale.
         :param sg_data: Data associated with the thumbnail
+        :param path: Path to the thumbnail on disk
+        :param scale: Scale of the thumbnail relative to 512x400. The full
+            size is only meant for the details thumbnail, list items use
+            utils.LIST_ITEM_THUMBNAIL_SCALE.
         :returns: Pixmap object
         """
-        if self.entity_type in ["HumanUser", "ApiUser"]:
-            return utils.create_round_512x400_note_thumbnail(image)
-
-        elif self.entity_type == "ClientUser":
-            return utils.create_round_512x400_note_thumbnail(image, client=True)
-
-        elif self.entity_type == "Note":
-
-            client_note = sg_data.get("client_note") or False
+        thumbnail_spec = self._get_thumbnail_spec(sg_data, scale)
+        pixmap = self._find_thumbnail(thumbnail_spec, image, path)
+        if pixmap is None:
+            pixmap = QtGui.QPixmap.fromImage(
+                self._composite_thumbnail(thumbnail_spec[3], path, scale, image)
+            )
+            self._add_thumbnail(thumbnail_spec, image, path, pixmap)
+        return pixmap
 
-            if sg_data["read_by_current_user"] == "unread":
-                unread = True
-            else:
-                unread = False
+    def request_thumbnail(self, compositor, image, sg_data, path, callback, scale=1.0):
+        """
+        Requests a formatted pixmap for a QImage representing a thumbnail,
+        see :meth:`create_thumbnail`.
 
-            return utils.create_round_512x400_note_thumbnail(image, client_note, unread)
+        Cached thumbnails are returned right away. Other thumbnails are
+        loaded and composited in the background by the given compositor
+        and passed to the callback once available.
 
-        elif self.entity_type == "Task" and sg_data["type"] == "HumanUser":
-            # a user icon for a task
-            # todo: refcator this logic to make it clearer
-            return utils.create_round_512x400_note_thumbnail(image)
+        :param compositor: :class:`ThumbnailCompositor` or None to
+            composite the thumbnail right away.
+        :param image: QImage representing a shotgun thumbnail, or None to
+            load it from the path at the size needed for the scale.
+        :param sg_data: Data associated with the thumbnail
+        :param path: Path to the thumbnail on disk
+        :param callback: Callable called with the pixmap object if
+            the thumbnail is composited in the background.
+        :param scale: Scale of the thumbnail relative to 512x400
+        :returns: Pixmap object or None if the thumbnail is
+            composited in the background.
+        """
+        if compositor is None:
+            return self.create_thumbnail(image, sg_data, path, scale)
+
+        thumbnail_spec = self._get_thumbnail_spec(sg_data, scale)
+        pixmap = self._find_thumbnail(thumbnail_spec, image, path)
+        if pixmap is None:
+            compositor.composite(
+                image,
+                functools.partial(
+                    self._composite_and_save_thumbnail,
+                    thumbnail_spec[3],
+                    path,
+                    scale,
+                    self._registry.thumbnail_cache,
+                    thumbnail_spec[2],
+                ),
+                functools.partial(
+                    self._on_thumbnail_composited,
+                    thumbnail_spec,
+                    image,
+                    path,
+                    callback,
+                ),
+            )
+        return pixmap
 
-        else:
-            return utils.create_rectangular_512x400_thumbnail(image)
+    def get_cached_avatar(
+        self, user_type, user_id, client=False, unread=False, scale=1.0
+    ):
+        """
+        Returns a round avatar for a user if the user image has been
+        loaded before.
+
+        :param user_type: Entity type of the user, e.g. HumanUser
+        :param user_id: Id of the user
+        :param client: True for the client variant of the avatar
+        :param unread: True for the unread variant of the avatar
+        :param scale: Scale of the avatar relative to 512x400
+        :returns: Pixmap object or None if the user image isn't cached
+        """
+        return self._registry.avatar_cache.get_latest_avatar(
+            user_type,
+            user_id,
+            self._get_avatar_variant(client, unread, scale),
+            functools.partial(
+                utils.create_round_512x400_note_thumbnail,
+                client=client,
+                unread=unread,
+                scale=scale,
+            ),
+        )
 
     @classmethod
     def get_playback_url(cls, sg_data):
@@ -516,15 +982,16 @@ class ShotgunTypeFormatter(object):
                this data dictionary.
         :returns: tuple with formatted and resolved (header, body) strings.
         """
-        title = self._get_hook_value("get_main_view_definition", "title")
-        body = self._get_hook_value("get_main_view_definition", "body")
-
-        title_converted = self._convert_token_string(title, sg_data)
-        body_converted = self._convert_token_string(body, sg_data)
+        title_converted = self._render_template(
+            "get_main_view_definition", "title", sg_data
+        )
+        body_converted = self._render_template(
+            "get_main_view_definition", "body", sg_data
+        )
 
         return (title_converted, body_converted)
 
-    def format_list_item_details(self, sg_data):
+    def format_list_item_details(self, sg_data, type_data=None):
         """
         Render details for list items to be displayed.
 
@@ -533,20 +1000,75 @@ class ShotgunTypeFormatter(object):
         :param sg_data: Shotgun data dictionary. The shotgun fields
                returned by the fields parameter need to be included in
                this data dictionary.
+        :param type_data: Optional :class:`ShotgunTypeData` to render with,
+               rather than the current type data.
         :returns: tuple with formatted and resolved (top_left, top_right,
                   body) strings.
         """
 
-        top_left = self._get_hook_value("get_list_item_definition", "top_left")
-        top_right = self._get_hook_value("get_list_item_definition", "top_right")
-        body = self._get_hook_value("get_list_item_definition", "body")
-
-        top_left_converted = self._convert_token_string(top_left, sg_data)
-        top_right_converted = self._convert_token_string(top_right, sg_data)
-        body_converted = self._convert_token_string(body, sg_data)
+        top_left_converted = self._render_template(
+            "get_list_item_definition", "top_left", sg_data, type_data
+        )
+        top_right_converted = self._render_template(
+            "get_list_item_definition", "top_right", sg_data, type_data
+        )
+        body_converted = self._render_template(
+            "get_list_item_definition", "body", sg_data, type_data
+        )
 
         return (top_left_converted, top_right_converted, body_converted)
 
+    def resolve_schema_values(self, sg_data_list):
+        """
+        Looks up the schema information needed to render a list of items,
+        so that it is served from the schema lookup tables when the items
+        are rendered. Lookups missing from the tables query the schema,
+        which must only happen in the main thread, so this should be called
+        before rendering items in a background task.
+
+        :param sg_data_list: List of shotgun data dictionaries.
+        """
+        token_fields = set(self._type_data.token_fields)
+        for sg_data in sg_data_list:
+            # fields missing from the data are rendered as empty values
+            for sg_field in token_fields.union(sg_data.keys()):
+                self._resolve_schema_value(
+                    sg_data["type"], sg_field, sg_data.get(sg_field)
+                )
+
+    def format_list_items_details(self, sg_data_list, type_data=None):
+        """
+        Render details for a whole list of items in one go.
+
+        All items are rendered against the same current time, and their
+        timestamps are formatted in a single batch up front.
+
+        Looking up the current type data may read the shotgun_fields hook
+        again, which must only happen in the main thread. Background tasks
+        should pass in the :attr:`type_data` resolved before they started,
+        and call :meth:`resolve_schema_values` before starting.
+
+        :param sg_data_list: List of shotgun data dictionaries.
+        :param type_data: Optional :class:`ShotgunTypeData` to render with,
+            rather than the current type data.
+        :returns: List of (top_left, top_right, body) tuples, one per item.
+        """
+        timestamp_formatter = self._registry.timestamp_formatter
+
+        with timestamp_formatter.render_pass():
+            timestamp_formatter.format_unix_times(
+                [
+                    sg_data[field_name]
+                    for sg_data in sg_data_list
+                    for field_name in ("created_at", "updated_at")
+                    if isinstance(sg_data.get(field_name), (int, float))
+                ]
+            )
+            return [
+                self.format_list_item_details(sg_data, type_data)
+                for sg_data in sg_data_list
+            ]
+
     def get_link_filters(self, sg_location):
         """
         Executes hook to return a filter string which links this type up to a
@@ -631,7 +1153,7 @@ class ShotgunEntityFormatter(ShotgunTypeFormatter):
         Tab to start a new view with
         """
 
-        return self._hook_data["get_entity_default_tab"]
+        return self._type_data.hook_data["get_entity_default_tab"]
 
     def get_tab_data(self, name, field, default_value=None):
         """
@@ -0,0 +1,266 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+task_manager = sgtk.platform.import_framework(
+    "tk-framework-shotgunutils", "task_manager"
+)
+
+
+class LaneTaskManager(task_manager.BackgroundTaskManager):
+    """
+    Background task manager for one of the :class:`TaskLanes`.
+
+    Keeps track of the tasks it has outstanding, so that the lanes can tell
+    when it is busy. Tasks are tracked until they complete, fail or are
+    stopped. When a task fails, the task manager drops the tasks depending
+    on it without emitting any signal for them, so those are dropped as well.
+
+    :signal busy_changed(bool): Emitted when the lane becomes busy or idle.
+    """
+
+    busy_changed = QtCore.Signal(bool)
+
+    def __init__(self, parent, name, max_threads):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        :param name: Name of the lane, for logging
+        :param max_threads: Maximum number of tasks to run in parallel
+        """
+        task_manager.BackgroundTaskManager.__init__(
+            self, parent, start_processing=True, max_threads=max_threads
+        )
+        self._name = name
+
+        # task id -> (group, upstream task ids) for all outstanding tasks
+        self._outstanding = {}
+        self._busy = False
+
+        self.task_completed.connect(self._on_task_completed)
+        self.task_failed.connect(self._on_task_failed)
+
+    def __repr__(self):
+        return "<%s lane with %d outstanding tasks>" % (
+            self._name,
+            len(self._outstanding),
+        )
+
+    @property
+    def name(self):
+        """
+        Name of the lane
+        """
+        return self._name
+
+    @property
+    def busy(self):
+        """
+        True if the lane has outstanding tasks
+        """
+        return self._busy
+
+    def add_task(
+        self,
+        cbl,
+        priority=None,
+        group=None,
+        upstream_task_ids=None,
+        task_args=None,
+        task_kwargs=None,
+    ):
+        """
+        Adds a task, see the base class for details.
+        """
+        task_id = task_manager.BackgroundTaskManager.add_task(
+            self,
+            cbl,
+            priority=priority,
+            group=group,
+            upstream_task_ids=upstream_task_ids,
+            task_args=task_args,
+            task_kwargs=task_kwargs,
+        )
+        self._outstanding[task_id] = (group, set(upstream_task_ids or []))
+        self._update_busy()
+        return task_id
+
+    def stop_task(self, task_id, stop_upstream=True, stop_downstream=True):
+        """
+        Stops a task, see the base class for details.
+        """
+        task_manager.BackgroundTaskManager.stop_task(
+            self, task_id, stop_upstream=stop_upstream, stop_downstream=stop_downstream
+        )
+        self._discard([task_id], stop_upstream, stop_downstream)
+
+    def stop_task_group(self, group, stop_upstream=True, stop_downstream=True):
+        """
+        Stops a group of tasks, see the base class for details.
+        """
+        task_manager.BackgroundTaskManager.stop_task_group(
+            self, group, stop_upstream=stop_upstream, stop_downstream=stop_downstream
+        )
+        task_ids = [
+            task_id
+            for (task_id, (task_group, _)) in self._outstanding.items()
+            if task_group == group
+        ]
+        self._discard(task_ids, stop_upstream, stop_downstream)
+
+    def stop_all_tasks(self):
+        """
+        Stops all tasks, see the base class for details.
+        """
+        task_manager.BackgroundTaskManager.stop_all_tasks(self)
+        self._outstanding = {}
+        self._update_busy()
+
+    def _on_task_completed(self, task_id, *args):
+        """
+        Called when a task has completed
+        """
+        self._discard([task_id], False, False)
+
+    def _on_task_failed(self, task_id, *args):
+        """
+        Called when a task has failed. Tasks depending on
+        it are dropped by the task manager.
+        """
+        self._discard([task_id], False, True)
+
+    def _discard(self, task_ids, upstream, downstream):
+        """
+        Stops tracking tasks and updates the busy state
+
+        :param task_ids: Ids of the tasks to stop tracking
+        :param upstream: True to also stop tracking the tasks they depend on
+        :param downstream: True to also stop tracking the tasks depending on them
+        """
+        task_ids = list(task_ids)
+        while task_ids:
+            task_id = task_ids.pop()
+            if task_id not in self._outstanding:
+                continue
+            (_, upstream_task_ids) = self._outstanding.pop(task_id)
+            if upstream:
+                task_ids.extend(upstream_task_ids)
+            if downstream:
+                task_ids.extend(
+                    other_id
+                    for (other_id, (_, other_upstream_ids)) in self._outstanding.items()
+                    if task_id in other_upstream_ids
+                )
+        self._update_busy()
+
+    def _update_busy(self):
+        """
+        Updates the busy state and emits busy_changed if it changed
+        """
+        busy = bool(self._outstanding)
+        if busy != self._busy:
+            self._busy = busy
+            self.busy_changed.emit(busy)
+
+
+class TaskLanes(QtCore.QObject):
+    """
+    Schedules background work in lanes with strict priority ordering.
+
+    Each lane is a separate task manager with its own number of threads,
+    configured via app settings. Lanes are ordered by priority, and a lane
+    only processes tasks while all lanes above it are idle:
+
+    - interactive: work the user is waiting for, like the details and the
+      visible tab.
+    - thumbnails: thumbnail and avatar work for visible items.
+    - prefetch: speculative work, like prefetching hidden tabs and details.
+    """
+
+    (INTERACTIVE, THUMBNAILS, PREFETCH) = ("interactive", "thumbnails", "prefetch")
+
+    # lanes in priority order, with the setting holding their thread count
+    LANES = [
+        (INTERACTIVE, "interactive_lane_threads"),
+        (THUMBNAILS, "thumbnail_lane_threads"),
+        (PREFETCH, "prefetch_lane_threads"),
+    ]
+
+    def __init__(self, parent):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        app = sgtk.platform.current_bundle()
+
+        self._lanes = []
+        for (name, setting) in self.LANES:
+            max_threads = max(1, app.get_setting(setting) or 1)
+            lane = LaneTaskManager(self, name, max_threads)
+            lane.busy_changed.connect(self._update_lanes)
+            self._lanes.append(lane)
+
+    @property
+    def interactive(self):
+        """
+        Task manager for work the user is waiting for
+        """
+        return self.get_lane(self.INTERACTIVE)
+
+    @property
+    def thumbnails(self):
+        """
+        Task manager for thumbnail work
+        """
+        return self.get_lane(self.THUMBNAILS)
+
+    @property
+    def prefetch(self):
+        """
+        Task manager for speculative work
+        """
+        return self.get_lane(self.PREFETCH)
+
+    def get_lane(self, name):
+        """
+        Returns the task manager for a lane
+
+        :param name: INTERACTIVE, THUMBNAILS or PREFETCH
+        :returns: :class:`LaneTaskManager`
+        """
+        for lane in self._lanes:
+            if lane.name == name:
+                return lane
+        raise ValueError("Unknown task lane '%s'" % name)
+
+    def shut_down(self):
+        """
+        Shuts down all lanes
+        """
+        for lane in self._lanes:
+            lane.shut_down()
+
+    def _update_lanes(self):
+        """
+        Pauses all lanes below a busy lane and resumes all others
+        """
+        higher_lane_busy = False
+        for lane in self._lanes:
+            if higher_lane_busy:
+                lane.pause_processing()
+            else:
+                lane.start_processing()
+            higher_lane_busy = higher_lane_busy or lane.busy
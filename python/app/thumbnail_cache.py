@@ -0,0 +1,299 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import hashlib
+import collections
+
+import sgtk
+from sgtk.platform.qt import QtGui
+from sgtk.util import filesystem
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class ThumbnailCache(object):
+    """
+    Two tier cache of composited thumbnails.
+
+    Compositing a thumbnail means scaling the source image and painting it
+    onto a new 512x400 canvas. The results are kept in an in memory least
+    recently used cache bounded by a byte budget, in front of a folder of
+    png files which persists between sessions. The folder has a byte budget
+    of its own, which :meth:`prune` enforces by deleting the least recently
+    used files.
+
+    Thumbnails are keyed by a hash identifying the source image file, the
+    name of the variant, e.g. round or rectangular, and any flags the
+    variant is composited with. The source images are the thumbnails
+    downloaded by the shotgun models, which are named after their url and
+    never rewritten, so the path, size and modification time of the file
+    identify its content without having to read it.
+    """
+
+    # bump this whenever the compositing changes
+    FORMAT_VERSION = 1
+
+    # number of bytes of pixmap data kept in memory
+    MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+    # number of bytes of png files kept on disk
+    MAX_DISK_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, folder):
+        """
+        Constructor
+
+        :param folder: Folder where composited thumbnails are stored.
+            If None, thumbnails are only cached in memory.
+        """
+        self._folder = folder
+        # key -> QPixmap
+        self._pixmaps = collections.OrderedDict()
+        self._memory_bytes = 0
+
+    def __repr__(self):
+        return "<Thumbnail cache with %d pixmaps, %d bytes>" % (
+            len(self._pixmaps),
+            self._memory_bytes,
+        )
+
+    def get_pixmap(self, source_path, variant, image, composite):
+        """
+        Returns a composited thumbnail, compositing it only if it isn't cached
+
+        :param source_path: Path to the source image file. If None,
+            the thumbnail is composited without being cached.
+        :param variant: String identifying how the thumbnail is composited,
+            including any flags passed to the composite callable.
+        :param image: QImage for the source image
+        :param composite: Callable compositing the thumbnail from a QImage
+        :returns: QPixmap
+        """
+        pixmap = self.find_pixmap(source_path, variant)
+        if pixmap is None:
+            pixmap = composite(image)
+            self.add_pixmap(source_path, variant, pixmap)
+        return pixmap
+
+    def find_pixmap(self, source_path, variant):
+        """
+        Returns a composited thumbnail if it is cached in memory or on disk
+
+        :param source_path: Path to the source image file
+        :param variant: String identifying how the thumbnail is composited
+        :returns: QPixmap or None
+        """
+        key = self._get_key(source_path, variant)
+        if key is None:
+            return None
+
+        pixmap = self._pixmaps.pop(key, None)
+        if pixmap is not None:
+            self._pixmaps[key] = pixmap
+            return pixmap
+
+        disk_path = self._get_disk_path(key)
+        if disk_path and os.path.exists(disk_path):
+            pixmap = QtGui.QPixmap(disk_path)
+            if pixmap.isNull():
+                logger.debug("Discarding unreadable thumbnail %s", disk_path)
+                filesystem.safe_delete_file(disk_path)
+            else:
+                self._put(key, pixmap)
+                self._touch(disk_path)
+                return pixmap
+
+        return None
+
+    def add_pixmap(self, source_path, variant, pixmap, save=True):
+        """
+        Stores a composited thumbnail in memory and on disk
+
+        :param source_path: Path to the source image file. If None,
+            nothing is stored.
+        :param variant: String identifying how the thumbnail is composited
+        :param pixmap: QPixmap
+        :param save: False if the thumbnail has already been stored
+            on disk with :meth:`save_image`.
+        """
+        key = self._get_key(source_path, variant)
+        if key is None:
+            return
+
+        self._put(key, pixmap)
+        if save:
+            self._save_once(key, pixmap)
+
+    def save_image(self, source_path, variant, image):
+        """
+        Stores a composited thumbnail on disk only. Unlike all other methods,
+        this can be called from any thread, so that background tasks can
+        encode and write thumbnails right after compositing them.
+
+        :param source_path: Path to the source image file. If None,
+            nothing is stored.
+        :param variant: String identifying how the thumbnail is composited
+        :param image: QImage
+        """
+        key = self._get_key(source_path, variant)
+        if key is not None:
+            self._save_once(key, image)
+
+    def clear(self):
+        """
+        Discards all thumbnails held in memory
+        """
+        self._pixmaps = collections.OrderedDict()
+        self._memory_bytes = 0
+
+    def prune(self):
+        """
+        Deletes the least recently used thumbnails on disk until the folder
+        fits in MAX_DISK_BYTES. This only touches the disk, so it can be run
+        from any thread, typically in a background task once per session.
+
+        :returns: Number of files deleted
+        """
+        if not self._folder or not os.path.isdir(self._folder):
+            return 0
+
+        files = []
+        total_bytes = 0
+        for (dir_path, _, file_names) in os.walk(self._folder):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except (IOError, OSError):
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total_bytes += stat.st_size
+
+        num_deleted = 0
+        # oldest first
+        for (_, size, path) in sorted(files):
+            if total_bytes <= self.MAX_DISK_BYTES:
+                break
+            filesystem.safe_delete_file(path)
+            total_bytes -= size
+            num_deleted += 1
+
+        if num_deleted:
+            logger.debug(
+                "Pruned %d thumbnails, %d bytes left on disk.", num_deleted, total_bytes
+            )
+        return num_deleted
+
+    def _get_key(self, source_path, variant):
+        """
+        Computes the key of a composited thumbnail
+
+        :param source_path: Path to the source image file
+        :param variant: String identifying how the thumbnail is composited
+        :returns: String key or None if the source file doesn't exist
+        """
+        if not source_path:
+            return None
+
+        try:
+            stat = os.stat(source_path)
+        except (IOError, OSError):
+            return None
+
+        signature = "%d|%s|%d|%d|%s" % (
+            self.FORMAT_VERSION,
+            source_path,
+            stat.st_size,
+            int(stat.st_mtime),
+            variant,
+        )
+        return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+    def _get_disk_path(self, key):
+        """
+        Returns the path to the png file for a thumbnail
+
+        :param key: Thumbnail key
+        :returns: Path or None if thumbnails aren't stored on disk
+        """
+        if not self._folder:
+            return None
+        # spread files over sub folders to keep folder listings short
+        return os.path.join(self._folder, key[:2], "%s.png" % key)
+
+    def _get_size(self, pixmap):
+        """
+        Returns the number of bytes used by a pixmap
+        """
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _put(self, key, pixmap):
+        """
+        Stores a thumbnail in memory, discarding the least recently
+        used thumbnails if the byte budget is exceeded
+
+        :param key: Thumbnail key
+        :param pixmap: QPixmap
+        """
+        previous = self._pixmaps.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= self._get_size(previous)
+
+        self._pixmaps[key] = pixmap
+        self._memory_bytes += self._get_size(pixmap)
+
+        while self._memory_bytes > self.MAX_MEMORY_BYTES and len(self._pixmaps) > 1:
+            (_, evicted) = self._pixmaps.popitem(last=False)
+            self._memory_bytes -= self._get_size(evicted)
+
+    def _touch(self, disk_path):
+        """
+        Marks a thumbnail on disk as recently used, so that it is pruned last
+
+        :param disk_path: Path to the png file
+        """
+        try:
+            os.utime(disk_path, None)
+        except (IOError, OSError):
+            pass
+
+    def _save_once(self, key, image):
+        """
+        Writes a thumbnail to disk, unless it has been written before
+
+        :param key: Thumbnail key
+        :param image: QImage or QPixmap
+        """
+        disk_path = self._get_disk_path(key)
+        if disk_path and not os.path.exists(disk_path):
+            self._save(image, disk_path)
+
+    def _save(self, image, disk_path):
+        """
+        Writes a thumbnail to disk
+
+        :param image: QImage or QPixmap
+        :param disk_path: Path to the png file
+        """
+        # write to a temp file and move it into place, so that other
+        # sessions never read a partially written file
+        tmp_path = "%s.%d.tmp.png" % (disk_path, os.getpid())
+        try:
+            filesystem.ensure_folder_exists(os.path.dirname(disk_path))
+            if not image.save(tmp_path, "PNG"):
+                raise IOError("Could not encode png")
+            if os.path.exists(disk_path):
+                os.remove(disk_path)
+            os.rename(tmp_path, disk_path)
+        except Exception as e:
+            logger.debug("Could not write thumbnail %s: %s", disk_path, e)
+            if os.path.exists(tmp_path):
+                filesystem.safe_delete_file(tmp_path)
@@ -0,0 +1,153 @@
+# Copyright (c) 2015 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import sgtk
+from sgtk.platform.qt import QtCore, QtGui
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class ThumbnailCompositor(QtCore.QObject):
+    """
+    Composites thumbnails in background tasks.
+
+    Scaling, masking and badging a thumbnail is done on QImages by a
+    background task manager, since QPixmaps can only be used in the GUI
+    thread. The resulting images are converted to QPixmaps in the GUI thread
+    in batches of MAX_CONVERSIONS_PER_TICK, one batch per event loop
+    iteration, and handed to the callback passed in with the request.
+    """
+
+    # maximum number of images converted to pixmaps per event loop iteration
+    MAX_CONVERSIONS_PER_TICK = 10
+
+    def __init__(self, parent, bg_task_manager):
+        """
+        Constructor
+
+        :param parent: QT parent object
+        :param bg_task_manager: Task manager used to composite thumbnails
+        """
+        QtCore.QObject.__init__(self, parent)
+
+        self._bg_task_manager = bg_task_manager
+        self._task_group = "thumbnail_compositing_%s" % id(self)
+
+        # task id -> callback for all outstanding tasks
+        self._callbacks = {}
+        # list of (callback, QImage) waiting to be converted
+        self._pending = []
+
+        self._conversion_timer = QtCore.QTimer(self)
+        self._conversion_timer.setSingleShot(True)
+        self._conversion_timer.setInterval(0)
+        self._conversion_timer.timeout.connect(self._convert_pending)
+
+        self._bg_task_manager.task_completed.connect(self._on_task_completed)
+        self._bg_task_manager.task_failed.connect(self._on_task_failed)
+
+    def __repr__(self):
+        return "<Thumbnail compositor with %d outstanding tasks>" % (
+            len(self._callbacks) + len(self._pending)
+        )
+
+    def destroy(self):
+        """
+        Tear down method
+        """
+        self.cancel()
+        self._bg_task_manager.task_completed.disconnect(self._on_task_completed)
+        self._bg_task_manager.task_failed.disconnect(self._on_task_failed)
+
+    def composite(self, image, composite, callback):
+        """
+        Composites a thumbnail in a background task
+
+        :param image: QImage for the source image
+        :param composite: Callable compositing a QImage from the source QImage.
+            This is called in a background thread and must not use QPixmaps.
+        :param callback: Callable called in the GUI thread with the
+            composited QPixmap
+        """
+        task_id = self._bg_task_manager.add_task(
+            self._composite_task,
+            group=self._task_group,
+            task_kwargs={"image": image, "composite": composite},
+        )
+        self._callbacks[task_id] = callback
+
+    def cancel(self):
+        """
+        Stops all outstanding compositing. Callbacks for cancelled
+        thumbnails are never called.
+
+        :returns: Number of thumbnails which were cancelled
+        """
+        count = len(self._callbacks) + len(self._pending)
+        if self._callbacks:
+            self._bg_task_manager.stop_task_group(self._task_group)
+        self._callbacks = {}
+        self._pending = []
+        self._conversion_timer.stop()
+        return count
+
+    @staticmethod
+    def _composite_task(image, composite):
+        """
+        Background task compositing a thumbnail
+
+        :param image: QImage for the source image
+        :param composite: Callable compositing a QImage from the source QImage
+        :returns: Composited QImage
+        """
+        return composite(image)
+
+    def _on_task_completed(self, task_id, group, result):
+        """
+        Queues a composited image for conversion
+
+        :param task_id: Id of the task which completed
+        :param group: Task group
+        :param result: Composited QImage
+        """
+        callback = self._callbacks.pop(task_id, None)
+        if callback is None:
+            # not one of ours or cancelled
+            return
+
+        self._pending.append((callback, result))
+        if not self._conversion_timer.isActive():
+            self._conversion_timer.start()
+
+    def _on_task_failed(self, task_id, group, message, traceback_str):
+        """
+        Logs compositing failures
+
+        :param task_id: Id of the task which failed
+        :param group: Task group
+        :param message: Error message
+        :param traceback_str: Error traceback
+        """
+        if self._callbacks.pop(task_id, None) is not None:
+            logger.debug("Could not composite thumbnail: %s", message)
+
+    def _convert_pending(self):
+        """
+        Converts a batch of composited images to pixmaps and
+        schedules the next batch, if any.
+        """
+        batch = self._pending[: self.MAX_CONVERSIONS_PER_TICK]
+        self._pending = self._pending[self.MAX_CONVERSIONS_PER_TICK :]
+
+        for (callback, image) in batch:
+            callback(QtGui.QPixmap.fromImage(image))
+
+        if self._pending:
+            self._conversion_timer.start()
@@ -10,30 +10,104 @@
 
 import sgtk
 from sgtk.platform.qt import QtCore, QtGui
+import contextlib
 import datetime
+import threading
+import time
 
 
-def create_round_thumbnail(image):
+# size of the composited 512x400 thumbnails
+THUMBNAIL_WIDTH = 512
+THUMBNAIL_HEIGHT = 400
+
+# scale of the thumbnails composited for list items. List items display
+# them at 96x75, this leaves room for high dpi screens.
+LIST_ITEM_THUMBNAIL_SCALE = 0.375
+
+
+def get_thumbnail_size(scale=1.0):
     """
-    Create a 200 px wide circle thumbnail
+    Returns the size of a 512x400 thumbnail composited at the given scale
+
+    :param scale: Scale relative to 512x400
+    :returns: (width, height) tuple
+    """
+    return (int(THUMBNAIL_WIDTH * scale), int(THUMBNAIL_HEIGHT * scale))
+
+
+def load_thumbnail_image(path, scale=1.0):
+    """
+    Loads a thumbnail from disk, decoding it directly at the smallest size
+    covering a 512x400 thumbnail composited at the given scale.
+
+    This only uses QImage and can be called from any thread.
+
+    :param path: Path to the thumbnail
+    :param scale: Scale relative to 512x400
+    :returns: QImage, which is null if the file cannot be read
+    """
+    reader = QtGui.QImageReader(path)
+    size = reader.size()
+    if size.isValid():
+        (width, height) = get_thumbnail_size(scale)
+        scaled_size = size.scaled(width, height, QtCore.Qt.KeepAspectRatioByExpanding)
+        if scaled_size.width() < size.width():
+            # only ever decode at a smaller size
+            reader.setScaledSize(scaled_size)
+    return reader.read()
+
+
+def _create_canvas(width, height):
+    """
+    Create a transparent QImage to composite a thumbnail onto
+
+    :param width: Width of the canvas
+    :param height: Height of the canvas
+    :returns: QImage
+    """
+    canvas = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied)
+    canvas.fill(QtCore.Qt.transparent)
+    return canvas
+
+
+def _draw_badge(painter, x, y, path, scale):
+    """
+    Draws a badge image at the given scale
+
+    :param painter: QPainter to draw with
+    :param x: Unscaled x position of the badge
+    :param y: Unscaled y position of the badge
+    :param path: Path to the badge image
+    :param scale: Scale to draw the badge at
+    """
+    badge = QtGui.QImage(path)
+    painter.drawImage(
+        QtCore.QRectF(
+            x * scale, y * scale, badge.width() * scale, badge.height() * scale
+        ),
+        badge,
+    )
+
+
+def create_round_thumbnail_image(image):
+    """
+    Create a 200 px wide circle thumbnail.
+
+    This only uses QImage and QPainter and can be called from any thread.
 
     :param image: QImage representing a thumbnail
-    :returns: Round QPixmap
+    :returns: Round QImage
     """
     CANVAS_SIZE = 200
 
     # get the 512 base image
-    base_image = QtGui.QPixmap(CANVAS_SIZE, CANVAS_SIZE)
-    base_image.fill(QtCore.Qt.transparent)
+    base_image = _create_canvas(CANVAS_SIZE, CANVAS_SIZE)
 
-    # now attempt to load the image
-    # pixmap will be a null pixmap if load fails
-    thumb = QtGui.QPixmap.fromImage(image)
-
-    if not thumb.isNull():
+    # image will be a null image if load failed
+    if not image.isNull():
 
         # scale it down to fit inside a frame of maximum 512x512
-        thumb_scaled = thumb.scaled(
+        thumb_scaled = image.scaled(
             CANVAS_SIZE,
             CANVAS_SIZE,
             QtCore.Qt.KeepAspectRatioByExpanding,
@@ -42,8 +116,7 @@ def create_round_thumbnail(image):
 
         # now composite the thumbnail on top of the base image
         # bottom align it to make it look nice
-        thumb_img = thumb_scaled.toImage()
-        brush = QtGui.QBrush(thumb_img)
+        brush = QtGui.QBrush(thumb_scaled)
         painter = QtGui.QPainter(base_image)
         painter.setRenderHint(QtGui.QPainter.Antialiasing)
         painter.setBrush(brush)
@@ -53,34 +126,44 @@ def create_round_thumbnail(image):
     return base_image
 
 
-def create_round_512x400_note_thumbnail(image, client=False, unread=False):
+def create_round_thumbnail(image):
+    """
+    Create a 200 px wide circle thumbnail
+
+    :param image: QImage representing a thumbnail
+    :returns: Round QPixmap
+    """
+    return QtGui.QPixmap.fromImage(create_round_thumbnail_image(image))
+
+
+def create_round_512x400_note_thumbnail_image(
+    image, client=False, unread=False, scale=1.0
+):
     """
     Given a QImage shotgun thumbnail, create a round icon
     with the thumbnail composited onto a centered otherwise empty canvas.
-    This will return a 512x400 pixmap object.
+    This will return a 512x400 image object, or smaller if a scale is given.
+
+    This only uses QImage and QPainter and can be called from any thread.
 
     :param image: QImage source image
     :param client: indicates that this is a client note
     :param unread: indicates that this is an unread note
-    :returns: QPixmap circular thumbnail, 380px wide, on a
+    :param scale: Scale of the thumbnail relative to 512x400
+    :returns: QImage circular thumbnail, 380px wide, on a
               512x400 rect backdrop
     """
-    CANVAS_WIDTH = 512
-    CANVAS_HEIGHT = 400
-    CIRCLE_SIZE = 380
+    (CANVAS_WIDTH, CANVAS_HEIGHT) = get_thumbnail_size(scale)
+    CIRCLE_SIZE = int(380 * scale)
 
     # get the 512 base image
-    base_image = QtGui.QPixmap(CANVAS_WIDTH, CANVAS_HEIGHT)
-    base_image.fill(QtCore.Qt.transparent)
-
-    # now attempt to load the image
-    # pixmap will be a null pixmap if load fails
-    thumb = QtGui.QPixmap.fromImage(image)
+    base_image = _create_canvas(CANVAS_WIDTH, CANVAS_HEIGHT)
 
-    if not thumb.isNull():
+    # image will be a null image if load failed
+    if not image.isNull():
 
         # scale it to fill a 400x400 square
-        thumb_scaled = thumb.scaled(
+        thumb_scaled = image.scaled(
             CIRCLE_SIZE,
             CIRCLE_SIZE,
             QtCore.Qt.KeepAspectRatioByExpanding,
@@ -89,11 +172,11 @@ def create_round_512x400_note_thumbnail(image, client=False, unread=False):
 
         # now composite the thumbnail on top of the base image
         # bottom align it to make it look nice
-        thumb_img = thumb_scaled.toImage()
-        brush = QtGui.QBrush(thumb_img)
+        brush = QtGui.QBrush(thumb_scaled)
 
         painter = QtGui.QPainter(base_image)
         painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
         painter.setBrush(brush)
 
         # figure out the offset height wise in order to center the thumb
@@ -107,49 +190,63 @@ def create_round_512x400_note_thumbnail(image, client=False, unread=False):
         painter.drawEllipse(0, 0, CIRCLE_SIZE, CIRCLE_SIZE)
 
         if unread:
-            UNREAD_NOTE_INDICATOR = QtGui.QPixmap(
-                ":/tk_multi_infopanel/unread_indicator.png"
+            _draw_badge(
+                painter, -10, -10, ":/tk_multi_infopanel/unread_indicator.png", scale
             )
-            painter.drawPixmap(-10, -10, UNREAD_NOTE_INDICATOR)
 
-        painter.translate(0, 250)
+        painter.translate(0, 250 * scale)
 
         if client:
-            CLIENT_NOTE_INDICATOR = QtGui.QPixmap(
-                ":/tk_multi_infopanel/client_note_indicator.png"
+            _draw_badge(
+                painter, 0, 0, ":/tk_multi_infopanel/client_note_indicator.png", scale
             )
-            painter.drawPixmap(0, 0, CLIENT_NOTE_INDICATOR)
 
         painter.end()
 
     return base_image
 
 
-def create_rectangular_512x400_thumbnail(image):
+def create_round_512x400_note_thumbnail(image, client=False, unread=False, scale=1.0):
+    """
+    Given a QImage shotgun thumbnail, create a round icon
+    with the thumbnail composited onto a centered otherwise empty canvas.
+    This will return a 512x400 pixmap object, or smaller if a scale is given.
+
+    :param image: QImage source image
+    :param client: indicates that this is a client note
+    :param unread: indicates that this is an unread note
+    :param scale: Scale of the thumbnail relative to 512x400
+    :returns: QPixmap circular thumbnail, 380px wide, on a
+              512x400 rect backdrop
+    """
+    return QtGui.QPixmap.fromImage(
+        create_round_512x400_note_thumbnail_image(image, client, unread, scale)
+    )
+
+
+def create_rectangular_512x400_thumbnail_image(image, scale=1.0):
     """
     Given a QImage shotgun thumbnail, create a rectangular icon
     with the thumbnail composited onto a centered otherwise empty canvas.
-    This will return a 512x400 pixmap object.
+    This will return a 512x400 image object, or smaller if a scale is given.
+
+    This only uses QImage and QPainter and can be called from any thread.
 
     :param image: QImage source image
-    :returns: QPixmap rectangular thumbnail on a 512x400 rect backdrop
+    :param scale: Scale of the thumbnail relative to 512x400
+    :returns: QImage rectangular thumbnail on a 512x400 rect backdrop
     """
-    CANVAS_WIDTH = 512
-    CANVAS_HEIGHT = 400
-    CORNER_RADIUS = 10
+    (CANVAS_WIDTH, CANVAS_HEIGHT) = get_thumbnail_size(scale)
+    CORNER_RADIUS = 10 * scale
 
     # get the 512 base image
-    base_image = QtGui.QPixmap(CANVAS_WIDTH, CANVAS_HEIGHT)
-    base_image.fill(QtCore.Qt.transparent)
-
-    # now attempt to load the image
-    # pixmap will be a null pixmap if load fails
-    thumb = QtGui.QPixmap.fromImage(image)
+    base_image = _create_canvas(CANVAS_WIDTH, CANVAS_HEIGHT)
 
-    if not thumb.isNull():
+    # image will be a null image if load failed
+    if not image.isNull():
 
         # scale it down to fit inside a frame of maximum 512x512
-        thumb_scaled = thumb.scaled(
+        thumb_scaled = image.scaled(
             CANVAS_WIDTH,
             CANVAS_HEIGHT,
             QtCore.Qt.KeepAspectRatioByExpanding,
@@ -158,8 +255,7 @@ def create_rectangular_512x400_thumbnail(image):
 
         # now composite the thumbnail on top of the base image
         # bottom align it to make it look nice
-        thumb_img = thumb_scaled.toImage()
-        brush = QtGui.QBrush(thumb_img)
+        brush = QtGui.QBrush(thumb_scaled)
 
         painter = QtGui.QPainter(base_image)
         painter.setRenderHint(QtGui.QPainter.Antialiasing)
@@ -175,6 +271,21 @@ def create_rectangular_512x400_thumbnail(image):
     return base_image
 
 
+def create_rectangular_512x400_thumbnail(image, scale=1.0):
+    """
+    Given a QImage shotgun thumbnail, create a rectangular icon
+    with the thumbnail composited onto a centered otherwise empty canvas.
+    This will return a 512x400 pixmap object, or smaller if a scale is given.
+
+    :param image: QImage source image
+    :param scale: Scale of the thumbnail relative to 512x400
+    :returns: QPixmap rectangular thumbnail on a 512x400 rect backdrop
+    """
+    return QtGui.QPixmap.fromImage(
+        create_rectangular_512x400_thumbnail_image(image, scale)
+    )
+
+
 def create_human_readable_timestamp(datetime_obj):
     """
     Formats a time stamp the way dates are formatted in the
@@ -216,3 +327,184 @@ def create_human_readable_timestamp(datetime_obj):
         time_str = datetime_obj.strftime("%H:%M")
 
     return (time_str, full_time_str)
+
+
+class TimestampFormatter(object):
+    """
+    Formats timestamps in bulk, the same way as
+    :meth:`create_human_readable_timestamp` and the playlist captions
+    in the actions hook do.
+
+    All timestamps formatted in a render pass are compared against a
+    single snapshot of the current time. Timestamps are bucketed by how
+    many days ago they are, and since the formatted strings only depend
+    on that bucket and the minute of the timestamp, they are memoized
+    per (bucket, minute).
+
+    Render passes are tracked per thread, so the same formatter can be
+    used by background rendering tasks and the main thread at once.
+    """
+
+    # maximum number of memoized strings before the memo is cleared
+    MAX_MEMO_SIZE = 10000
+
+    # buckets for activity stream style timestamps
+    (FUTURE, TODAY, THIS_YEAR, OLDER) = range(4)
+
+    # buckets for relative day style timestamps
+    (RELATIVE_TODAY, RELATIVE_TOMORROW, RELATIVE_OTHER) = range(3)
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._local = threading.local()
+        self._memo = {}
+        self._relative_memo = {}
+
+    @contextlib.contextmanager
+    def render_pass(self, now=None):
+        """
+        Context manager fixing the current time used for all timestamps
+        formatted by the current thread until the pass ends. Passes can
+        be nested, in which case the outermost pass defines the time.
+
+        :param now: Optional datetime to use as the current time.
+            Defaults to the time the pass starts.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.now = now or datetime.datetime.now()
+        self._local.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                self._local.now = None
+
+    def _get_now(self):
+        """
+        Returns the current time of the ongoing render pass,
+        or the actual current time outside of a pass.
+        """
+        return getattr(self._local, "now", None) or datetime.datetime.now()
+
+    def format_unix_times(self, unix_times):
+        """
+        Formats a list of unix timestamps the way dates are formatted in the
+        Shotgun activity stream. See :meth:`create_human_readable_timestamp`.
+
+        :param unix_times: List of unix timestamps
+        :returns: List of (time_str, full_time_str) tuples, one per timestamp
+        """
+        if len(self._memo) > self.MAX_MEMO_SIZE:
+            self._memo = {}
+        memo = self._memo
+
+        now_ts = time.mktime(self._get_now().timetuple())
+        results = []
+
+        for unix_time in unix_times:
+            if unix_time > now_ts:
+                bucket = self.FUTURE
+            else:
+                delta_days = int((now_ts - unix_time) // 86400)
+                if delta_days // 7 > 52:
+                    bucket = self.OLDER
+                elif delta_days > 1:
+                    bucket = self.THIS_YEAR
+                else:
+                    bucket = self.TODAY
+
+            key = (bucket, int(unix_time // 60))
+            strings = memo.get(key)
+            if strings is None:
+                strings = self._create_strings(bucket, unix_time)
+                memo[key] = strings
+            results.append(strings)
+
+        return results
+
+    def format_unix_time(self, unix_time):
+        """
+        Formats a single unix timestamp, see :meth:`format_unix_times`.
+
+        :param unix_time: Unix timestamp
+        :returns: Tuple with (time_str, full_time_str)
+        """
+        return self.format_unix_times([unix_time])[0]
+
+    def format_relative_days(self, datetime_objs):
+        """
+        Formats a list of datetimes in a short form relative to the current
+        day, e.g. "Today 01:37AM", "Tomorrow 01:37AM" or "24 Jun 01:37AM".
+
+        :param datetime_objs: List of datetime objects. None entries are allowed.
+        :returns: List of strings, None for None entries.
+        """
+        if len(self._relative_memo) > self.MAX_MEMO_SIZE:
+            self._relative_memo = {}
+        memo = self._relative_memo
+
+        today = self._get_now().date()
+        tomorrow = today + datetime.timedelta(days=1)
+        results = []
+
+        for datetime_obj in datetime_objs:
+            if datetime_obj is None:
+                results.append(None)
+                continue
+
+            date = datetime_obj.date()
+            if date == today:
+                bucket = self.RELATIVE_TODAY
+            elif date == tomorrow:
+                bucket = self.RELATIVE_TOMORROW
+            else:
+                bucket = self.RELATIVE_OTHER
+
+            key = (bucket, date, datetime_obj.hour, datetime_obj.minute)
+            time_str = memo.get(key)
+            if time_str is None:
+                if bucket == self.RELATIVE_TODAY:
+                    # today - display timestamp - Today 01:37AM
+                    time_str = datetime_obj.strftime("Today %I:%M%p")
+                elif bucket == self.RELATIVE_TOMORROW:
+                    # tomorrow - display timestamp - Tomorrow 01:37AM
+                    time_str = datetime_obj.strftime("Tomorrow %I:%M%p")
+                else:
+                    # 24 June 01:37AM
+                    time_str = datetime_obj.strftime("%d %b %I:%M%p")
+                memo[key] = time_str
+            results.append(time_str)
+
+        return results
+
+    def _create_strings(self, bucket, unix_time):
+        """
+        Creates the activity stream style strings for a timestamp
+
+        :param bucket: One of the FUTURE, TODAY, THIS_YEAR and OLDER buckets
+        :param unix_time: Unix timestamp
+        :returns: Tuple with (time_str, full_time_str)
+        """
+        datetime_obj = datetime.datetime.fromtimestamp(unix_time)
+
+        # standard format
+        full_time_str = datetime_obj.strftime("%a %d %b %Y %H:%M")
+
+        if bucket == self.FUTURE:
+            # future times are reported precisely
+            time_str = full_time_str
+        elif bucket == self.OLDER:
+            # more than one year ago - 26 June 2012
+            time_str = datetime_obj.strftime("%d %b %Y %H:%M")
+        elif bucket == self.THIS_YEAR:
+            # ~ more than one week ago - 26 June
+            time_str = datetime_obj.strftime("%d %b %H:%M")
+        else:
+            # earlier today - display timestamp - 23:22
+            time_str = datetime_obj.strftime("%H:%M")
+
+        return (time_str, full_time_str)
@@ -12,6 +12,7 @@ import sgtk
 from sgtk.platform.qt import QtCore, QtGui
 from .ui.list_item_widget import Ui_ListItemWidget
 from .work_area_button import FloatingWorkAreaButton
+from . import utils
 
 shotgun_menus = sgtk.platform.import_framework(
     "tk-framework-qtwidgets", "shotgun_menus"
@@ -165,3 +166,14 @@ class ListItemWidget(QtGui.QWidget):
         :returns: Size of the widget
         """
         return QtCore.QSize(300, 125)
+
+    @staticmethod
+    def calculate_thumbnail_size():
+        """
+        Calculates and returns the size thumbnails are rendered at for this
+        widget. This is larger than the thumbnail label so that thumbnails
+        remain sharp on high dpi screens.
+
+        :returns: Size of the thumbnail
+        """
+        return QtCore.QSize(*utils.get_thumbnail_size(utils.LIST_ITEM_THUMBNAIL_SCALE))
@@ -0,0 +1,110 @@
+# Copyright (c) 2020 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import sys
+
+from tank_test.tank_test_base import setUpModule  # noqa
+from tank_test.tank_test_base import TankTestBase
+
+# the event log queries don't depend on the app being started,
+# so the module is imported on its own.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "python", "app"))
+import event_log  # noqa: E402
+
+
+class TestEventLog(TankTestBase):
+    """
+    Tests the event log queries against mockgun.
+    """
+
+    def setUp(self):
+        """
+        Creates a project and a few events in mockgun
+        """
+        super(TestEventLog, self).setUp()
+
+        self.project = {"type": "Project", "id": 1}
+        self.other_project = {"type": "Project", "id": 2}
+        self.user = {"type": "HumanUser", "id": 5}
+        self.add_to_sg_mock_db([self.project, self.other_project, self.user])
+
+        self.shot = {"type": "Shot", "id": 10, "project": self.project}
+        self.other_shot = {"type": "Shot", "id": 11, "project": self.other_project}
+        self.add_to_sg_mock_db([self.shot, self.other_shot])
+
+    def _create_event(self, event_type, entity, project, meta=None):
+        """
+        Creates an event in mockgun
+
+        :returns: Id of the event
+        """
+        return self.mockgun.create(
+            "EventLogEntry",
+            {
+                "event_type": event_type,
+                "entity": entity,
+                "project": project,
+                "meta": meta,
+            },
+        )["id"]
+
+    def test_latest_event_id(self):
+        """
+        Makes sure the latest event of the project is found
+        """
+        self.assertEqual(event_log.fetch_latest_event_id(self.mockgun, self.project), 0)
+
+        event_id = self._create_event("Shotgun_Shot_Change", self.shot, self.project)
+        self._create_event("Shotgun_Shot_Change", self.other_shot, self.other_project)
+
+        self.assertEqual(
+            event_log.fetch_latest_event_id(self.mockgun, self.project), event_id
+        )
+        self.assertEqual(event_log.fetch_latest_event_id(self.mockgun), event_id + 1)
+
+    def test_fetch_events(self):
+        """
+        Makes sure only the events after the last one seen are fetched,
+        including events without a project about non project entities.
+        """
+        first_id = self._create_event("Shotgun_Shot_Change", self.shot, self.project)
+        shot_id = self._create_event("Shotgun_Shot_Change", self.shot, self.project)
+        self._create_event("Shotgun_Shot_Change", self.other_shot, self.other_project)
+        user_id = self._create_event("Shotgun_HumanUser_Change", self.user, None)
+
+        events = event_log.fetch_events(self.mockgun, first_id, self.project)
+        self.assertEqual([event["id"] for event in events], [shot_id, user_id])
+
+    def test_changed_entities(self):
+        """
+        Makes sure events are mapped to the entities they are about,
+        including retired entities.
+        """
+        new_id = self._create_event(
+            "Shotgun_Shot_New",
+            self.shot,
+            self.project,
+            {"type": "new_entity", "entity_type": "Shot", "entity_id": 10},
+        )
+        self._create_event("Shotgun_Shot_Change", self.shot, self.project)
+        self._create_event(
+            "Shotgun_Shot_Retirement",
+            None,
+            self.project,
+            {"type": "entity_retirement", "entity_type": "Shot", "entity_id": 12},
+        )
+        self._create_event("Shotgun_HumanUser_Change", self.user, None)
+
+        events = event_log.fetch_events(self.mockgun, new_id - 1, self.project)
+        self.assertEqual(
+            event_log.get_changed_entities(events),
+            [("Shot", 10, True), ("Shot", 12, False), ("HumanUser", 5, False)],
+        )
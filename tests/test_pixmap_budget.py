@@ -0,0 +1,131 @@
+# Copyright (c) 2020 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import itertools
+import os
+import sys
+import unittest
+
+# the pixmap budget only needs Qt to tell icons from pixmaps,
+# so the module is imported on its own.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "python", "app"))
+import pixmap_budget  # noqa: E402
+
+
+class FakeIcon(object):
+    """
+    Stands in for QIcon, which the budget tells apart from pixmaps
+    """
+
+
+class FakeQtGui(object):
+    QIcon = FakeIcon
+
+
+class FakePixmap(object):
+    """
+    Stands in for a 32 bit QPixmap of 10x10 pixels, which is 400 bytes
+    """
+
+    _cache_keys = itertools.count(1)
+
+    def __init__(self):
+        self._cache_key = next(self._cache_keys)
+
+    def isNull(self):
+        return False
+
+    def cacheKey(self):
+        return self._cache_key
+
+    def width(self):
+        return 10
+
+    def height(self):
+        return 10
+
+    def depth(self):
+        return 32
+
+
+class FakeOwner(object):
+    """
+    Stands in for a tab model holding images
+    """
+
+    def __init__(self, displayed=False):
+        self.displayed = displayed
+        self.evicted = []
+
+    def is_displayed(self):
+        return self.displayed
+
+    def evict_images(self, key):
+        self.evicted.append(key)
+
+
+class TestPixmapBudget(unittest.TestCase):
+    """
+    Tests the accounting and eviction of the pixmap budget
+    """
+
+    def setUp(self):
+        self._qt_gui = pixmap_budget.QtGui
+        pixmap_budget.QtGui = FakeQtGui
+        self.budget = pixmap_budget.PixmapBudget(1000)
+
+    def tearDown(self):
+        pixmap_budget.QtGui = self._qt_gui
+
+    def test_model_over_budget_is_evicted(self):
+        """
+        Makes sure the least recently displayed images of a model
+        are evicted once the budget is exceeded.
+        """
+        model = FakeOwner()
+        self.budget.add(model, 1, [FakePixmap()])
+        self.budget.add(model, 2, [FakePixmap()])
+        self.budget.touch(model, 1)
+        self.assertEqual(self.budget.total_bytes, 800)
+        self.assertEqual(model.evicted, [])
+
+        self.budget.add(model, 3, [FakePixmap()])
+        self.assertEqual(model.evicted, [2])
+        self.assertEqual(self.budget.total_bytes, 800)
+
+    def test_displayed_model_is_skipped(self):
+        """
+        Makes sure images of displayed owners are not evicted
+        """
+        model = FakeOwner(displayed=True)
+        snapshots = FakeOwner()
+        self.budget.add(model, 1, [FakePixmap()])
+        self.budget.add(snapshots, 1, [FakePixmap()])
+        self.budget.add(model, 2, [FakePixmap()])
+
+        self.assertEqual(model.evicted, [])
+        self.assertEqual(snapshots.evicted, [1])
+
+    def test_shared_images_are_counted_once(self):
+        """
+        Makes sure an image held by several owners is counted once and
+        only released once all owners have evicted it.
+        """
+        model = FakeOwner()
+        snapshots = FakeOwner()
+        pixmap = FakePixmap()
+        self.budget.add(model, 1, [pixmap])
+        self.budget.add(snapshots, 1, [pixmap, None])
+        self.assertEqual(self.budget.total_bytes, 400)
+
+        self.budget.discard(model, 1)
+        self.assertEqual(self.budget.total_bytes, 400)
+        self.budget.release(snapshots)
+        self.assertEqual(self.budget.total_bytes, 0)